@@ -0,0 +1,314 @@
+"""
+Batched Writer for user_actions
+UserActionLogger의 행동 로그를 bounded queue에 모았다가 백그라운드 스레드에서 bulk insert
+- batch_size만큼 모이거나 flush_interval이 지나면 한 번에 기록
+- 큐가 가득 차면 enqueue_timeout 동안 대기(backpressure) 후 버리고 drop 카운터 증가
+- 기록 실패 시 재시도 후 로컬 spill 파일(JSON Lines)에 보관하고 주기적으로 재전송
+  (읽을 수 없는 줄은 .corrupt 파일로 격리, 재전송 도중 중단된 .replay 파일은 다음 재전송에서 이어서 처리)
+- close() 호출 시 남은 로그를 모두 기록 (앱 종료 시)
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from postgrest.types import ReturnMethod
+from supabase import Client
+
+
+class BatchedActionWriter:
+    """user_actions bulk insert 파이프라인"""
+
+    def __init__(
+        self,
+        supabase_client: Client,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000,
+        enqueue_timeout: float = 0.0,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        spill_path: Optional[str] = 'logs/user_actions_spill.jsonl',
+        replay_interval: float = 60.0,
+        table: str = 'user_actions'
+    ):
+        """
+        Args:
+            supabase_client: Supabase 클라이언트
+            batch_size: 한 번에 insert할 최대 row 수
+            flush_interval: 첫 row가 들어온 뒤 batch를 기록하기까지 최대 대기 시간 (초)
+            max_queue: 대기 가능한 최대 row 수
+            enqueue_timeout: 큐가 가득 찼을 때 호출자가 기다리는 시간 (0이면 즉시 drop)
+            max_retries: batch 기록 실패 시 재시도 횟수
+            retry_backoff: 재시도 대기 시간 (시도마다 2배)
+            spill_path: 재시도까지 실패한 row를 저장할 파일 (None이면 버림)
+            replay_interval: spill 파일 재전송 주기 (초)
+            table: 기록할 테이블
+        """
+        self.supabase = supabase_client
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.spill_path = spill_path
+        self.replay_interval = replay_interval
+        self.table = table
+
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._stop_event = threading.Event()
+        self._spill_lock = threading.Lock()
+        # 카운터는 요청 스레드(enqueue)와 기록 스레드가 함께 갱신하므로 락 안에서만 변경
+        self._stats_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._last_replay = 0.0
+
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.retries = 0
+        self.failed_batches = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.quarantined = 0
+        self.replay_errors = 0
+
+    def enqueue(self, row: Dict[str, Any]) -> bool:
+        """
+        row를 큐에 추가 (DB 왕복 없이 반환)
+
+        Returns:
+            큐에 들어갔으면 True, 큐가 가득 차 버려졌으면 False
+        """
+        try:
+            if self.enqueue_timeout > 0:
+                self._queue.put(row, timeout=self.enqueue_timeout)
+            else:
+                self._queue.put_nowait(row)
+        except queue.Full:
+            dropped = self._count('dropped')
+            if dropped == 1 or dropped % 1000 == 0:
+                print(f"[ActionWriter] Queue full, dropped {dropped} actions so far")
+            return False
+        self._count('enqueued')
+        return True
+
+    def _count(self, name: str, amount: int = 1) -> int:
+        """카운터 증가 후 새 값 반환"""
+        with self._stats_lock:
+            value = getattr(self, name) + amount
+            setattr(self, name, value)
+            return value
+
+    def enqueue_many(self, rows: List[Dict[str, Any]]) -> int:
+        """여러 row를 큐에 추가하고 들어간 개수 반환"""
+        return sum(1 for row in rows if self.enqueue(row))
+
+    def _insert(self, rows: List[Dict[str, Any]]):
+        self.supabase.table(self.table).insert(rows, returning=ReturnMethod.minimal).execute()
+
+    def _write_batch(self, rows: List[Dict[str, Any]]) -> bool:
+        """재시도 포함 batch 기록 (최종 실패 시 spill)"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._insert(rows)
+                self._count('written', len(rows))
+                self._count('batches')
+                return True
+            except Exception as e:
+                if attempt < self.max_retries:
+                    self._count('retries')
+                    time.sleep(self.retry_backoff * (2 ** attempt))
+                else:
+                    print(f"[ActionWriter] Failed to write {len(rows)} actions: {e}")
+
+        self._count('failed_batches')
+        self._spill(rows)
+        return False
+
+    def _spill(self, rows: List[Dict[str, Any]], drop_on_failure: bool = True) -> bool:
+        """spill 파일에 row 추가 (실패하면 False, drop_on_failure이면 버린 것으로 집계)"""
+        if not self.spill_path:
+            self._count('dropped', len(rows))
+            return False
+        try:
+            with self._spill_lock:
+                os.makedirs(os.path.dirname(self.spill_path) or '.', exist_ok=True)
+                with open(self.spill_path, 'a', encoding='utf-8') as f:
+                    for row in rows:
+                        f.write(json.dumps(row, ensure_ascii=False, default=str) + '\n')
+            self._count('spilled', len(rows))
+            print(f"[ActionWriter] Spilled {len(rows)} actions to {self.spill_path}")
+            return True
+        except OSError as e:
+            if drop_on_failure:
+                self._count('dropped', len(rows))
+            print(f"[ActionWriter] Failed to spill actions: {e}")
+            return False
+
+    def _quarantine(self, lines: List[str]):
+        """JSON으로 읽을 수 없는 spill 줄(비정상 종료로 잘린 줄 등)을 .corrupt 파일로 옮김"""
+        try:
+            with self._spill_lock:
+                with open(self.spill_path + '.corrupt', 'a', encoding='utf-8') as f:
+                    for line in lines:
+                        f.write(line + '\n')
+        except OSError as e:
+            print(f"[ActionWriter] Failed to quarantine {len(lines)} spill lines: {e}")
+        self._count('quarantined', len(lines))
+        print(f"[ActionWriter] Quarantined {len(lines)} unreadable spill lines to {self.spill_path}.corrupt")
+
+    def replay_spill(self) -> int:
+        """
+        spill 파일의 row를 다시 기록 (실패한 batch는 다시 spill 파일로)
+
+        Returns:
+            재전송에 성공한 row 수
+        """
+        self._last_replay = time.time()
+        if not self.spill_path:
+            return 0
+
+        # 읽는 동안 새로 spill되는 row와 섞이지 않도록 파일을 옮긴 뒤 처리
+        # 이전 재전송이 중간에 멈춰 .replay 파일이 남아 있으면 그 파일부터 처리
+        replay_path = self.spill_path + '.replay'
+        with self._spill_lock:
+            if not os.path.exists(replay_path):
+                try:
+                    os.replace(self.spill_path, replay_path)
+                except OSError:
+                    return 0
+
+        rows, corrupt = [], []
+        with open(replay_path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    corrupt.append(line)
+        if corrupt:
+            self._quarantine(corrupt)
+
+        replayed = 0
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            try:
+                self._insert(batch)
+                self._count('written', len(batch))
+                self._count('batches')
+                replayed += len(batch)
+            except Exception as e:
+                print(f"[ActionWriter] Replay failed, keeping {len(rows) - start} actions: {e}")
+                if not self._spill(rows[start:], drop_on_failure=False):
+                    # 남은 row를 옮기지 못했으면 .replay 파일을 남은 row로 교체해 다음 재전송에서 처리
+                    self._rewrite_replay(replay_path, rows[start:])
+                    self._count('replayed', replayed)
+                    return replayed
+                break
+
+        # 모든 row를 기록했거나 spill 파일로 다시 옮긴 뒤에만 삭제
+        os.remove(replay_path)
+        self._count('replayed', replayed)
+        if replayed:
+            print(f"[ActionWriter] Replayed {replayed} spilled actions")
+        return replayed
+
+    def _rewrite_replay(self, replay_path: str, rows: List[Dict[str, Any]]):
+        """이미 기록한 row가 다시 전송되지 않도록 .replay 파일을 남은 row로 교체 (실패하면 파일 그대로 유지)"""
+        tmp_path = replay_path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for row in rows:
+                    f.write(json.dumps(row, ensure_ascii=False, default=str) + '\n')
+            os.replace(tmp_path, replay_path)
+        except OSError as e:
+            print(f"[ActionWriter] Failed to rewrite {replay_path}, it will be replayed as is: {e}")
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        """첫 row를 기다린 뒤 batch_size 또는 flush_interval까지 모음"""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop_event.is_set():
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self):
+        """큐에 남은 row를 대기 없이 모두 기록"""
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            self._write_batch(batch)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            batch = self._next_batch()
+            if batch:
+                self._write_batch(batch)
+            if time.time() - self._last_replay >= self.replay_interval:
+                # 재전송 실패(파일 I/O 등)로 기록 스레드가 종료되지 않도록 하고 다음 주기에 다시 시도
+                try:
+                    self.replay_spill()
+                except Exception as e:
+                    self._count('replay_errors')
+                    print(f"[ActionWriter] Spill replay failed: {e}")
+        self._drain()
+
+    def start(self):
+        """백그라운드 기록 스레드 시작 (앱 시작 시 한 번 호출)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="user-action-writer", daemon=True)
+        self._thread.start()
+        print(f"[ActionWriter] Started (batch_size={self.batch_size}, flush_interval={self.flush_interval}s)")
+
+    def close(self, timeout: float = 10.0):
+        """남은 로그를 기록하고 스레드 종료 (앱 종료 시 호출)"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        # 스레드가 시작되지 않았거나 이미 종료된 경우에도 남은 로그는 기록
+        self._drain()
+        print(f"[ActionWriter] Closed ({self.written} written, {self.dropped} dropped, {self.spilled} spilled)")
+
+    def stats(self) -> Dict[str, Any]:
+        """파이프라인 카운터"""
+        with self._stats_lock:
+            return {
+                'queue_size': self._queue.qsize(),
+                'max_queue': self._queue.maxsize,
+                'enqueued': self.enqueued,
+                'written': self.written,
+                'batches': self.batches,
+                'dropped': self.dropped,
+                'retries': self.retries,
+                'failed_batches': self.failed_batches,
+                'spilled': self.spilled,
+                'replayed': self.replayed,
+                'quarantined': self.quarantined,
+                'replay_errors': self.replay_errors,
+            }
@@ -0,0 +1,143 @@
+"""
+Benchmark: XGBoost Booster vs Compiled Ensemble
+MBTI 랭커 추론 경로 비교 (배치 크기별 latency, 모델 메모리, 예측 시 메모리 peak)
+- booster: DMatrix 생성 + Booster.predict (기존 경로)
+- compiled: CompiledEnsemble.predict (NumPy만 사용)
+
+Usage:
+    python benchmark_inference.py [--mbti INTJ] [--batch-sizes 1,10,100,2500] [--repeat 200]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ml.compiled import CompiledEnsemble, compiled_model_path
+from ml.feature_extractor import StockFeatureExtractor, THEME_MAP
+
+
+SECTORS = ['반도체', 'IT', '금융업', '은행', '제조업', '의약품', '바이오', '통신업', '게임', '']
+
+
+def random_features(n: int, mbti: str, seed: int = 0) -> np.ndarray:
+    """임의 종목으로 만든 실제 형식의 Feature 행렬 (StockFeatureExtractor.extract_features_batch)"""
+    rng = np.random.default_rng(seed)
+    stocks = [
+        {
+            'sector': SECTORS[rng.integers(len(SECTORS))],
+            'change_percent': float(rng.uniform(-8, 8)),
+            'volatility': ['low', 'medium', 'high'][rng.integers(3)],
+            'dividend_yield': float(rng.uniform(0, 6)),
+            'market_cap': ['small', 'medium', 'large'][rng.integers(3)],
+        }
+        for _ in range(n)
+    ]
+    return StockFeatureExtractor().extract_features_batch(stocks, mbti, list(THEME_MAP)[0])
+
+
+def time_calls(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples_ms = np.array(samples) * 1000
+    return {
+        'p50_ms': round(float(np.percentile(samples_ms, 50)), 4),
+        'p99_ms': round(float(np.percentile(samples_ms, 99)), 4),
+        'mean_ms': round(float(samples_ms.mean()), 4),
+    }
+
+
+def peak_bytes(fn: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(models_dir: str, mbti: str, batch_sizes: List[int], repeat: int) -> Dict[str, Any]:
+    import xgboost as xgb
+
+    model_path = os.path.join(models_dir, f'{mbti}_ranker.json')
+    booster = xgb.Booster()
+    booster.load_model(model_path)
+
+    compiled_path = compiled_model_path(model_path)
+    if os.path.exists(compiled_path):
+        compiled = CompiledEnsemble.load(compiled_path)
+    else:
+        compiled = CompiledEnsemble.from_model_file(model_path)
+
+    results: Dict[str, Any] = {
+        'mbti': mbti,
+        'num_trees': compiled.num_trees,
+        'max_depth': compiled.max_depth,
+        'model_bytes': {
+            'booster_raw': len(booster.save_raw()),
+            'compiled': compiled.nbytes,
+        },
+        'batches': [],
+    }
+
+    for n in batch_sizes:
+        X = random_features(n, mbti)
+
+        def booster_predict():
+            return booster.predict(xgb.DMatrix(X))
+
+        def compiled_predict():
+            return compiled.predict(X)
+
+        max_abs_diff = float(np.max(np.abs(booster_predict() - compiled_predict())))
+        results['batches'].append({
+            'batch_size': n,
+            'booster': {**time_calls(booster_predict, repeat), 'peak_bytes': peak_bytes(booster_predict)},
+            'compiled': {**time_calls(compiled_predict, repeat), 'peak_bytes': peak_bytes(compiled_predict)},
+            'max_abs_diff': max_abs_diff,
+        })
+        print(
+            f"[Benchmark] n={n}: booster p50 {results['batches'][-1]['booster']['p50_ms']}ms, "
+            f"compiled p50 {results['batches'][-1]['compiled']['p50_ms']}ms, diff {max_abs_diff}",
+            file=sys.stderr
+        )
+
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare Booster.predict and compiled ensemble inference")
+    parser.add_argument('--models-dir', default='ml/models')
+    parser.add_argument('--mbti', default='INTJ')
+    parser.add_argument('--batch-sizes', default='1,10,100,2500')
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--output', default=None, help="결과 JSON 저장 경로 (없으면 stdout)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    batch_sizes = [int(n) for n in args.batch_sizes.split(',') if n]
+    results = run(args.models_dir, args.mbti.upper(), batch_sizes, args.repeat)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Benchmark suite for the recommendation hot path (python -m benchmarks)
@@ -0,0 +1,57 @@
+"""
+Usage (backend 디렉토리에서):
+    python -m benchmarks [--sizes 1000,10000,100000] [--output bench.json] [--compare baseline.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.suite import DEFAULT_SIZES, compare, run_suite
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the recommendation hot path against a fake Supabase")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help="합성 universe 종목 수 목록")
+    parser.add_argument('--actions', type=int, default=20000, help="prepare_training_data용 user_actions 수")
+    parser.add_argument('--repeat', type=int, default=20, help="1k universe 기준 반복 횟수")
+    parser.add_argument('--sample', type=int, default=1000, help="종목 단위 케이스 호출 수")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cases', default='universe,training,prices', help="실행할 케이스 그룹")
+    parser.add_argument('--price-days', type=int, default=250, help="가격 이력 케이스의 거래일 수")
+    parser.add_argument('--output', default=None, help="결과 JSON 저장 경로 (없으면 stdout)")
+    parser.add_argument('--compare', default=None, help="비교할 이전 결과 JSON")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    report = run_suite(
+        sizes=[int(size) for size in args.sizes.split(',') if size],
+        actions=args.actions,
+        repeat=args.repeat,
+        sample=args.sample,
+        seed=args.seed,
+        cases=[case for case in args.cases.split(',') if case],
+        price_days=args.price_days
+    )
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            report['comparison'] = {'baseline': args.compare, 'rows': compare(json.load(f), report)}
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+        print(f"[Benchmark] Results saved to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
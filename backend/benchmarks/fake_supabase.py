@@ -0,0 +1,142 @@
+"""
+In-process Fake Supabase
+벤치마크용으로 supabase-py 쿼리 빌더 중 백엔드가 사용하는 부분만 메모리 상에서 구현
+- select / eq / gt / gte / lt / lte / in_ / or_(keyset 형식) / order / limit / range / insert / upsert
+- 네트워크 지연은 없으므로 측정값은 백엔드 코드의 CPU 비용만 반영
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+
+# keyset 조건: a.gt."v",and(a.eq."v",b.gt.N) (training_data) 또는 b.gt."v" (price_store)
+_KEYSET_PATTERN = re.compile(r'(\w+)\.gt\."([^"]*)",and\(\1\.eq\."\2",(\w+)\.gt\.(?:(-?\d+)|"([^"]*)")\)')
+
+
+class FakeResponse:
+    def __init__(self, data: List[Dict[str, Any]], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    def __init__(self, client: "FakeSupabase", table: str):
+        self.client = client
+        self.table = table
+        self.columns: Optional[List[str]] = None
+        self.filters: List[Callable[[Dict[str, Any]], bool]] = []
+        self.orders: List[tuple] = []
+        self.row_limit: Optional[int] = None
+        self.row_range: Optional[tuple] = None
+        self.count: Optional[str] = None
+        self.payload: Optional[List[Dict[str, Any]]] = None
+
+    def select(self, columns: str = '*', count: Optional[str] = None) -> "FakeQuery":
+        self.columns = None if columns.strip() == '*' else [c.strip() for c in columns.split(',')]
+        self.count = count
+        return self
+
+    def eq(self, column: str, value: Any) -> "FakeQuery":
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def gt(self, column: str, value: Any) -> "FakeQuery":
+        self.filters.append(lambda row: row.get(column) is not None and row[column] > value)
+        return self
+
+    def gte(self, column: str, value: Any) -> "FakeQuery":
+        self.filters.append(lambda row: row.get(column) is not None and row[column] >= value)
+        return self
+
+    def lt(self, column: str, value: Any) -> "FakeQuery":
+        self.filters.append(lambda row: row.get(column) is not None and row[column] < value)
+        return self
+
+    def lte(self, column: str, value: Any) -> "FakeQuery":
+        self.filters.append(lambda row: row.get(column) is not None and row[column] <= value)
+        return self
+
+    def in_(self, column: str, values: List[Any]) -> "FakeQuery":
+        allowed = set(values)
+        self.filters.append(lambda row: row.get(column) in allowed)
+        return self
+
+    def or_(self, expression: str) -> "FakeQuery":
+        match = _KEYSET_PATTERN.fullmatch(expression)
+        if match is None:
+            raise NotImplementedError(f"Unsupported or_ filter: {expression}")
+        column, value, tie_column = match.group(1), match.group(2), match.group(3)
+        # 숫자 id는 정수, 따옴표 값(ticker)은 문자열로 비교
+        last_id = int(match.group(4)) if match.group(4) is not None else match.group(5)
+        self.filters.append(
+            lambda row: row[column] > value or (row[column] == value and row[tie_column] > last_id)
+        )
+        return self
+
+    def order(self, column: str, desc: bool = False) -> "FakeQuery":
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, size: int) -> "FakeQuery":
+        self.row_limit = size
+        return self
+
+    def range(self, start: int, end: int) -> "FakeQuery":
+        self.row_range = (start, end)
+        return self
+
+    def insert(self, rows: Any, **kwargs) -> "FakeQuery":
+        self.payload = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(self, rows: Any, **kwargs) -> "FakeQuery":
+        return self.insert(rows)
+
+    def execute(self) -> FakeResponse:
+        self.client.requests += 1
+        if self.payload is not None:
+            return FakeResponse(self.client.insert_rows(self.table, self.payload))
+
+        rows = [row for row in self.client.tables.get(self.table, []) if all(f(row) for f in self.filters)]
+        total = len(rows)
+        # 뒤 정렬 키부터 stable sort (NULL은 마지막)
+        for column, desc in reversed(self.orders):
+            present = [row for row in rows if row.get(column) is not None]
+            missing = [row for row in rows if row.get(column) is None]
+            present.sort(key=lambda row: row[column], reverse=desc)
+            rows = present + missing
+        if self.row_range is not None:
+            rows = rows[self.row_range[0]:self.row_range[1] + 1]
+        if self.row_limit is not None:
+            rows = rows[:self.row_limit]
+        if self.columns is not None:
+            rows = [{c: row.get(c) for c in self.columns} for row in rows]
+        else:
+            rows = [dict(row) for row in rows]
+        return FakeResponse(rows, total if self.count else None)
+
+
+class FakeSupabase:
+    """테이블 이름 -> row 리스트를 가진 Supabase 클라이언트 대체물"""
+
+    def __init__(self, tables: Optional[Dict[str, List[Dict[str, Any]]]] = None):
+        self.tables: Dict[str, List[Dict[str, Any]]] = tables or {}
+        self.requests = 0
+        self._next_id = 1 + max(
+            (row.get('id', 0) for rows in self.tables.values() for row in rows if isinstance(row.get('id'), int)),
+            default=0
+        )
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def insert_rows(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        stored = []
+        for row in rows:
+            row = dict(row)
+            if 'id' not in row:
+                row['id'] = self._next_id
+                self._next_id += 1
+            stored.append(row)
+        self.tables.setdefault(table, []).extend(stored)
+        return stored
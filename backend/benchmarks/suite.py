@@ -0,0 +1,380 @@
+"""
+Recommendation Hot Path Benchmark Suite
+합성 stocks/user_actions와 in-process Fake Supabase로 주요 경로의 latency/throughput/peak memory 측정
+- score_stock / extract_features: 종목 1개 단위 호출
+- snapshot_build: stocks row -> StockUniverseSnapshot (컬럼/Feature 블록 포함)
+- rank_stocks: 전체 universe 랭킹 (HybridStockRanker)
+- recommend_themes: API 핸들러 end-to-end (응답 캐시 없음, 요청 시 계산 / 점수표 조회)
+- prepare_training_data: user_actions 스트리밍 로드 + Feature 행렬 생성
+- price_*: stock_prices_daily 이력 읽기 (REST 페이지 조회 vs 로컬 가격 저장소) + 지표 계산
+결과는 JSON으로 저장하여 버전 간 비교 (--compare)
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.synthetic import make_prices, make_stocks, make_user_actions
+
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+BENCHMARK_MBTI = 'INTJ'
+BENCHMARK_CATEGORY = '기술주'
+
+# Fake Supabase는 페이지마다 전체 row를 필터링하므로 큰 페이지로 조회 (실제 REST는 페이지당 왕복 지연이 추가됨)
+PRICE_PAGE_SIZE = 10000
+
+# main.py import 전에 적용: 외부 연결/디스크 캐시/응답 캐시 없이 매 요청 계산
+BENCHMARK_ENV = {
+    'VITE_SUPABASE_URL': '',
+    'VITE_SUPABASE_ANON_KEY': '',
+    'FEATURE_STORE_DIR': '',
+    'SCORE_TABLES_DIR': '',
+    'SCORE_TABLES_AUTO_BUILD': '0',
+    'RESPONSE_CACHE_SIZE': '0',
+}
+
+
+def scaled_repeat(repeat: int, size: int) -> int:
+    """universe가 클수록 반복 횟수를 줄임 (최소 3회)"""
+    return max(3, min(repeat, repeat * 10000 // max(size, 1)))
+
+
+def measure(
+    fn: Callable[[], Any],
+    runs: int,
+    items_per_run: int = 1,
+    warmup: int = 1
+) -> Dict[str, Any]:
+    """
+    fn 반복 실행 시간 통계 + 한 번 실행 시 Python heap peak (tracemalloc)
+
+    Args:
+        fn: 측정할 함수
+        runs: 측정 횟수
+        items_per_run: 1회 실행에서 처리하는 항목 수 (throughput 계산용)
+        warmup: 측정 전 실행 횟수
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            fn()
+        samples = np.empty(runs)
+        for i in range(runs):
+            start = time.perf_counter()
+            fn()
+            samples[i] = time.perf_counter() - start
+
+        tracemalloc.start()
+        try:
+            fn()
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    samples_ms = samples * 1000
+    total_seconds = float(samples.sum())
+    return {
+        'runs': runs,
+        'items_per_run': items_per_run,
+        'p50_ms': round(float(np.percentile(samples_ms, 50)), 4),
+        'p99_ms': round(float(np.percentile(samples_ms, 99)), 4),
+        'mean_ms': round(float(samples_ms.mean()), 4),
+        'throughput_per_sec': round(runs * items_per_run / total_seconds, 1) if total_seconds > 0 else None,
+        'peak_bytes': peak_bytes,
+    }
+
+
+def measure_each(fn: Callable[[Any], Any], items: List[Any]) -> Dict[str, Any]:
+    """항목마다 fn(item)을 한 번씩 호출한 latency 통계 (1회 = 1항목)"""
+    iterator = iter(items * 2)
+
+    def call():
+        fn(next(iterator))
+
+    return measure(call, runs=len(items) - 1, items_per_run=1)
+
+
+def import_main():
+    """벤치마크 환경변수를 적용한 뒤 main 모듈 import"""
+    for key, value in BENCHMARK_ENV.items():
+        os.environ[key] = value
+    with contextlib.redirect_stdout(io.StringIO()):
+        import main
+    return main
+
+
+def bench_universe(size: int, repeat: int, sample: int, seed: int) -> List[Dict[str, Any]]:
+    """universe 크기 하나에 대한 scoring/ranking/API 케이스"""
+    from ranker import score_stock
+    from ml.feature_extractor import StockFeatureExtractor, extract_stock_features_from_db
+    from hybrid_ranker import HybridStockRanker
+    from ml.registry import MBTI_TYPES
+    from stock_universe import StockUniverseSnapshot, init_stock_universe
+
+    main = import_main()
+    results = []
+
+    def record(case: str, stats: Dict[str, Any]):
+        stats = {'case': case, 'size': size, **stats}
+        results.append(stats)
+        print(
+            f"[Benchmark] {case:<32} n={size:<7} p50 {stats['p50_ms']:>10.4f}ms  "
+            f"p99 {stats['p99_ms']:>10.4f}ms  {stats['throughput_per_sec']}/s  peak {stats['peak_bytes']}B",
+            file=sys.stderr
+        )
+
+    rows = make_stocks(size, seed=seed)
+    fake = FakeSupabase({'stocks': rows})
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        snapshot = StockUniverseSnapshot(rows, main.feature_store)
+    candidates = snapshot.candidates
+    sample_candidates = candidates[:min(sample, size)]
+
+    # 1. 종목 1개 단위 (Rule 점수 / ML Feature 추출)
+    record('score_stock', measure_each(
+        lambda c: score_stock(c['features'], BENCHMARK_MBTI, BENCHMARK_CATEGORY),
+        sample_candidates
+    ))
+    extractor = StockFeatureExtractor()
+    stock_data = [extract_stock_features_from_db(c['features']) for c in sample_candidates]
+    record('extract_features', measure_each(
+        lambda s: extractor.extract_features(s, BENCHMARK_MBTI, BENCHMARK_CATEGORY),
+        stock_data
+    ))
+
+    # 2. 스냅샷 생성 (종목 데이터 갱신 시 1회)
+    record('snapshot_build', measure(
+        lambda: StockUniverseSnapshot(rows, None),
+        runs=scaled_repeat(max(3, repeat // 4), size),
+        items_per_run=size
+    ))
+
+    # 3. 전체 universe 랭킹
+    with contextlib.redirect_stdout(io.StringIO()):
+        hybrid_ranker = HybridStockRanker(BENCHMARK_MBTI)
+    record('rank_stocks', measure(
+        lambda: hybrid_ranker.rank_stocks(candidates, BENCHMARK_CATEGORY, top_k=10),
+        runs=scaled_repeat(repeat, size),
+        items_per_run=size
+    ))
+
+    # 4. API end-to-end (MBTI를 돌아가며 요청)
+    main.supabase_client = fake
+    with contextlib.redirect_stdout(io.StringIO()):
+        init_stock_universe(fake, feature_store=main.feature_store).refresh(force=True)
+        for mbti in MBTI_TYPES:
+            main.get_model_registry().get(mbti)
+
+    loop = asyncio.new_event_loop()
+    mbti_cycle = iter(MBTI_TYPES * 1000)
+
+    def recommend():
+        request = main.ThemeRecommendationRequest(mbti=next(mbti_cycle))
+        return loop.run_until_complete(main.recommend_themes(request))
+
+    try:
+        main.SCORE_TABLES_ENABLED = False
+        record('recommend_themes', measure(recommend, runs=scaled_repeat(repeat, size)))
+
+        # 점수표 빌드(배치 작업) 시간은 별도 필드로 기록
+        with contextlib.redirect_stdout(io.StringIO()):
+            build_start = time.perf_counter()
+            main.score_table_store.build(main.get_stock_universe().get())
+            build_ms = (time.perf_counter() - build_start) * 1000
+        main.SCORE_TABLES_ENABLED = True
+        stats = measure(recommend, runs=scaled_repeat(repeat, size))
+        stats['table_build_ms'] = round(build_ms, 1)
+        record('recommend_themes_score_tables', stats)
+    finally:
+        main.SCORE_TABLES_ENABLED = False
+        loop.close()
+
+    return results
+
+
+def bench_training(actions_count: int, stock_count: int, repeat: int, seed: int) -> List[Dict[str, Any]]:
+    """prepare_training_data (stocks는 train_all_mbti_models처럼 미리 조회한 dict 사용)"""
+    from ml.trainer import MBTIStockRanker
+    from ml.training_data import fetch_stocks_dict
+
+    stocks = make_stocks(stock_count, seed=seed)
+    actions = make_user_actions(stocks, actions_count, seed=seed + 1, mbti_types=[BENCHMARK_MBTI])
+    fake = FakeSupabase({'stocks': stocks, 'user_actions': actions})
+    stocks_dict = fetch_stocks_dict(fake)
+
+    ranker = MBTIStockRanker(BENCHMARK_MBTI)
+    stats = measure(
+        lambda: ranker.prepare_training_data(supabase=fake, stocks_dict=stocks_dict),
+        runs=max(3, repeat // 4),
+        items_per_run=actions_count
+    )
+    stats = {'case': 'prepare_training_data', 'size': actions_count, **stats, 'samples': ranker.load_stats.get('samples')}
+    print(
+        f"[Benchmark] {'prepare_training_data':<32} n={actions_count:<7} p50 {stats['p50_ms']:>10.4f}ms  "
+        f"{stats['throughput_per_sec']} actions/s  peak {stats['peak_bytes']}B",
+        file=sys.stderr
+    )
+    return [stats]
+
+
+def bench_prices(stock_count: int, days: int, repeat: int, seed: int) -> List[Dict[str, Any]]:
+    """
+    가격 이력 읽기 경로 (Fake Supabase는 네트워크 지연이 없으므로 REST 케이스는 실제보다 빠르게 측정됨)
+    """
+    from indicators import PriceHistory, compute_indicators
+    from price_store import PRICE_FIELDS, PriceStore, iter_price_pages
+
+    stocks = make_stocks(stock_count, seed=seed)
+    prices = make_prices(stocks, days, seed=seed + 2)
+    for row in prices:
+        row.update({'open_price': row['close_price'], 'high_price': row['close_price'], 'low_price': row['close_price'], 'volume': 0})
+    fake = FakeSupabase({'stock_prices_daily': prices})
+    columns = ','.join(['ticker', 'trade_date'] + PRICE_FIELDS)
+    results = []
+
+    def record(case: str, stats: Dict[str, Any]):
+        stats = {'case': case, 'size': stock_count, **stats, 'days': days}
+        results.append(stats)
+        print(
+            f"[Benchmark] {case:<32} n={stock_count:<7} p50 {stats['p50_ms']:>10.4f}ms  "
+            f"p99 {stats['p99_ms']:>10.4f}ms  peak {stats['peak_bytes']}B",
+            file=sys.stderr
+        )
+
+    directory = tempfile.mkdtemp(prefix='price-store-')
+    try:
+        runs = max(3, repeat // 4)
+        record('price_rest_load', measure(
+            lambda: PriceHistory.from_rows(row for page in iter_price_pages(fake, columns, page_size=PRICE_PAGE_SIZE) for row in page),
+            runs=3, items_per_run=len(prices), warmup=0
+        ))
+
+        def initial_sync():
+            shutil.rmtree(directory, ignore_errors=True)
+            PriceStore(directory).sync(fake, page_size=PRICE_PAGE_SIZE)
+
+        record('price_store_sync', measure(initial_sync, runs=3, items_per_run=len(prices), warmup=0))
+
+        # 새 프로세스처럼 매번 저장소를 다시 열어서 읽음
+        record('price_store_tail', measure(
+            lambda: PriceHistory.from_store(PriceStore(directory), 120),
+            runs=runs
+        ))
+        ticker = stocks[len(stocks) // 2]['ticker']
+        record('price_store_slice_ticker', measure(
+            lambda: PriceStore(directory).slice('close_price', ticker=ticker),
+            runs=runs
+        ))
+
+        history = PriceHistory.from_store(PriceStore(directory), 120)
+        record('compute_indicators', measure(lambda: compute_indicators(history), runs=runs, items_per_run=stock_count))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def environment_info() -> Dict[str, Any]:
+    """결과 비교 시 확인할 실행 환경"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run_suite(
+    sizes: Optional[List[int]] = None,
+    actions: int = 20000,
+    repeat: int = 20,
+    sample: int = 1000,
+    seed: int = 0,
+    cases: Optional[List[str]] = None,
+    price_days: int = 250
+) -> Dict[str, Any]:
+    """
+    전체 벤치마크 실행
+
+    Args:
+        sizes: universe 크기 목록
+        actions: prepare_training_data에 사용할 user_actions 수
+        repeat: 1k universe 기준 반복 횟수 (큰 universe는 비례해서 줄임)
+        sample: 종목 단위 케이스의 호출 수
+        seed: 합성 데이터 seed
+        cases: 실행할 케이스 그룹 ('universe', 'training', 'prices'), None이면 전체
+        price_days: price_* 케이스의 거래일 수 (종목 수는 sizes 중 최솟값)
+
+    Returns:
+        {'meta': ..., 'results': [...]} (JSON 직렬화 가능)
+    """
+    sizes = sizes or DEFAULT_SIZES
+    cases = cases or ['universe', 'training', 'prices']
+    started = time.time()
+
+    results: List[Dict[str, Any]] = []
+    if 'universe' in cases:
+        for size in sizes:
+            results.extend(bench_universe(size, repeat, sample, seed))
+    if 'training' in cases:
+        results.extend(bench_training(actions, min(sizes), repeat, seed))
+    if 'prices' in cases:
+        results.extend(bench_prices(min(sizes), price_days, repeat, seed))
+
+    return {
+        'meta': {
+            **environment_info(),
+            'started_at': started,
+            'elapsed_seconds': round(time.time() - started, 2),
+            'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            'params': {
+                'sizes': sizes,
+                'actions': actions,
+                'repeat': repeat,
+                'sample': sample,
+                'seed': seed,
+                'cases': cases,
+                'price_days': price_days,
+            },
+        },
+        'results': results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    두 결과의 (case, size)별 p50/p99/peak 비율 (current / baseline, 1보다 크면 느려짐)
+    """
+    previous = {(r['case'], r['size']): r for r in baseline.get('results', [])}
+    rows = []
+    for result in current.get('results', []):
+        old = previous.get((result['case'], result['size']))
+        if old is None:
+            continue
+        row = {'case': result['case'], 'size': result['size']}
+        for key in ('p50_ms', 'p99_ms', 'peak_bytes'):
+            row[f'{key}_ratio'] = round(result[key] / old[key], 3) if old.get(key) else None
+        rows.append(row)
+    return rows
@@ -0,0 +1,148 @@
+"""
+Synthetic Benchmark Data
+stocks / stock_prices_daily / user_actions 테이블과 같은 컬럼 구성의 재현 가능한 임의 데이터 생성
+"""
+
+import random
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from ml.registry import MBTI_TYPES
+
+
+SECTORS = [
+    '반도체', 'IT', '소프트웨어', '인터넷', '게임', '전기전자', '2차전지',
+    '금융업', '은행', '보험', '증권', '유통업', '서비스업', '음식료품', '통신업',
+    '의약품', '바이오', '헬스케어', '제조업', '자동차', '화학', '철강금속', '건설업',
+    '에너지', '엔터', '운수장비', '',
+]
+
+NAME_SUFFIXES = ['', '전자', '바이오', '게임즈', '금융지주', '에너지', '제약', '홀딩스', '테크', '푸드']
+
+# user_actions.action_type 분포 (view가 가장 많고 buy/sell은 드묾)
+ACTION_WEIGHTS = {
+    'view': 60,
+    'click': 20,
+    'detail_view': 10,
+    'buy': 6,
+    'sell': 4,
+}
+
+
+def make_stocks(count: int, seed: int = 0, sync_date: str = '2026-01-02') -> List[Dict[str, Any]]:
+    """
+    stocks 테이블 row 생성
+
+    Args:
+        count: 종목 수
+        seed: 난수 seed (같으면 같은 데이터)
+        sync_date: last_sync_date 값
+    """
+    rng = random.Random(seed)
+    stocks = []
+    for i in range(count):
+        price = round(rng.lognormvariate(10, 1.2), 0)
+        change_percent = round(rng.gauss(0, 2.5), 2)
+        stocks.append({
+            'ticker': f'{i:06d}',
+            'name': f'종목{i}{rng.choice(NAME_SUFFIXES)}',
+            'sector': rng.choice(SECTORS),
+            'market_cap': rng.choices(['small', 'medium', 'large'], weights=[6, 3, 1])[0],
+            'price': price,
+            'change': round(price * change_percent / 100, 0),
+            'change_percent': change_percent,
+            'volatility': rng.choices(['low', 'medium', 'high', 'very-high'], weights=[3, 4, 2, 1])[0],
+            'dividend_yield': round(rng.uniform(0, 6), 2) if rng.random() < 0.5 else 0,
+            'volume': rng.randint(1000, 5000000),
+            'last_sync_date': sync_date,
+        })
+    return stocks
+
+
+def make_prices(
+    stocks: Sequence[Dict[str, Any]],
+    days: int,
+    seed: int = 2,
+    end: str = '2026-01-02'
+) -> List[Dict[str, Any]]:
+    """
+    stock_prices_daily row 생성 (종목별 랜덤워크, 주말 제외, 마지막 거래일 = end)
+
+    Args:
+        stocks: make_stocks 결과
+        days: 거래일 수
+        seed: 난수 seed
+        end: 마지막 거래일
+    """
+    rng = random.Random(seed)
+    trade_dates: List[str] = []
+    day = date.fromisoformat(end)
+    while len(trade_dates) < days:
+        if day.weekday() < 5:
+            trade_dates.append(day.isoformat())
+        day -= timedelta(days=1)
+    trade_dates.reverse()
+
+    rows = []
+    for stock in stocks:
+        close = float(stock.get('price') or 10000)
+        sigma = rng.uniform(0.005, 0.05)
+        for trade_date in trade_dates:
+            previous = close
+            close = max(1.0, round(close * (1 + rng.gauss(0, sigma)), 0))
+            rows.append({
+                'ticker': stock['ticker'],
+                'trade_date': trade_date,
+                'close_price': close,
+                'change_amount': close - previous,
+                'change_percent': round((close / previous - 1) * 100, 2),
+            })
+    return rows
+
+
+def make_user_actions(
+    stocks: Sequence[Dict[str, Any]],
+    count: int,
+    seed: int = 1,
+    mbti_types: Optional[Sequence[str]] = None,
+    users: int = 500,
+    themes_per_mbti: int = 4,
+    start: str = '2026-01-01T00:00:00'
+) -> List[Dict[str, Any]]:
+    """
+    user_actions 테이블 row 생성 (timestamp 오름차순, id는 1부터)
+
+    Args:
+        stocks: 종목 row (stock_ticker 선택용)
+        count: 행동 수
+        seed: 난수 seed
+        mbti_types: 행동을 만들 MBTI 목록 (None이면 16개 전체)
+        users: 사용자 수
+        themes_per_mbti: MBTI별 테마 수
+        start: 첫 행동 시각
+    """
+    rng = random.Random(seed)
+    mbti_types = list(mbti_types or MBTI_TYPES)
+    action_types = list(ACTION_WEIGHTS)
+    weights = list(ACTION_WEIGHTS.values())
+    # 사용자마다 MBTI 고정
+    user_mbti = {f'user-{u}': rng.choice(mbti_types) for u in range(users)}
+    user_ids = list(user_mbti)
+
+    timestamp = datetime.fromisoformat(start)
+    actions = []
+    for i in range(count):
+        user_id = rng.choice(user_ids)
+        mbti = user_mbti[user_id]
+        timestamp += timedelta(seconds=rng.randint(0, 30))
+        actions.append({
+            'id': i + 1,
+            'user_id': user_id,
+            'mbti': mbti,
+            'action_type': rng.choices(action_types, weights=weights)[0],
+            'stock_ticker': stocks[rng.randrange(len(stocks))]['ticker'],
+            'theme_id': f'{mbti.lower()}-{rng.randint(1, themes_per_mbti)}',
+            'rank_position': rng.randint(1, 10),
+            'timestamp': timestamp.isoformat(),
+        })
+    return actions
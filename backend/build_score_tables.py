@@ -0,0 +1,81 @@
+"""
+Build precomputed score tables for the current stock universe
+일일 동기화(scripts/sync-daily-prices.ts) 후 실행하여 API가 점수표 조회만으로 추천하도록 함
+
+Usage:
+    python build_score_tables.py [--output-dir cache/score_tables]
+"""
+
+import argparse
+import os
+import sys
+from dotenv import load_dotenv
+
+# 상위 디렉토리를 path에 추가
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from db import get_data_source
+from feature_store import StockFeatureStore
+from indicators import IndicatorEngine
+from price_store import PriceStore
+from ml.registry import init_model_registry
+from score_tables import ScoreTableStore
+from stock_universe import init_stock_universe
+
+# Load environment
+load_dotenv('../.env')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Precompute MBTI x category score tables")
+    parser.add_argument(
+        '--output-dir', default=os.environ.get("SCORE_TABLES_DIR", "cache/score_tables"),
+        help="점수표 저장 디렉토리 (API의 SCORE_TABLES_DIR와 같아야 함)"
+    )
+    parser.add_argument(
+        '--feature-dir', default=os.environ.get("FEATURE_STORE_DIR", "cache/features"),
+        help="종목 Feature 블록 저장 디렉토리"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    supabase = get_data_source()
+    if supabase is None:
+        print("❌ Supabase credentials not found!")
+        sys.exit(1)
+
+    # API와 같은 모델 파일 선택 규칙 (점수표의 모델 버전이 API 레지스트리와 일치해야 사용됨)
+    registry = init_model_registry(
+        prefer_compiled=os.environ.get("MODEL_PREFER_COMPILED", "1") == "1"
+    )
+    registry.preload()
+
+    # API와 같은 지표 설정 (지표 버전이 스냅샷 버전에 포함됨)
+    indicator_engine = None
+    if os.environ.get("INDICATORS", "0") == "1":
+        price_store_dir = os.environ.get("PRICE_STORE_DIR", "cache/prices")
+        indicator_engine = IndicatorEngine(
+            supabase,
+            lookback_days=int(os.environ.get("INDICATOR_LOOKBACK_DAYS", 120)),
+            index_ticker=os.environ.get("INDICATOR_INDEX_TICKER") or None,
+            price_store=PriceStore(directory=price_store_dir) if price_store_dir else None
+        )
+
+    universe = init_stock_universe(
+        supabase,
+        feature_store=StockFeatureStore(directory=args.feature_dir or None),
+        indicator_engine=indicator_engine
+    )
+    snapshot = universe.get()
+
+    store = ScoreTableStore(directory=args.output_dir, registry=registry)
+    if store.build(snapshot) is None:
+        sys.exit(1)
+    print(f"✅ Score tables for snapshot {snapshot.version} saved to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
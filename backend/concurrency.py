@@ -0,0 +1,113 @@
+"""
+Bounded Executor for CPU-bound Request Work
+이벤트 루프를 막지 않도록 점수 계산 같은 CPU 작업을 전용 스레드풀에서 실행
+- 동시 실행 수는 워커 수로 제한하고, 나머지 요청은 이벤트 루프에서 대기 (스레드를 점유하지 않음)
+- 대기열이 max_queue를 넘으면 즉시 거절하여 과부하 시 지연이 무한히 쌓이지 않도록 함
+- 실행 슬롯은 스레드풀 작업이 실제로 끝날 때 반환 (기다리던 요청이 취소되어도 작업이 끝날 때까지 슬롯 유지)
+"""
+
+import asyncio
+import functools
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class QueueFullError(Exception):
+    """대기열이 가득 차서 작업을 받을 수 없음"""
+
+
+class BoundedExecutor:
+    """동시 실행 제한 + 대기열 길이 지표를 가진 스레드풀"""
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 0, name: str = "worker"):
+        """
+        Args:
+            max_workers: 동시에 실행할 최대 작업 수 (스레드 수)
+            max_queue: 실행을 기다릴 수 있는 최대 요청 수 (0이면 제한 없음)
+            name: 스레드 이름 prefix
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_queued_seen = 0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # 세마포어는 이벤트 루프에 묶이므로 루프가 바뀌면 새로 생성
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+            self._loop = loop
+        return self._semaphore
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        fn(*args, **kwargs)를 스레드풀에서 실행하고 결과를 기다림
+
+        Raises:
+            QueueFullError: 대기 중인 요청이 max_queue 이상일 때
+        """
+        if self.max_queue and self.queued >= self.max_queue:
+            self.rejected += 1
+            raise QueueFullError(f"{self.queued} requests already waiting")
+
+        semaphore = self._get_semaphore()
+        self.queued += 1
+        self.max_queued_seen = max(self.max_queued_seen, self.queued)
+        try:
+            await semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        self.running += 1
+        loop = self._loop
+        try:
+            job = self._executor.submit(functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self.running -= 1
+            semaphore.release()
+            raise
+        # 완료 콜백은 워커 스레드에서 호출되므로 카운터/세마포어 갱신은 이벤트 루프로 넘김
+        job.add_done_callback(lambda f: self._call_in_loop(loop, self._finish, semaphore, f))
+        # 요청이 취소되면 아직 시작하지 않은 작업도 취소됨 (이미 실행 중이면 끝날 때까지 슬롯 유지)
+        return await asyncio.wrap_future(job, loop=loop)
+
+    @staticmethod
+    def _call_in_loop(loop: asyncio.AbstractEventLoop, callback: Callable[..., Any], *args: Any):
+        try:
+            loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            # 이벤트 루프가 이미 닫힘 (종료 중)
+            pass
+
+    def _finish(self, semaphore: asyncio.Semaphore, job: Future):
+        self.running -= 1
+        if not job.cancelled():
+            if job.exception() is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+        semaphore.release()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """실행/대기 현황"""
+        return {
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'queued': self.queued,
+            'running': self.running,
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'max_queued_seen': self.max_queued_seen,
+        }
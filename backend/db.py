@@ -0,0 +1,230 @@
+"""
+Supabase Data Access Layer
+프로세스 전역에서 공유하는 Supabase 클라이언트 (keep-alive 커넥션 풀)
+- 요청마다 create_client()를 호출하면 HTTP 클라이언트와 TLS 핸드셰이크가 매번 새로 생성됨
+- 하나의 httpx.Client를 재사용하여 커넥션을 요청 간에 공유
+- DATA_SOURCE=replica이면 같은 쿼리 빌더 인터페이스의 로컬 SQLite 복제본(local_replica)을 사용
+"""
+
+import asyncio
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+from supabase import create_client, Client, ClientOptions
+from supabase import acreate_client, AsyncClient, AsyncClientOptions
+
+
+# Pool 설정 (환경변수로 조정 가능)
+DEFAULT_POOL_SIZE = 20
+DEFAULT_KEEPALIVE_CONNECTIONS = 10
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_CONNECT_TIMEOUT = 5.0
+
+
+def create_pooled_client(
+    url: str,
+    key: str,
+    pool_size: int = DEFAULT_POOL_SIZE,
+    keepalive_connections: int = DEFAULT_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+    timeout: float = DEFAULT_TIMEOUT,
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT
+) -> Client:
+    """
+    커넥션 풀을 공유하는 Supabase 클라이언트 생성
+
+    Args:
+        url: Supabase URL
+        key: Supabase anon key
+        pool_size: 최대 동시 커넥션 수
+        keepalive_connections: 유지할 idle 커넥션 수
+        keepalive_expiry: idle 커넥션 유지 시간 (초)
+        timeout: 요청 타임아웃 (초)
+        connect_timeout: 연결 타임아웃 (초)
+
+    Returns:
+        Supabase 클라이언트
+    """
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        ),
+        timeout=httpx.Timeout(timeout, connect=connect_timeout),
+        follow_redirects=True,
+        http2=True
+    )
+    return create_client(url, key, options=ClientOptions(httpx_client=http_client))
+
+
+def _pool_settings_from_env() -> Dict[str, Any]:
+    return {
+        'pool_size': int(os.environ.get("SUPABASE_POOL_SIZE", DEFAULT_POOL_SIZE)),
+        'keepalive_connections': int(os.environ.get("SUPABASE_POOL_KEEPALIVE", DEFAULT_KEEPALIVE_CONNECTIONS)),
+        'keepalive_expiry': float(os.environ.get("SUPABASE_POOL_KEEPALIVE_EXPIRY", DEFAULT_KEEPALIVE_EXPIRY)),
+        'timeout': float(os.environ.get("SUPABASE_TIMEOUT", DEFAULT_TIMEOUT)),
+        'connect_timeout': float(os.environ.get("SUPABASE_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT)),
+    }
+
+
+async def create_pooled_async_client(
+    url: str,
+    key: str,
+    pool_size: int = DEFAULT_POOL_SIZE,
+    keepalive_connections: int = DEFAULT_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+    timeout: float = DEFAULT_TIMEOUT,
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT
+) -> AsyncClient:
+    """커넥션 풀을 공유하는 비동기 Supabase 클라이언트 생성 (인자는 create_pooled_client와 동일)"""
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        ),
+        timeout=httpx.Timeout(timeout, connect=connect_timeout),
+        follow_redirects=True,
+        http2=True
+    )
+    return await acreate_client(url, key, options=AsyncClientOptions(httpx_client=http_client))
+
+
+_client: Optional[Client] = None
+_client_lock = threading.Lock()
+
+_async_client: Optional[AsyncClient] = None
+_async_client_lock: Optional[asyncio.Lock] = None
+
+
+def get_supabase_client() -> Optional[Client]:
+    """
+    공유 Supabase 클라이언트 반환 (최초 호출 시 생성)
+
+    Returns:
+        Supabase 클라이언트 (환경변수가 없으면 None)
+    """
+    global _client
+    if _client is not None:
+        return _client
+
+    with _client_lock:
+        if _client is None:
+            url = os.environ.get("VITE_SUPABASE_URL")
+            key = os.environ.get("VITE_SUPABASE_ANON_KEY")
+            if not url or not key:
+                return None
+
+            _client = create_pooled_client(url, key, **_pool_settings_from_env())
+            print("[DB] Pooled Supabase client initialized")
+    return _client
+
+
+def close_supabase_client():
+    """공유 클라이언트의 커넥션 풀 종료 (앱 종료 시 호출)"""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.options.httpx_client.close()
+            _client = None
+
+
+async def get_async_supabase_client() -> Optional[AsyncClient]:
+    """
+    공유 비동기 Supabase 클라이언트 반환 (이벤트 루프에서 사용, 최초 호출 시 생성)
+
+    Returns:
+        비동기 Supabase 클라이언트 (환경변수가 없으면 None)
+    """
+    global _async_client, _async_client_lock
+    if _async_client is not None:
+        return _async_client
+
+    if _async_client_lock is None:
+        _async_client_lock = asyncio.Lock()
+    async with _async_client_lock:
+        if _async_client is None:
+            url = os.environ.get("VITE_SUPABASE_URL")
+            key = os.environ.get("VITE_SUPABASE_ANON_KEY")
+            if not url or not key:
+                return None
+
+            _async_client = await create_pooled_async_client(url, key, **_pool_settings_from_env())
+            print("[DB] Pooled async Supabase client initialized")
+    return _async_client
+
+
+async def close_async_supabase_client():
+    """공유 비동기 클라이언트의 커넥션 풀 종료 (앱 종료 시 호출)"""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.options.httpx_client.aclose()
+        _async_client = None
+
+
+# ----------------------------------------------------------------------
+# Pluggable data source (DATA_SOURCE=supabase | replica)
+# ----------------------------------------------------------------------
+
+_replica = None
+_replica_lock = threading.Lock()
+
+
+def data_source_kind() -> str:
+    """현재 데이터 소스 종류 ('supabase' 또는 'replica')"""
+    return os.environ.get("DATA_SOURCE", "supabase").lower()
+
+
+def get_local_replica():
+    """
+    공유 로컬 SQLite 복제본 반환 (최초 호출 시 생성, 스키마는 public/supabase_dump.sql)
+    - 읽기 전용: 로컬에 쓴 row는 Supabase로 올라가지 않으므로 쓰기는 get_supabase_client()로 보냄
+
+    Returns:
+        LocalReplica (REPLICA_PATH, 기본 cache/replica.sqlite3)
+    """
+    global _replica
+    if _replica is not None:
+        return _replica
+
+    with _replica_lock:
+        if _replica is None:
+            from local_replica import DEFAULT_SCHEMA_PATH, LocalReplica
+            _replica = LocalReplica(
+                path=os.environ.get("REPLICA_PATH", "cache/replica.sqlite3"),
+                schema_path=os.environ.get("REPLICA_SCHEMA", DEFAULT_SCHEMA_PATH),
+                read_only=True
+            )
+            print(f"[DB] Local replica opened ({_replica.path})")
+    return _replica
+
+
+def close_local_replica():
+    """로컬 복제본 연결 종료 (앱 종료 시 호출)"""
+    global _replica
+    with _replica_lock:
+        if _replica is not None:
+            _replica.close()
+            _replica = None
+
+
+def get_data_source() -> Optional[Any]:
+    """
+    조회에 사용할 클라이언트 (supabase-py 쿼리 빌더 인터페이스)
+    - DATA_SOURCE=replica: 로컬 SQLite 복제본 (sync_replica.py로 채움, 읽기 전용)
+    - 그 외: 공유 Supabase 클라이언트 (환경변수가 없으면 None)
+    """
+    if data_source_kind() == "replica":
+        return get_local_replica()
+    return get_supabase_client()
+
+
+async def get_async_data_source() -> Optional[AsyncClient]:
+    """비동기 클라이언트 (복제본은 조회가 로컬이므로 None을 반환해 동기 경로를 사용)"""
+    if data_source_kind() == "replica":
+        return None
+    return await get_async_supabase_client()
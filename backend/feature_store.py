@@ -0,0 +1,163 @@
+"""
+Per-Stock Feature Store
+MBTI/테마와 무관한 종목 Feature 블록(change_percent ~ sector_other)을 종목 데이터 버전마다 한 번만 계산
+- 스냅샷 버전별 .npy 파일로 저장하고 memory-map으로 열어 새 worker도 계산 없이 바로 사용
+- 랭킹 시에는 필요한 행만 골라 MBTI/테마 One-Hot 블록을 붙임 (StockFeatureExtractor.with_context)
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ml.feature_extractor import StockFeatureExtractor, extract_stock_features_from_db
+
+
+# 블록 열 구성이 바뀌면 올려서 이전 형식의 파일을 읽지 않도록 함
+FEATURE_BLOCK_FORMAT = 1
+
+
+class StockFeatureBlock:
+    """종목 Feature 블록 (행 순서 = 스냅샷 candidates 순서)"""
+
+    def __init__(self, version: str, tickers: List[str], block: np.ndarray):
+        self.version = version
+        self.tickers = tickers
+        self.block = block
+        self.index: Dict[str, int] = {ticker: i for i, ticker in enumerate(tickers)}
+
+    def rows_for(self, tickers: Sequence[str]) -> np.ndarray:
+        """ticker 목록에 해당하는 블록 행"""
+        return self.block[[self.index[ticker] for ticker in tickers]]
+
+    @property
+    def nbytes(self) -> int:
+        return self.block.nbytes
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+
+class StockFeatureStore:
+    """스냅샷 버전 -> StockFeatureBlock (메모리 + 디스크 memmap)"""
+
+    def __init__(self, directory: Optional[str] = 'cache/features', keep_versions: int = 3):
+        """
+        Args:
+            directory: 블록 파일 저장 디렉토리 (None이면 메모리에만 보관)
+            keep_versions: 디스크에 남겨둘 최근 버전 수
+        """
+        self.directory = directory
+        self.keep_versions = keep_versions
+        self.extractor = StockFeatureExtractor()
+        self._lock = threading.Lock()
+        self._current: Optional[StockFeatureBlock] = None
+
+        self.builds = 0
+        self.disk_loads = 0
+        self.memory_hits = 0
+
+    def _paths(self, version: str):
+        base = os.path.join(self.directory, f"v{FEATURE_BLOCK_FORMAT}-{version}")
+        return base + '.npy', base + '.tickers.json'
+
+    def _load(self, version: str) -> Optional[StockFeatureBlock]:
+        block_path, tickers_path = self._paths(version)
+        if not os.path.exists(block_path) or not os.path.exists(tickers_path):
+            return None
+        try:
+            with open(tickers_path, 'r', encoding='utf-8') as f:
+                tickers = json.load(f)
+            block = np.load(block_path, mmap_mode='r')
+        except (OSError, ValueError) as e:
+            print(f"[FeatureStore] Failed to load {version}: {e}")
+            return None
+        if len(block) != len(tickers):
+            return None
+        return StockFeatureBlock(version, tickers, block)
+
+    def _save(self, feature_block: StockFeatureBlock):
+        block_path, tickers_path = self._paths(feature_block.version)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # 다른 프로세스가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체 (블록 파일이 마지막)
+            tmp_tickers = f"{tickers_path}.{os.getpid()}.tmp"
+            with open(tmp_tickers, 'w', encoding='utf-8') as f:
+                json.dump(feature_block.tickers, f)
+            os.replace(tmp_tickers, tickers_path)
+
+            tmp_block = f"{block_path}.{os.getpid()}.tmp"
+            with open(tmp_block, 'wb') as f:
+                np.save(f, feature_block.block)
+            os.replace(tmp_block, block_path)
+            self._prune()
+        except OSError as e:
+            print(f"[FeatureStore] Failed to save {feature_block.version}: {e}")
+
+    def _prune(self):
+        """오래된 버전 파일 삭제"""
+        blocks = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith('.npy')
+        ]
+        blocks.sort(key=os.path.getmtime, reverse=True)
+        for block_path in blocks[self.keep_versions:]:
+            for path in (block_path, block_path[:-len('.npy')] + '.tickers.json'):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def get(self, version: str, candidates: List[Dict[str, Any]]) -> StockFeatureBlock:
+        """
+        스냅샷 버전의 Feature 블록 반환 (메모리 -> 디스크 -> 계산 순)
+
+        Args:
+            version: 스냅샷 버전
+            candidates: 스냅샷 추천 후보 리스트 (build_candidate 결과)
+        """
+        current = self._current
+        if current is not None and current.version == version:
+            self.memory_hits += 1
+            return current
+
+        with self._lock:
+            current = self._current
+            if current is not None and current.version == version:
+                self.memory_hits += 1
+                return current
+
+            feature_block = self._load(version) if self.directory else None
+            if feature_block is not None:
+                self.disk_loads += 1
+                print(f"[FeatureStore] Memory-mapped {version} ({len(feature_block)} stocks)")
+            else:
+                block = self.extractor.stock_block(
+                    [extract_stock_features_from_db(c['features']) for c in candidates]
+                )
+                feature_block = StockFeatureBlock(version, [c['ticker'] for c in candidates], block)
+                self.builds += 1
+                print(f"[FeatureStore] Built {version} ({len(feature_block)} stocks, {block.nbytes} bytes)")
+                if self.directory:
+                    self._save(feature_block)
+                    # 저장한 파일을 memmap으로 다시 열어 같은 머신의 worker들과 페이지 캐시 공유
+                    feature_block = self._load(version) or feature_block
+
+            self._current = feature_block
+            return feature_block
+
+    def stats(self) -> Dict[str, Any]:
+        current = self._current
+        return {
+            'version': current.version if current else None,
+            'stocks': len(current) if current else 0,
+            'bytes': current.nbytes if current else 0,
+            'memory_mapped': isinstance(current.block, np.memmap) if current else False,
+            'builds': self.builds,
+            'disk_loads': self.disk_loads,
+            'memory_hits': self.memory_hits,
+            'directory': self.directory,
+        }
@@ -3,37 +3,52 @@ Hybrid Ranker: Rule-based + XGBoost
 Rule-based 랭커와 XGBoost 모델을 결합한 하이브리드 시스템
 """
 
-import os
-from typing import Dict, List, Any, Tuple
-from ml.trainer import MBTIStockRanker
+import numpy as np
+from typing import Dict, List, Any, Tuple, Optional, Callable
 from ml.feature_extractor import StockFeatureExtractor, extract_stock_features_from_db
+from ml.registry import ModelRegistry, get_model_registry
+from metrics import ML_PREDICT_ERRORS_TOTAL, pipeline_timer, stage_timer
+from rule_engine import RuleScores, StockColumns, score_columns
+from selection import top_k_indices
+
+
+def blend_scores(
+    ml_scores: np.ndarray,
+    rule: RuleScores,
+    ml_weight: float
+) -> Tuple[np.ndarray, Callable[[int], str]]:
+    """
+    ML/Rule 점수 가중 평균 (score_stock_hybrid와 동일)
+    
+    Returns:
+        (최종 점수 배열, i번째 종목의 설명을 만드는 함수)
+    """
+    final_scores = ml_weight * ml_scores + (1 - ml_weight) * rule.scores
+    
+    def reason(i: int) -> str:
+        return f"🤖 ML 기반 추천 (ML: {ml_scores[i]:.1f}, Rule: {rule.scores[i]:.1f})"
+    
+    return final_scores, reason
 
 
 class HybridStockRanker:
     """Rule-based와 ML을 결합한 하이브리드 랭커"""
     
-    def __init__(self, mbti: str, models_dir: str = 'ml/models'):
+    def __init__(self, mbti: str, registry: Optional[ModelRegistry] = None):
         self.mbti = mbti.upper()
-        self.models_dir = models_dir
+        self.registry = registry or get_model_registry()
         self.ml_ranker = None
         self.feature_extractor = StockFeatureExtractor()
         
-        # ML 모델 로드 시도
+        # ML 모델 로드 시도 (레지스트리에 이미 로드된 공유 모델 사용)
         self._load_ml_model()
     
     def _load_ml_model(self):
         """ML 모델 로드"""
-        model_path = os.path.join(self.models_dir, f'{self.mbti}_ranker.json')
-        
-        if os.path.exists(model_path):
-            try:
-                self.ml_ranker = MBTIStockRanker(self.mbti)
-                self.ml_ranker.load_model(model_path)
-                print(f"[Hybrid] Loaded ML model for {self.mbti}")
-            except Exception as e:
-                print(f"[Hybrid] Failed to load ML model for {self.mbti}: {e}")
-                self.ml_ranker = None
-        else:
+        with stage_timer('model_load'):
+            self.ml_ranker = self.registry.get(self.mbti)
+        
+        if self.ml_ranker is None:
             print(f"[Hybrid] No ML model found for {self.mbti}, using rule-based only")
     
     def score_stock_ml(
@@ -63,7 +78,6 @@ class HybridStockRanker:
             )
             
             # 예측 (XGBoost는 relevance score 반환)
-            import numpy as np
             score = self.ml_ranker.predict(np.array([features]))[0]
             
             # 0-100 스케일로 정규화 (relevance score는 0-3 범위)
@@ -75,6 +89,68 @@ class HybridStockRanker:
             print(f"[Hybrid] ML prediction error: {e}")
             return 0.0
     
+    def score_stocks_ml(
+        self,
+        stock_data_list: List[Dict[str, Any]],
+        theme_category: str
+    ) -> np.ndarray:
+        """
+        ML 모델로 여러 종목의 점수를 한 번에 예측 (단일 predict 호출)
+        
+        Args:
+            stock_data_list: 주식 정보 리스트
+            theme_category: 테마 카테고리
+        
+        Returns:
+            예측 점수 배열 (0-100 스케일로 정규화, score_stock_ml과 동일)
+        """
+        if self.ml_ranker is None or not stock_data_list:
+            return np.zeros(len(stock_data_list))
+        
+        try:
+            with stage_timer('feature_extraction'):
+                X = self.feature_extractor.extract_features_batch(stock_data_list, self.mbti, theme_category)
+            with stage_timer('ml_predict'):
+                scores = self.ml_ranker.predict(X)
+            
+            # 0-100 스케일로 정규화 (relevance score는 0-3 범위)
+            return np.clip(scores * 33.33, 0, 100).astype(np.float64)
+            
+        except Exception as e:
+            print(f"[Hybrid] ML batch prediction error: {e}")
+            ML_PREDICT_ERRORS_TOTAL.inc()
+            return np.zeros(len(stock_data_list))
+    
+    def score_block_ml(
+        self,
+        stock_block: np.ndarray,
+        theme_category: str
+    ) -> np.ndarray:
+        """
+        미리 계산된 종목 Feature 블록으로 점수 예측 (MBTI/테마 블록만 붙여서 predict)
+        
+        Args:
+            stock_block: 종목 Feature 블록 (StockFeatureExtractor.stock_block 형식)
+            theme_category: 테마 카테고리
+        
+        Returns:
+            예측 점수 배열 (0-100 스케일로 정규화, score_stocks_ml과 동일)
+        """
+        if self.ml_ranker is None or len(stock_block) == 0:
+            return np.zeros(len(stock_block))
+        
+        try:
+            with stage_timer('feature_extraction'):
+                X = self.feature_extractor.with_context(stock_block, self.mbti, theme_category)
+            with stage_timer('ml_predict'):
+                scores = self.ml_ranker.predict(X)
+            return np.clip(scores * 33.33, 0, 100).astype(np.float64)
+            
+        except Exception as e:
+            print(f"[Hybrid] ML block prediction error: {e}")
+            ML_PREDICT_ERRORS_TOTAL.inc()
+            return np.zeros(len(stock_block))
+    
     def score_stock_rule_based(
         self,
         stock_features: Dict[str, Any],
@@ -133,12 +209,61 @@ class HybridStockRanker:
         
         return final_score, reason
     
+    def score_candidates(
+        self,
+        stocks: List[Dict[str, Any]],
+        theme_category: str,
+        use_ml: bool = True,
+        ml_weight: float = 0.7,
+        columns: Optional[StockColumns] = None,
+        rng: Optional[np.random.Generator] = None,
+        stock_block: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, Callable[[int], str]]:
+        """
+        후보 전체 점수를 배열로 계산 (정렬하지 않음)
+        
+        Args:
+            stocks: 주식 객체 리스트 (각 객체는 'features' 키를 포함해야 함)
+            theme_category: 테마 카테고리
+            use_ml: ML 모델 사용 여부
+            ml_weight: ML 가중치
+            columns: stocks와 같은 순서의 컬럼 배열 (없으면 새로 생성)
+            rng: Rule 점수 노이즈 난수 생성기
+            stock_block: stocks와 같은 순서의 종목 Feature 블록 (있으면 Feature 추출 생략)
+        
+        Returns:
+            (점수 배열, i번째 종목의 설명을 만드는 함수)
+            - 설명은 필요한 종목(Top-K)에 대해서만 생성하도록 함수로 반환
+        """
+        features_list = [stock_obj.get('features', stock_obj) for stock_obj in stocks]
+        if columns is None:
+            with stage_timer('feature_extraction'):
+                columns = StockColumns.from_features(features_list)
+        
+        with stage_timer('rule_scoring'):
+            rule = score_columns(columns, self.mbti, theme_category, rng)
+        
+        if not (use_ml and self.ml_ranker is not None):
+            return rule.scores, rule.reason
+        
+        # 후보 전체를 하나의 Feature 행렬로 만들어 predict 1회로 점수 계산
+        if stock_block is not None:
+            ml_scores = self.score_block_ml(stock_block, theme_category)
+        else:
+            with stage_timer('feature_extraction'):
+                stock_data_list = [extract_stock_features_from_db(features) for features in features_list]
+            ml_scores = self.score_stocks_ml(stock_data_list, theme_category)
+        
+        # 앙상블: 가중 평균 (score_stock_hybrid와 동일)
+        return blend_scores(ml_scores, rule, ml_weight)
+    
     def rank_stocks(
         self,
         stocks: List[Dict[str, Any]],
         theme_category: str,
         use_ml: bool = True,
-        ml_weight: float = 0.7
+        ml_weight: float = 0.7,
+        top_k: Optional[int] = None
     ) -> List[Tuple[Dict[str, Any], float, str]]:
         """
         주식 리스트 랭킹
@@ -148,34 +273,19 @@ class HybridStockRanker:
             theme_category: 테마 카테고리
             use_ml: ML 모델 사용 여부
             ml_weight: ML 가중치
+            top_k: 상위 K개만 반환 (None이면 전체, 부분 선택으로 전체 정렬 생략)
         
         Returns:
             (주식객체, 점수, 설명) 튜플 리스트 (점수 내림차순)
         """
-        scored_stocks = []
-        
-        for stock_obj in stocks:
-            features = stock_obj.get('features', stock_obj)
+        with pipeline_timer('rank_stocks'):
+            scores, reason = self.score_candidates(stocks, theme_category, use_ml, ml_weight)
             
-            if use_ml and self.ml_ranker is not None:
-                score, reason = self.score_stock_hybrid(
-                    features,
-                    theme_category,
-                    ml_weight
-                )
-            else:
-                score, reason = self.score_stock_rule_based(
-                    features,
-                    self.mbti,
-                    theme_category
-                )
+            # 점수 내림차순 (동점이면 입력 순서 유지)
+            with stage_timer('sorting'):
+                order = top_k_indices(scores, top_k).tolist()
             
-            scored_stocks.append((stock_obj, score, reason))
-        
-        # 점수 내림차순 정렬
-        scored_stocks.sort(key=lambda x: x[1], reverse=True)
-        
-        return scored_stocks
+            return [(stocks[i], float(scores[i]), reason(i)) for i in order]
 
 
 def get_hybrid_ranker(mbti: str) -> HybridStockRanker:
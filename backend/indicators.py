@@ -0,0 +1,405 @@
+"""
+Technical Indicator Engine
+stock_prices_daily 종가를 (종목 x 거래일) 행렬로 유지하고 전 종목의 기술적 지표를 NumPy rolling window로 한 번에 계산
+- RSI, 실현 변동성(연율화), N일 모멘텀, 시장(동일가중 평균 또는 지수 종목) 대비 베타
+- 새 거래일이 들어오면 그 날짜의 행만 조회해 열을 추가하고 lookback 기간만 유지 (증분 갱신)
+- PriceStore가 있으면 로컬 컬럼 저장소를 동기화한 뒤 최근 구간을 바로 읽음
+- 계산 결과(IndicatorSnapshot)는 stock_universe.build_candidate를 통해 점수 계산 Feature로 전달
+"""
+
+import hashlib
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from supabase import Client
+
+from price_store import DEFAULT_PAGE_SIZE, DEFAULT_SYNC_OVERLAP_DAYS, PriceStore, iter_price_pages
+
+
+RSI_PERIOD = 14
+VOLATILITY_WINDOW = 20
+MOMENTUM_DAYS = 5
+BETA_WINDOW = 60
+TRADING_DAYS_PER_YEAR = 252
+
+# 증분 갱신 시 유지할 거래일 수 (가장 긴 window + 여유)
+DEFAULT_LOOKBACK_DAYS = 120
+
+PRICE_COLUMNS = 'ticker,trade_date,close_price'
+
+# 실현 변동성(연율화 %) -> stocks.volatility 라벨 구간 (상한 미만이면 해당 라벨)
+VOLATILITY_LABEL_BOUNDS = [(25.0, 'low'), (45.0, 'medium'), (70.0, 'high')]
+
+
+def volatility_label(realized_volatility: float) -> str:
+    """실현 변동성을 점수 규칙이 사용하는 변동성 라벨로 변환"""
+    for upper, label in VOLATILITY_LABEL_BOUNDS:
+        if realized_volatility < upper:
+            return label
+    return 'very-high'
+
+
+class PriceHistory:
+    """종가 행렬 (행 = 종목, 열 = 거래일 오름차순, 없는 값은 NaN)"""
+
+    def __init__(self, tickers: Optional[List[str]] = None, dates: Optional[List[str]] = None, close: Optional[np.ndarray] = None):
+        self.tickers: List[str] = list(tickers or [])
+        self.index: Dict[str, int] = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self.dates: List[str] = list(dates or [])
+        self.close = close if close is not None else np.full((len(self.tickers), len(self.dates)), np.nan)
+
+    @classmethod
+    def from_store(cls, store: PriceStore, days: int) -> "PriceHistory":
+        """로컬 저장소의 최근 days 거래일 종가 (이후 append가 저장소를 수정하지 않도록 복사)"""
+        close, dates = store.tail(days, 'close_price')
+        close = np.where(close > 0, close, np.nan)
+        return cls(list(store.tickers), [str(d) for d in dates], close)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> "PriceHistory":
+        history = cls()
+        history.append(rows)
+        return history
+
+    def append(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        stock_prices_daily row 반영 (같은 (ticker, trade_date)는 덮어씀)
+
+        Returns:
+            새로 추가되거나 값이 바뀐 종가 수 (0이면 이력이 그대로임)
+        """
+        rows = [row for row in rows if row.get('close_price') is not None]
+        if not rows:
+            return 0
+
+        new_dates = sorted({str(row['trade_date']) for row in rows} - set(self.dates))
+        new_tickers = sorted({row['ticker'] for row in rows} - set(self.index))
+
+        if new_tickers:
+            for ticker in new_tickers:
+                self.index[ticker] = len(self.tickers)
+                self.tickers.append(ticker)
+            self.close = np.vstack([self.close, np.full((len(new_tickers), self.close.shape[1]), np.nan)])
+        if new_dates:
+            dates = sorted(self.dates + new_dates)
+            close = np.full((len(self.tickers), len(dates)), np.nan)
+            positions = np.searchsorted(dates, self.dates)
+            close[:, positions] = self.close
+            self.dates, self.close = dates, close
+
+        date_index = {d: i for i, d in enumerate(self.dates)}
+        row_idx = np.fromiter((self.index[row['ticker']] for row in rows), dtype=np.intp, count=len(rows))
+        col_idx = np.fromiter((date_index[str(row['trade_date'])] for row in rows), dtype=np.intp, count=len(rows))
+        values = np.fromiter((float(row['close_price']) for row in rows), dtype=np.float64, count=len(rows))
+        # 종가 0은 거래 정지/미수집 값이므로 missing으로 취급
+        values = np.where(values > 0, values, np.nan)
+        previous = self.close[row_idx, col_idx]
+        changed = ~((previous == values) | (np.isnan(previous) & np.isnan(values)))
+        self.close[row_idx, col_idx] = values
+        return int(np.count_nonzero(changed))
+
+    def trim(self, max_dates: int):
+        """최근 max_dates 거래일만 유지"""
+        if len(self.dates) > max_dates:
+            self.dates = self.dates[-max_dates:]
+            self.close = self.close[:, -max_dates:]
+
+    @property
+    def last_date(self) -> Optional[str]:
+        return self.dates[-1] if self.dates else None
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+
+def forward_fill(close: np.ndarray) -> np.ndarray:
+    """거래일 사이의 결측 종가를 직전 종가로 채움 (첫 거래 이전은 NaN 유지)"""
+    valid = ~np.isnan(close)
+    last_valid = np.where(valid, np.arange(close.shape[1]), 0)
+    np.maximum.accumulate(last_valid, axis=1, out=last_valid)
+    filled = close[np.arange(close.shape[0])[:, None], last_valid]
+    # 한 번도 값이 없었던 구간은 NaN
+    filled[~np.maximum.accumulate(valid, axis=1)] = np.nan
+    return filled
+
+
+def rsi_series(close: np.ndarray, period: int = RSI_PERIOD) -> np.ndarray:
+    """
+    RSI (period일 평균 상승폭/하락폭, 0-100)
+
+    Returns:
+        (종목 x (거래일 - period)) 행렬, j열은 close의 j+period번째 거래일 값
+    """
+    if close.shape[1] <= period:
+        return np.empty((close.shape[0], 0))
+    diff = np.diff(close, axis=1)
+    avg_gain = sliding_window_view(np.clip(diff, 0, None), period, axis=1).mean(axis=2)
+    avg_loss = sliding_window_view(np.clip(-diff, 0, None), period, axis=1).mean(axis=2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    # 하락이 없으면 100, 변동이 없으면 50
+    rsi = np.where(avg_loss == 0, np.where(avg_gain > 0, 100.0, 50.0), rsi)
+    return np.where(np.isnan(avg_gain) | np.isnan(avg_loss), np.nan, rsi)
+
+
+def volatility_series(close: np.ndarray, window: int = VOLATILITY_WINDOW) -> np.ndarray:
+    """실현 변동성 (window일 로그수익률 표준편차, 연율화 %)"""
+    if close.shape[1] <= window:
+        return np.empty((close.shape[0], 0))
+    log_returns = np.diff(np.log(close), axis=1)
+    std = sliding_window_view(log_returns, window, axis=1).std(axis=2, ddof=1)
+    return std * np.sqrt(TRADING_DAYS_PER_YEAR) * 100.0
+
+
+def momentum_series(close: np.ndarray, days: int = MOMENTUM_DAYS) -> np.ndarray:
+    """N일 모멘텀 (N거래일 전 대비 수익률 %)"""
+    if close.shape[1] <= days:
+        return np.empty((close.shape[0], 0))
+    return (close[:, days:] / close[:, :-days] - 1.0) * 100.0
+
+
+def market_returns(close: np.ndarray, index_row: Optional[int] = None) -> np.ndarray:
+    """시장 일간 수익률 (index_row가 없으면 전 종목 동일가중 평균)"""
+    returns = close[:, 1:] / close[:, :-1] - 1.0
+    if index_row is not None:
+        return returns[index_row]
+    with np.errstate(invalid='ignore'):
+        counts = np.sum(~np.isnan(returns), axis=0)
+        sums = np.nansum(returns, axis=0)
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+
+def beta_series(close: np.ndarray, window: int = BETA_WINDOW, index_row: Optional[int] = None) -> np.ndarray:
+    """시장 대비 베타 (window일 수익률 공분산 / 시장 분산)"""
+    if close.shape[1] <= window:
+        return np.empty((close.shape[0], 0))
+    returns = close[:, 1:] / close[:, :-1] - 1.0
+    market = market_returns(close, index_row)
+
+    stock_windows = sliding_window_view(returns, window, axis=1)
+    market_windows = sliding_window_view(market, window)
+    market_dev = market_windows - market_windows.mean(axis=1, keepdims=True)
+    stock_dev = stock_windows - stock_windows.mean(axis=2, keepdims=True)
+    cov = (stock_dev * market_dev).sum(axis=2) / (window - 1)
+    var = (market_dev ** 2).sum(axis=1) / (window - 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(var > 0, cov / var, np.nan)
+
+
+class IndicatorSnapshot:
+    """최근 거래일 기준 종목별 지표 (NaN = 계산할 이력이 부족함)"""
+
+    FIELDS = ('rsi', 'realized_volatility', 'momentum', 'beta')
+
+    def __init__(self, as_of: Optional[str], tickers: List[str], values: Dict[str, np.ndarray]):
+        self.as_of = as_of
+        self.tickers = tickers
+        self.index = {ticker: i for i, ticker in enumerate(tickers)}
+        self.values = values
+        # 같은 거래일 안에서 나머지 종목이 들어와도 바뀌도록 지표 값으로 버전 생성 (스냅샷/점수표 재생성 기준)
+        self.version = f"{as_of}-{self._digest()}" if as_of else None
+
+    def _digest(self) -> str:
+        digest = hashlib.sha1('\n'.join(self.tickers).encode('utf-8'))
+        for field in self.FIELDS:
+            digest.update(np.ascontiguousarray(self.values[field], dtype=np.float64).tobytes())
+        return digest.hexdigest()[:12]
+
+    def for_ticker(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """
+        종목 지표 (계산된 값만 포함, 종목이 없으면 None)
+        - build_candidate의 Feature에 그대로 병합
+        """
+        i = self.index.get(ticker)
+        if i is None:
+            return None
+        result: Dict[str, Any] = {'indicators_as_of': self.as_of}
+        for field in self.FIELDS:
+            value = float(self.values[field][i])
+            if np.isfinite(value):
+                result[field] = round(value, 4)
+        return result
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+
+def compute_indicators(
+    history: PriceHistory,
+    rsi_period: int = RSI_PERIOD,
+    volatility_window: int = VOLATILITY_WINDOW,
+    momentum_days: int = MOMENTUM_DAYS,
+    beta_window: int = BETA_WINDOW,
+    index_ticker: Optional[str] = None
+) -> IndicatorSnapshot:
+    """
+    마지막 거래일의 전 종목 지표 계산
+
+    Args:
+        history: 종가 행렬
+        index_ticker: 베타 기준 지수 종목 (None이면 전 종목 동일가중 평균)
+    """
+    n = len(history)
+    # 가장 긴 window에 필요한 열만 사용
+    need = max(rsi_period, volatility_window, momentum_days, beta_window) + 1
+    close = forward_fill(history.close)[:, -need:]
+
+    def latest(series: np.ndarray) -> np.ndarray:
+        return series[:, -1] if series.shape[1] else np.full(n, np.nan)
+
+    index_row = history.index.get(index_ticker) if index_ticker else None
+    values = {
+        'rsi': latest(rsi_series(close, rsi_period)),
+        'realized_volatility': latest(volatility_series(close, volatility_window)),
+        'momentum': latest(momentum_series(close, momentum_days)),
+        'beta': latest(beta_series(close, beta_window, index_row)),
+    }
+    return IndicatorSnapshot(history.last_date, list(history.tickers), values)
+
+
+class IndicatorEngine:
+    """Supabase stock_prices_daily -> PriceHistory -> IndicatorSnapshot (증분 갱신)"""
+
+    def __init__(
+        self,
+        supabase_client: Client,
+        lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+        index_ticker: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        price_store: Optional[PriceStore] = None
+    ):
+        """
+        Args:
+            supabase_client: Supabase 클라이언트
+            lookback_days: 유지할 거래일 수 (가장 긴 지표 window보다 커야 함)
+            index_ticker: 베타 기준 지수 종목 (None이면 동일가중 평균)
+            page_size: 조회 페이지 크기
+            price_store: 로컬 가격 저장소 (있으면 REST 대신 저장소에서 이력을 읽음)
+        """
+        self.supabase = supabase_client
+        self.price_store = price_store
+        self.lookback_days = max(lookback_days, BETA_WINDOW + 1)
+        self.index_ticker = index_ticker
+        self.page_size = page_size
+
+        self.history = PriceHistory()
+        self._snapshot: Optional[IndicatorSnapshot] = None
+        # 마지막으로 읽은 가격 저장소 revision (같은 거래일 안의 추가 row도 재계산하기 위해 비교)
+        self._store_revision: Optional[int] = None
+        self._lock = threading.Lock()
+
+        self.full_loads = 0
+        self.incremental_updates = 0
+        self.rows_loaded = 0
+        self.last_compute_seconds = 0.0
+
+    def _latest_trade_date(self) -> Optional[str]:
+        response = self.supabase.table('stock_prices_daily')\
+            .select('trade_date')\
+            .order('trade_date', desc=True)\
+            .limit(1)\
+            .execute()
+        if response.data:
+            return str(response.data[0]['trade_date'])
+        return None
+
+    def refresh(self) -> bool:
+        """
+        최근 거래일 행만 다시 조회해 반영 후, 종가가 바뀌었으면 지표 재계산
+
+        Returns:
+            지표가 갱신되었으면 True
+        """
+        with self._lock:
+            if self.price_store is not None:
+                if not self._load_from_store():
+                    return False
+            elif not self._load_from_supabase():
+                return False
+
+            start = time.perf_counter()
+            self._snapshot = compute_indicators(self.history, index_ticker=self.index_ticker)
+            self.last_compute_seconds = time.perf_counter() - start
+            print(
+                f"[Indicators] Computed {len(self._snapshot)} tickers as of {self._snapshot.as_of} "
+                f"({len(self.history.dates)} days, {self.last_compute_seconds * 1000:.1f}ms)"
+            )
+            return True
+
+    def _load_from_store(self) -> bool:
+        """저장소 증분 동기화 후 최근 구간 읽기 (저장된 가격이 바뀌지 않았으면 False)"""
+        store = self.price_store
+        start_date = None
+        if store.last_trade_date is None:
+            # 빈 저장소는 lookback 구간만 가져옴 (여러 해 이력은 sync_prices.py로 미리 채움)
+            latest = self._latest_trade_date()
+            if latest is None:
+                return False
+            start_date = (date.fromisoformat(latest) - timedelta(days=self._calendar_days())).isoformat()
+        self.rows_loaded += store.sync(self.supabase, start_date=start_date, page_size=self.page_size)
+
+        # 새 거래일뿐 아니라 마지막 거래일에 나머지 종목이 들어오거나 과거 일자가 backfill된 경우에도 다시 읽음
+        if store.last_trade_date is None or store.revision == self._store_revision:
+            return False
+        if self.history.last_date is None:
+            self.full_loads += 1
+        else:
+            self.incremental_updates += 1
+        self.history = PriceHistory.from_store(store, self.lookback_days)
+        self._store_revision = store.revision
+        return True
+
+    def _calendar_days(self) -> int:
+        # 거래일 수 -> 달력 일수 (주말/휴일 여유 포함)
+        return self.lookback_days * 7 // 5 + 14
+
+    def _load_from_supabase(self) -> bool:
+        """
+        마지막 저장 거래일 며칠 전부터 REST로 다시 조회해 반영 (종가가 바뀌지 않았으면 False)
+        - 종목별 upsert 도중 처음 본 거래일도 이후 갱신에서 나머지 종목이 채워지도록 PriceStore.sync와 같은 overlap 사용
+        """
+        if self.history.last_date is None:
+            latest = self._latest_trade_date()
+            if latest is None:
+                return False
+            since = (date.fromisoformat(latest) - timedelta(days=self._calendar_days())).isoformat()
+            full_load = True
+        else:
+            since = (date.fromisoformat(self.history.last_date) - timedelta(days=DEFAULT_SYNC_OVERLAP_DAYS)).isoformat()
+            full_load = False
+
+        changed = 0
+        for rows in iter_price_pages(self.supabase, since=since, page_size=self.page_size):
+            changed += self.history.append(rows)
+            self.rows_loaded += len(rows)
+        if not changed:
+            return False
+
+        if full_load:
+            self.full_loads += 1
+        else:
+            self.incremental_updates += 1
+        self.history.trim(self.lookback_days)
+        return True
+
+    def latest(self) -> Optional[IndicatorSnapshot]:
+        """마지막으로 계산된 지표 (아직 없으면 None)"""
+        return self._snapshot
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            'as_of': snapshot.as_of if snapshot else None,
+            'tickers': len(self.history),
+            'days': len(self.history.dates),
+            'full_loads': self.full_loads,
+            'incremental_updates': self.incremental_updates,
+            'rows_loaded': self.rows_loaded,
+            'last_compute_ms': round(self.last_compute_seconds * 1000, 2),
+            'index_ticker': self.index_ticker,
+            'price_store': self.price_store.stats() if self.price_store is not None else None,
+        }
@@ -0,0 +1,684 @@
+"""
+Local SQLite Replica Data Source
+Supabase 테이블을 로컬 SQLite 파일로 복제하고 supabase-py 쿼리 빌더와 같은 형태로 조회
+- 스키마는 public/supabase_dump.sql(pg_dump)의 public 테이블/제약조건/인덱스를 SQLite로 변환해서 생성
+- sync_from()으로 Supabase에서 테이블을 복사 (user_actions / stock_prices_daily는 마지막 동기화 지점부터 keyset 증분,
+  stock_prices_daily는 overlap_days 앞부터 다시 조회)
+- read_only=True(API의 DATA_SOURCE=replica)이면 쿼리 빌더 쓰기를 거부 (쓰기는 Supabase로 보내야 함)
+- 백엔드가 사용하는 빌더 부분만 지원: select / eq / neq / gt / gte / lt / lte / in_ / is_ / or_ /
+  order / limit / range / insert / upsert / update / delete / execute
+- 네트워크 왕복 없이 조회하므로 API/학습을 로컬에서 실행하거나 벤치마크/테스트 대체물로 사용
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+DEFAULT_SCHEMA_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'public', 'supabase_dump.sql'
+)
+
+# 읽기 위주 테이블 (sync_from 기본 대상)
+DEFAULT_SYNC_TABLES = ['stocks', 'financial_ratios', 'corp_codes', 'user_actions']
+
+# 증분 동기화 키 (첫 컬럼이 동기화 지점, 전체가 유일한 keyset 정렬 순서, 나머지 테이블은 전체 교체)
+INCREMENTAL_KEYS = {
+    'user_actions': ('id',),
+    'stock_prices_daily': ('trade_date', 'ticker'),
+}
+
+# 날짜 키 테이블은 동기화 지점보다 이 일수만큼 앞부터 다시 조회 (부분 기록/backfill된 거래일 반영, PriceStore.sync와 같은 기본값)
+DEFAULT_SYNC_OVERLAP_DAYS = 5
+
+# 테이블별 증분 동기화 지점 (원본에서 마지막으로 받은 키 값, 로컬 row의 MAX와 별도로 관리)
+SYNC_STATE_TABLE = '_sync_state'
+
+_CREATE_TABLE = re.compile(r'CREATE TABLE IF NOT EXISTS "public"\."(\w+)" \((.*?)\n\);', re.S)
+_CONSTRAINT = re.compile(
+    r'ALTER TABLE ONLY "public"\."(\w+)"\s+ADD CONSTRAINT "\w+" (PRIMARY KEY|UNIQUE) \(([^)]*)\);'
+)
+_SEQUENCE_DEFAULT = re.compile(r'ALTER TABLE ONLY "public"\."(\w+)" ALTER COLUMN "(\w+)" SET DEFAULT "nextval"')
+_CREATE_INDEX = re.compile(r'CREATE INDEX "(\w+)" ON "public"\."(\w+)" USING "btree" \(([^)]*)\);')
+_COLUMN = re.compile(r'\s*"(\w+)" (.+?)(?: DEFAULT (.+?))?( NOT NULL)?,?$')
+
+_FILTER_OPS = {'eq': '=', 'neq': '!=', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+
+
+class ReplicaError(Exception):
+    """지원하지 않는 쿼리 또는 스키마에 없는 테이블/컬럼"""
+    pass
+
+
+class ColumnSpec:
+    """pg_dump 컬럼 정의 (SQLite 타입 + 값 변환/기본값 규칙)"""
+
+    def __init__(self, name: str, pg_type: str, default: Optional[str]):
+        self.name = name
+        pg_type = pg_type.replace('"', '')
+        self.is_json = pg_type.endswith('[]') or pg_type.startswith('json')
+        self.is_bool = pg_type == 'boolean'
+        self.is_date = pg_type == 'date'
+        self.is_serial = False
+        if self.is_json:
+            self.sqlite_type = 'TEXT'
+        elif pg_type in ('integer', 'bigint', 'smallint', 'boolean'):
+            self.sqlite_type = 'INTEGER'
+        elif pg_type.startswith(('numeric', 'double', 'real')):
+            self.sqlite_type = 'NUMERIC'
+        else:
+            self.sqlite_type = 'TEXT'
+        self.has_timezone = 'with time zone' in pg_type
+        self.default = (default or '').replace('"', '')
+
+    def default_value(self) -> Any:
+        """insert 시 값이 없을 때의 기본값 (SQL 함수 기본값은 Python에서 계산)"""
+        default = self.default
+        if not default or default.startswith('NULL'):
+            return None
+        if default.startswith('now()'):
+            now = datetime.now(timezone.utc)
+            return now.isoformat() if self.has_timezone else now.replace(tzinfo=None).isoformat()
+        if default.startswith('gen_random_uuid()'):
+            return str(uuid.uuid4())
+        literal = default.split('::')[0].strip('()')
+        if literal in ('true', 'false'):
+            return literal == 'true'
+        if literal.startswith("'"):
+            return literal.strip("'")
+        try:
+            return int(literal)
+        except ValueError:
+            try:
+                return float(literal)
+            except ValueError:
+                return None
+
+    def to_sql(self, value: Any) -> Any:
+        if value is None:
+            return None
+        if self.is_json:
+            return json.dumps(value, ensure_ascii=False)
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return value
+
+    def from_sql(self, value: Any) -> Any:
+        if value is None:
+            return None
+        if self.is_json:
+            return json.loads(value)
+        if self.is_bool:
+            return bool(value)
+        return value
+
+
+class TableSpec:
+    def __init__(self, name: str, columns: List[ColumnSpec]):
+        self.name = name
+        self.columns = {column.name: column for column in columns}
+        self.primary_key: List[str] = []
+        self.unique_keys: List[List[str]] = []
+        self.indexes: List[Tuple[str, List[str]]] = []
+
+    def column(self, name: str) -> ColumnSpec:
+        spec = self.columns.get(name)
+        if spec is None:
+            raise ReplicaError(f"Unknown column {self.name}.{name}")
+        return spec
+
+
+def parse_schema(sql: str) -> Dict[str, TableSpec]:
+    """pg_dump 스크립트에서 public 스키마 테이블 정의 추출"""
+    tables: Dict[str, TableSpec] = {}
+    for name, body in _CREATE_TABLE.findall(sql):
+        columns = []
+        for line in body.splitlines():
+            line = line.rstrip()
+            if not line.strip() or line.strip().startswith('CONSTRAINT'):
+                continue
+            match = _COLUMN.match(line)
+            if match:
+                columns.append(ColumnSpec(match.group(1), match.group(2), match.group(3)))
+        tables[name] = TableSpec(name, columns)
+
+    def column_list(text: str) -> List[str]:
+        return [part.strip().split()[0].strip('"') for part in text.split(',')]
+
+    for name, kind, columns in _CONSTRAINT.findall(sql):
+        if name in tables:
+            if kind == 'PRIMARY KEY':
+                tables[name].primary_key = column_list(columns)
+            else:
+                tables[name].unique_keys.append(column_list(columns))
+    for name, column in _SEQUENCE_DEFAULT.findall(sql):
+        if name in tables:
+            tables[name].columns[column].is_serial = True
+    for index, name, columns in _CREATE_INDEX.findall(sql):
+        if name in tables:
+            tables[name].indexes.append((index, column_list(columns)))
+    return tables
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _after_cursor(query: Any, keys: Sequence[str], cursor: Sequence[Any]) -> Any:
+    """(keys) > cursor keyset 조건 (키 1~2개, iter_price_pages와 같은 or_ 형식)"""
+    if len(keys) == 1:
+        return query.gt(keys[0], cursor[0])
+    (first, second), (value, tie) = keys, cursor
+    tie_literal = tie if isinstance(tie, int) else f'"{tie}"'
+    return query.or_(f'{first}.gt."{value}",and({first}.eq."{value}",{second}.gt.{tie_literal})')
+
+
+def _split_top_level(text: str) -> List[str]:
+    """괄호/따옴표 밖의 콤마로 분리"""
+    parts, depth, quoted, current = [], 0, False, []
+    for ch in text:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == '(':
+            depth += 1
+        elif not quoted and ch == ')':
+            depth -= 1
+        if ch == ',' and depth == 0 and not quoted:
+            parts.append(''.join(current))
+            current = []
+        else:
+            current.append(ch)
+    parts.append(''.join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+class ReplicaResponse:
+    """postgrest APIResponse와 같은 data/count 속성"""
+
+    def __init__(self, data: List[Dict[str, Any]], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class ReplicaQuery:
+    """SQLite로 변환되는 쿼리 빌더 (supabase-py의 table() 결과와 같은 메서드 체인)"""
+
+    def __init__(self, replica: "LocalReplica", table: TableSpec):
+        self.replica = replica
+        self.spec = table
+        self.columns: Optional[List[str]] = None
+        self.count_mode: Optional[str] = None
+        self.where: List[str] = []
+        self.params: List[Any] = []
+        self.orders: List[str] = []
+        self.row_limit: Optional[int] = None
+        self.row_offset: Optional[int] = None
+        self.action = 'select'
+        self.payload: Any = None
+        self.on_conflict: Optional[List[str]] = None
+        self.ignore_duplicates = False
+        self.returning = True
+
+    # --- select / filters ---
+
+    def select(self, columns: str = '*', count: Optional[str] = None, **kwargs) -> "ReplicaQuery":
+        if columns.strip() != '*':
+            self.columns = [c.strip() for c in columns.split(',') if c.strip()]
+            for column in self.columns:
+                self.spec.column(column)
+        self.count_mode = count
+        return self
+
+    def _filter(self, column: str, op: str, value: Any) -> "ReplicaQuery":
+        sql, params = self._condition(column, op, value)
+        self.where.append(sql)
+        self.params.extend(params)
+        return self
+
+    def _condition(self, column: str, op: str, value: Any) -> Tuple[str, List[Any]]:
+        spec = self.spec.column(column)
+        if op == 'is':
+            if value is None or str(value).lower() == 'null':
+                return f"{_quote(column)} IS NULL", []
+            return f"{_quote(column)} IS ?", [spec.to_sql(str(value).lower() == 'true')]
+        if op == 'in':
+            values = list(value)
+            if not values:
+                return "0", []
+            return f"{_quote(column)} IN ({','.join('?' * len(values))})", [spec.to_sql(v) for v in values]
+        return f"{_quote(column)} {_FILTER_OPS[op]} ?", [spec.to_sql(value)]
+
+    def eq(self, column: str, value: Any) -> "ReplicaQuery":
+        return self._filter(column, 'eq', value)
+
+    def neq(self, column: str, value: Any) -> "ReplicaQuery":
+        return self._filter(column, 'neq', value)
+
+    def gt(self, column: str, value: Any) -> "ReplicaQuery":
+        return self._filter(column, 'gt', value)
+
+    def gte(self, column: str, value: Any) -> "ReplicaQuery":
+        return self._filter(column, 'gte', value)
+
+    def lt(self, column: str, value: Any) -> "ReplicaQuery":
+        return self._filter(column, 'lt', value)
+
+    def lte(self, column: str, value: Any) -> "ReplicaQuery":
+        return self._filter(column, 'lte', value)
+
+    def in_(self, column: str, values: Iterable[Any]) -> "ReplicaQuery":
+        return self._filter(column, 'in', values)
+
+    def is_(self, column: str, value: Any) -> "ReplicaQuery":
+        return self._filter(column, 'is', value)
+
+    def or_(self, filters: str, **kwargs) -> "ReplicaQuery":
+        """PostgREST 논리식 (예: a.gt."v",and(a.eq."v",b.gt.1))"""
+        sql, params = self._logic('or', filters)
+        self.where.append(f"({sql})")
+        self.params.extend(params)
+        return self
+
+    def _logic(self, operator: str, expression: str) -> Tuple[str, List[Any]]:
+        parts, params = [], []
+        for term in _split_top_level(expression):
+            nested = re.fullmatch(r'(and|or)\((.*)\)', term, re.S)
+            if nested:
+                sql, term_params = self._logic(nested.group(1), nested.group(2))
+            else:
+                match = re.fullmatch(r'(\w+)\.(eq|neq|gt|gte|lt|lte|is)\.(.*)', term, re.S)
+                if match is None:
+                    raise ReplicaError(f"Unsupported filter: {term}")
+                value = match.group(3)
+                if len(value) >= 2 and value[0] == value[-1] == '"':
+                    value = value[1:-1]
+                sql, term_params = self._condition(match.group(1), match.group(2), value)
+            parts.append(f"({sql})")
+            params.extend(term_params)
+        return f" {operator.upper()} ".join(parts), params
+
+    def order(self, column: str, desc: bool = False, nullsfirst: Optional[bool] = None, **kwargs) -> "ReplicaQuery":
+        self.spec.column(column)
+        # PostgreSQL 기본값과 동일하게 asc는 NULLS LAST, desc는 NULLS FIRST
+        nulls_first = desc if nullsfirst is None else nullsfirst
+        self.orders.append(f"{_quote(column)} {'DESC' if desc else 'ASC'} NULLS {'FIRST' if nulls_first else 'LAST'}")
+        return self
+
+    def limit(self, size: int, **kwargs) -> "ReplicaQuery":
+        self.row_limit = size
+        return self
+
+    def range(self, start: int, end: int, **kwargs) -> "ReplicaQuery":
+        self.row_offset = start
+        self.row_limit = end - start + 1
+        return self
+
+    # --- writes ---
+
+    def insert(self, rows: Any, count: Optional[str] = None, returning: Any = 'representation', upsert: bool = False, **kwargs) -> "ReplicaQuery":
+        self.action = 'upsert' if upsert else 'insert'
+        self.payload = rows if isinstance(rows, list) else [rows]
+        self.returning = getattr(returning, 'value', returning) != 'minimal'
+        return self
+
+    def upsert(self, rows: Any, on_conflict: str = '', ignore_duplicates: bool = False, returning: Any = 'representation', **kwargs) -> "ReplicaQuery":
+        self.insert(rows, returning=returning, upsert=True)
+        self.on_conflict = [c.strip() for c in on_conflict.split(',') if c.strip()] or self.spec.primary_key
+        self.ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, values: Dict[str, Any], **kwargs) -> "ReplicaQuery":
+        self.action = 'update'
+        self.payload = values
+        return self
+
+    def delete(self, **kwargs) -> "ReplicaQuery":
+        self.action = 'delete'
+        return self
+
+    # --- execution ---
+
+    def _where_sql(self) -> str:
+        return f" WHERE {' AND '.join(self.where)}" if self.where else ''
+
+    def execute(self) -> ReplicaResponse:
+        if self.action != 'select' and self.replica.read_only:
+            raise ReplicaError(f"Replica is read-only: {self.action} on {self.spec.name}")
+        if self.action in ('insert', 'upsert'):
+            return ReplicaResponse(self.replica._insert(self))
+        if self.action == 'update':
+            return ReplicaResponse(self.replica._update(self))
+        if self.action == 'delete':
+            return ReplicaResponse(self.replica._delete(self))
+        return self.replica._select(self)
+
+
+class LocalReplica:
+    """SQLite 파일 하나에 public 테이블을 복제 (스레드 간 공유, 쓰기는 락으로 직렬화)"""
+
+    def __init__(
+        self,
+        path: str = 'cache/replica.sqlite3',
+        schema_path: str = DEFAULT_SCHEMA_PATH,
+        read_only: bool = False
+    ):
+        """
+        Args:
+            path: SQLite 파일 경로 (':memory:'이면 프로세스 메모리에만 유지)
+            schema_path: pg_dump 스키마 파일 (public/supabase_dump.sql)
+            read_only: 쿼리 빌더의 insert/upsert/update/delete 거부 (sync_from은 허용)
+        """
+        self.path = path
+        self.read_only = read_only
+        with open(schema_path, encoding='utf-8') as f:
+            self.tables = parse_schema(f.read())
+
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        if path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._create_tables()
+
+        self.queries = 0
+        self.rows_synced: Dict[str, int] = {}
+
+    def _create_tables(self):
+        with self._lock:
+            for spec in self.tables.values():
+                definitions = []
+                for column in spec.columns.values():
+                    if column.is_serial and spec.primary_key == [column.name]:
+                        # 시퀀스 기본값 -> SQLite rowid 자동 증가
+                        definitions.append(f"{_quote(column.name)} INTEGER PRIMARY KEY")
+                    else:
+                        definitions.append(f"{_quote(column.name)} {column.sqlite_type}")
+                self._conn.execute(f"CREATE TABLE IF NOT EXISTS {_quote(spec.name)} ({', '.join(definitions)})")
+                for columns in ([spec.primary_key] if spec.primary_key else []) + spec.unique_keys:
+                    name = f"{spec.name}_{'_'.join(columns)}_key"
+                    self._conn.execute(
+                        f"CREATE UNIQUE INDEX IF NOT EXISTS {_quote(name)} ON {_quote(spec.name)} "
+                        f"({', '.join(_quote(c) for c in columns)})"
+                    )
+                for name, columns in spec.indexes:
+                    self._conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS {_quote(name)} ON {_quote(spec.name)} "
+                        f"({', '.join(_quote(c) for c in columns)})"
+                    )
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {_quote(SYNC_STATE_TABLE)} "
+                f"(table_name TEXT PRIMARY KEY, key_column TEXT, watermark TEXT)"
+            )
+
+    def table(self, name: str) -> ReplicaQuery:
+        spec = self.tables.get(name)
+        if spec is None:
+            raise ReplicaError(f"Unknown table: {name}")
+        return ReplicaQuery(self, spec)
+
+    # --- query execution (ReplicaQuery에서 호출) ---
+
+    def _decode(self, spec: TableSpec, names: Sequence[str], rows: List[tuple]) -> List[Dict[str, Any]]:
+        columns = [spec.columns[name] for name in names]
+        plain = all(not (c.is_json or c.is_bool) for c in columns)
+        if plain:
+            return [dict(zip(names, row)) for row in rows]
+        return [{c.name: c.from_sql(v) for c, v in zip(columns, row)} for row in rows]
+
+    def _select(self, query: ReplicaQuery) -> ReplicaResponse:
+        spec = query.spec
+        names = query.columns or list(spec.columns)
+        sql = f"SELECT {', '.join(_quote(n) for n in names)} FROM {_quote(spec.name)}{query._where_sql()}"
+        if query.orders:
+            sql += f" ORDER BY {', '.join(query.orders)}"
+        if query.row_limit is not None or query.row_offset is not None:
+            sql += f" LIMIT {int(query.row_limit if query.row_limit is not None else -1)} OFFSET {int(query.row_offset or 0)}"
+
+        with self._lock:
+            self.queries += 1
+            rows = self._conn.execute(sql, query.params).fetchall()
+            count = None
+            if query.count_mode:
+                count = self._conn.execute(
+                    f"SELECT COUNT(*) FROM {_quote(spec.name)}{query._where_sql()}", query.params
+                ).fetchone()[0]
+        return ReplicaResponse(self._decode(spec, names, rows), count)
+
+    def _prepare_rows(self, spec: TableSpec, rows: List[Dict[str, Any]], fill_defaults: bool) -> Tuple[List[str], List[tuple]]:
+        names = list(dict.fromkeys(name for row in rows for name in row))
+        for name in names:
+            spec.column(name)
+        if fill_defaults:
+            # 없는 컬럼은 스키마 기본값 (serial 컬럼은 SQLite가 채움)
+            names += [
+                c.name for c in spec.columns.values()
+                if c.name not in names and c.default and not c.is_serial
+            ]
+        values = []
+        for row in rows:
+            item = []
+            for name in names:
+                column = spec.columns[name]
+                value = row[name] if name in row else (column.default_value() if fill_defaults else None)
+                item.append(column.to_sql(value))
+            values.append(tuple(item))
+        return names, values
+
+    def _insert(self, query: ReplicaQuery) -> List[Dict[str, Any]]:
+        spec = query.spec
+        rows = query.payload or []
+        if not rows:
+            return []
+        names, values = self._prepare_rows(spec, rows, fill_defaults=True)
+        sql = (
+            f"INSERT INTO {_quote(spec.name)} ({', '.join(_quote(n) for n in names)}) "
+            f"VALUES ({', '.join('?' * len(names))})"
+        )
+        if query.action == 'upsert':
+            conflict = query.on_conflict or spec.primary_key
+            provided = [n for n in dict.fromkeys(name for row in rows for name in row) if n not in conflict]
+            sql += f" ON CONFLICT ({', '.join(_quote(c) for c in conflict)}) "
+            if query.ignore_duplicates or not provided:
+                sql += "DO NOTHING"
+            else:
+                sql += "DO UPDATE SET " + ', '.join(f"{_quote(n)} = excluded.{_quote(n)}" for n in provided)
+        if query.returning:
+            sql += " RETURNING " + ', '.join(_quote(n) for n in spec.columns)
+
+        with self._lock:
+            self.queries += 1
+            self._conn.execute('BEGIN')
+            try:
+                returned = []
+                if query.returning:
+                    for item in values:
+                        returned.extend(self._conn.execute(sql, item).fetchall())
+                else:
+                    self._conn.executemany(sql, values)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return self._decode(spec, list(spec.columns), returned) if query.returning else []
+
+    def _update(self, query: ReplicaQuery) -> List[Dict[str, Any]]:
+        spec = query.spec
+        names = list(query.payload)
+        assignments = ', '.join(f"{_quote(n)} = ?" for n in names)
+        params = [spec.column(n).to_sql(query.payload[n]) for n in names] + query.params
+        sql = f"UPDATE {_quote(spec.name)} SET {assignments}{query._where_sql()} RETURNING " + ', '.join(_quote(n) for n in spec.columns)
+        with self._lock:
+            self.queries += 1
+            rows = self._conn.execute(sql, params).fetchall()
+        return self._decode(spec, list(spec.columns), rows)
+
+    def _delete(self, query: ReplicaQuery) -> List[Dict[str, Any]]:
+        spec = query.spec
+        sql = f"DELETE FROM {_quote(spec.name)}{query._where_sql()} RETURNING " + ', '.join(_quote(n) for n in spec.columns)
+        with self._lock:
+            self.queries += 1
+            rows = self._conn.execute(sql, query.params).fetchall()
+        return self._decode(spec, list(spec.columns), rows)
+
+    # --- sync ---
+
+    def sync_from(
+        self,
+        source: Any,
+        tables: Optional[List[str]] = None,
+        page_size: int = 1000,
+        overlap_days: int = DEFAULT_SYNC_OVERLAP_DAYS
+    ) -> Dict[str, int]:
+        """
+        Supabase(또는 같은 쿼리 빌더를 가진 클라이언트)에서 테이블 복사
+
+        Args:
+            source: 원본 클라이언트
+            tables: 복사할 테이블 (기본: DEFAULT_SYNC_TABLES)
+            page_size: 페이지 크기
+            overlap_days: 날짜 증분 키 테이블을 동기화 지점 이전 몇 달력일부터 다시 조회할지
+
+        Returns:
+            테이블별 복사한 row 수 (overlap 구간 재조회 row 포함)
+        """
+        synced = {}
+        for name in tables or DEFAULT_SYNC_TABLES:
+            spec = self.tables.get(name)
+            if spec is None:
+                raise ReplicaError(f"Unknown table: {name}")
+            keys = INCREMENTAL_KEYS.get(name)
+            if keys is None:
+                count = self._sync_replace(source, spec, page_size)
+            else:
+                count = self._sync_incremental(source, spec, keys, page_size, overlap_days)
+
+            synced[name] = count
+            self.rows_synced[name] = self.rows_synced.get(name, 0) + count
+            print(f"[Replica] Synced {count} rows into {name}")
+        return synced
+
+    def _sync_replace(self, source: Any, spec: TableSpec, page_size: int) -> int:
+        """테이블 전체를 primary key 순서의 offset 페이지로 받아 교체"""
+        order_columns = spec.primary_key or list(spec.columns)[:1]
+        rows: List[Dict[str, Any]] = []
+        offset = 0
+        while True:
+            query = source.table(spec.name).select('*')
+            for column in order_columns:
+                query = query.order(column, desc=False)
+            page = query.range(offset, offset + page_size - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                break
+            offset += page_size
+        self._replace(spec, rows)
+        return len(rows)
+
+    def _sync_incremental(
+        self,
+        source: Any,
+        spec: TableSpec,
+        keys: Sequence[str],
+        page_size: int,
+        overlap_days: int
+    ) -> int:
+        """
+        동기화 지점(첫 키 컬럼) 이후 row를 keyset 페이지로 받아 upsert
+        - 정렬 키 전체가 유일하므로 같은 날짜의 row가 페이지 경계에서 중복/누락되지 않음
+        """
+        key = keys[0]
+        watermark = self._watermark(spec.name, key)
+        since = watermark
+        if since is not None and spec.column(key).is_date:
+            since = (date.fromisoformat(str(since)[:10]) - timedelta(days=max(0, overlap_days))).isoformat()
+
+        count, cursor = 0, None
+        while True:
+            query = source.table(spec.name).select('*')
+            if since is not None:
+                query = query.gte(key, since)
+            if cursor is not None:
+                query = _after_cursor(query, keys, cursor)
+            for column in keys:
+                query = query.order(column, desc=False)
+            rows = query.limit(page_size).execute().data or []
+            if rows:
+                self._insert(ReplicaQuery(self, spec).upsert(rows, returning='minimal'))
+                # 키 오름차순이므로 마지막 row가 지금까지 받은 최대값 (overlap 재조회 중에는 뒤로 가지 않음)
+                last = rows[-1].get(key)
+                if last is not None and spec.column(key).is_date:
+                    last = str(last)[:10]
+                if last is not None and (watermark is None or last > watermark):
+                    watermark = last
+                    self._set_watermark(spec.name, key, last)
+                cursor = [rows[-1][column] for column in keys]
+            count += len(rows)
+            if len(rows) < page_size:
+                return count
+
+    def _watermark(self, table: str, key: str) -> Optional[Any]:
+        """원본에서 마지막으로 받은 증분 키 값 (처음이거나 키가 바뀌었으면 None -> 전체 조회)"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT key_column, watermark FROM {_quote(SYNC_STATE_TABLE)} WHERE table_name = ?", (table,)
+            ).fetchone()
+        if row is None or row[0] != key or row[1] is None:
+            return None
+        return json.loads(row[1])
+
+    def _set_watermark(self, table: str, key: str, value: Any):
+        if value is None:
+            return
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO {_quote(SYNC_STATE_TABLE)} (table_name, key_column, watermark) VALUES (?, ?, ?) "
+                f"ON CONFLICT (table_name) DO UPDATE SET key_column = excluded.key_column, watermark = excluded.watermark",
+                (table, key, json.dumps(value, default=str))
+            )
+
+    def _replace(self, spec: TableSpec, rows: List[Dict[str, Any]]):
+        """테이블 전체를 한 트랜잭션으로 교체 (읽는 쪽은 이전/새 내용 중 하나만 봄)"""
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                self._conn.execute(f"DELETE FROM {_quote(spec.name)}")
+                if rows:
+                    names, values = self._prepare_rows(spec, rows, fill_defaults=True)
+                    self._conn.executemany(
+                        f"INSERT INTO {_quote(spec.name)} ({', '.join(_quote(n) for n in names)}) "
+                        f"VALUES ({', '.join('?' * len(names))})",
+                        values
+                    )
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def row_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                name: self._conn.execute(f"SELECT COUNT(*) FROM {_quote(name)}").fetchone()[0]
+                for name in self.tables
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'tables': len(self.tables),
+            'read_only': self.read_only,
+            'queries': self.queries,
+            'rows_synced': dict(self.rows_synced),
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,19 +1,33 @@
 """
 User Action Logger for ML Training Data Collection
 사용자 행동을 Supabase에 기록하여 XGBoost 학습 데이터로 활용
+- writer가 있으면 요청 스레드는 큐에만 넣고 bulk insert는 백그라운드에서 처리
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from supabase import Client
 import os
 
+from db import get_supabase_client
+from action_writer import BatchedActionWriter
+
 
 class UserActionLogger:
     """사용자 행동 로깅 클래스"""
     
-    def __init__(self, supabase_client: Client):
-        self.supabase = supabase_client
+    def __init__(
+        self,
+        supabase_client: Optional[Client] = None,
+        writer: Optional[BatchedActionWriter] = None
+    ):
+        """
+        Args:
+            supabase_client: Supabase 클라이언트 (기본값은 프로세스 공유 클라이언트, DATA_SOURCE와 무관하게 항상 Supabase에 기록)
+            writer: 배치 기록기 (None이면 호출마다 동기 insert)
+        """
+        self.supabase = supabase_client or get_supabase_client()
+        self.writer = writer
         
     def _log_action(
         self,
@@ -45,6 +59,10 @@ class UserActionLogger:
             # None 값 제거
             data = {k: v for k, v in data.items() if v is not None}
             
+            if self.writer is not None:
+                # 큐에 넣은 row를 반환 (큐가 가득 차 버려졌으면 None)
+                return [data] if self.writer.enqueue(data) else None
+            
             result = self.supabase.table('user_actions').insert(data).execute()
             return result.data
             
@@ -75,6 +93,53 @@ class UserActionLogger:
             rank_position=rank_position
         )
     
+    def log_recommendation_response(
+        self,
+        user_id: str,
+        mbti: str,
+        themes: List[Dict[str, Any]]
+    ) -> int:
+        """
+        추천 응답 전체 노출 로깅 (테마 x 종목을 한 번의 bulk write로 기록)
+        - log_recommendation_view를 종목마다 호출하는 대신 화면에 표시된 응답 단위로 호출
+
+        Args:
+            user_id: 사용자 ID
+            mbti: MBTI 타입
+            themes: [{"id", "title", "stocks": [{"ticker", "rank_position"(선택)}]}]
+                    (/recommend/themes 응답을 그대로 전달해도 됨, rank_position이 없으면 목록 순서)
+
+        Returns:
+            기록(또는 큐에 추가)된 노출 수
+        """
+        timestamp = datetime.utcnow().isoformat()
+        rows = []
+        for theme in themes:
+            for position, stock in enumerate(theme.get('stocks', []), start=1):
+                rows.append({
+                    "user_id": user_id,
+                    "mbti": mbti.upper(),
+                    "action_type": "view",
+                    "stock_ticker": stock['ticker'],
+                    "theme_id": theme.get('id'),
+                    "theme_title": theme.get('title'),
+                    "rank_position": stock.get('rank_position') or position,
+                    "timestamp": timestamp
+                })
+
+        if not rows:
+            return 0
+
+        if self.writer is not None:
+            return self.writer.enqueue_many(rows)
+
+        try:
+            self.supabase.table('user_actions').insert(rows).execute()
+            return len(rows)
+        except Exception as e:
+            print(f"[Logger Error] Failed to log {len(rows)} impressions: {e}")
+            return 0
+    
     def log_stock_click(
         self,
         user_id: str,
@@ -202,11 +267,14 @@ class UserActionLogger:
 _logger_instance: Optional[UserActionLogger] = None
 
 
-def init_logger(supabase_client: Client):
+def init_logger(
+    supabase_client: Optional[Client] = None,
+    writer: Optional[BatchedActionWriter] = None
+):
     """로거 초기화 (앱 시작 시 한 번 호출)"""
     global _logger_instance
-    _logger_instance = UserActionLogger(supabase_client)
-    print("[Logger] User action logger initialized")
+    _logger_instance = UserActionLogger(supabase_client, writer)
+    print(f"[Logger] User action logger initialized ({'batched' if writer else 'sync'})")
 
 
 def get_logger() -> UserActionLogger:
@@ -1,15 +1,33 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Response
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict
+from typing import Annotated, List, Optional, Dict
 import os
+import numpy as np
 from dotenv import load_dotenv
-from supabase import create_client, Client
 from fastapi.middleware.cors import CORSMiddleware
 
 # Custom Modules
-from ranker import get_themes_for_mbti, score_stock
+from ranker import get_themes_for_mbti, get_theme_catalog
+from rule_engine import StockColumns, score_columns, make_rng
+from selection import DiverseTopKSelector
+from response_cache import ResponseCache, seed_for_key
 from logger import init_logger, get_logger
-from hybrid_ranker import get_hybrid_ranker
+from action_writer import BatchedActionWriter
+from hybrid_ranker import HybridStockRanker, get_hybrid_ranker
+from stock_universe import init_stock_universe, get_stock_universe, StockUniverseSnapshot
+from feature_store import StockFeatureStore
+from indicators import IndicatorEngine
+from price_store import PriceStore
+from score_tables import MBTIScoreTable, ScoreTableStore
+from db import get_data_source, get_async_data_source, get_supabase_client, close_supabase_client, close_async_supabase_client, close_local_replica
+from concurrency import BoundedExecutor, QueueFullError
+from ml.registry import init_model_registry, get_model_registry
+from metrics import (
+    get_metrics_registry, cache_collectors, pipeline_context, pipeline_timer, stage_timer,
+    THEME_CANDIDATES, SCORING_PATH_TOTAL, RANKER_MODE_TOTAL
+)
+from profiling import init_profiler
 
 # Load env variables from root directory
 load_dotenv(dotenv_path="../.env")
@@ -30,14 +48,135 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize Supabase Client (global)
-SUPABASE_URL = os.environ.get("VITE_SUPABASE_URL")
-SUPABASE_KEY = os.environ.get("VITE_SUPABASE_ANON_KEY")
-supabase_client = create_client(SUPABASE_URL, SUPABASE_KEY) if SUPABASE_URL and SUPABASE_KEY else None
+# Initialize Data Source (global, pooled Supabase client or DATA_SOURCE=replica local SQLite replica)
+supabase_client = get_data_source()
+
+# Initialize Logger (ACTION_LOG_BATCHED=0 for one insert per action)
+# user_actions는 DATA_SOURCE=replica여도 항상 Supabase에 기록 (복제본은 읽기 전용)
+action_log_client = get_supabase_client()
+if action_log_client:
+    action_writer = None
+    if os.environ.get("ACTION_LOG_BATCHED", "1") == "1":
+        action_writer = BatchedActionWriter(
+            action_log_client,
+            batch_size=int(os.environ.get("ACTION_LOG_BATCH_SIZE", 100)),
+            flush_interval=float(os.environ.get("ACTION_LOG_FLUSH_INTERVAL", 1.0)),
+            max_queue=int(os.environ.get("ACTION_LOG_MAX_QUEUE", 10000)),
+            enqueue_timeout=float(os.environ.get("ACTION_LOG_ENQUEUE_TIMEOUT", 0)),
+            max_retries=int(os.environ.get("ACTION_LOG_MAX_RETRIES", 3)),
+            spill_path=os.environ.get("ACTION_LOG_SPILL_PATH", "logs/user_actions_spill.jsonl")
+        )
+    init_logger(action_log_client, action_writer)
+
+# Per-stock ML feature block, built once per snapshot version and memory-mapped from disk
+# FEATURE_STORE_DIR를 빈 값으로 두면 디스크에 저장하지 않음
+feature_store = StockFeatureStore(directory=os.environ.get("FEATURE_STORE_DIR", "cache/features") or None)
+
+# Precomputed MBTI x category score tables, rebuilt per snapshot (SCORE_TABLES=0 disables lookup)
+# SCORE_TABLES_DIR를 빈 값으로 두면 디스크에 저장하지 않음
+SCORE_TABLES_ENABLED = os.environ.get("SCORE_TABLES", "1") == "1"
+SCORE_TABLES_AUTO_BUILD = os.environ.get("SCORE_TABLES_AUTO_BUILD", "1") == "1"
+score_table_store = ScoreTableStore(directory=os.environ.get("SCORE_TABLES_DIR", "cache/score_tables") or None)
+
+# Technical indicators (RSI / realized volatility / momentum / beta) from stock_prices_daily
+# INDICATORS=1로 활성화 (최초 로드 시 최근 INDICATOR_LOOKBACK_DAYS 거래일을 조회하고 이후에는 새 거래일만 조회)
+# PRICE_STORE_DIR의 로컬 가격 저장소를 동기화해 읽음 (빈 값이면 저장소 없이 REST로 조회)
+indicator_engine = None
+if supabase_client and os.environ.get("INDICATORS", "0") == "1":
+    price_store_dir = os.environ.get("PRICE_STORE_DIR", "cache/prices")
+    indicator_engine = IndicatorEngine(
+        supabase_client,
+        lookback_days=int(os.environ.get("INDICATOR_LOOKBACK_DAYS", 120)),
+        index_ticker=os.environ.get("INDICATOR_INDEX_TICKER") or None,
+        price_store=PriceStore(directory=price_store_dir) if price_store_dir else None
+    )
 
-# Initialize Logger
+# Initialize Stock Universe Snapshot Cache
 if supabase_client:
-    init_logger(supabase_client)
+    init_stock_universe(
+        supabase_client,
+        ttl_seconds=float(os.environ.get("STOCK_UNIVERSE_TTL", 300)),
+        check_interval=float(os.environ.get("STOCK_UNIVERSE_CHECK_INTERVAL", 30)),
+        feature_store=feature_store,
+        indicator_engine=indicator_engine
+    )
+
+# Top-K / Diversity settings
+RECOMMEND_TOP_K = int(os.environ.get("RECOMMEND_TOP_K", 10))
+RECOMMEND_DIVERSITY_DEPTH = int(os.environ.get("RECOMMEND_DIVERSITY_DEPTH", 3))
+
+# Response Cache (0 disables caching)
+# RECOMMEND_NOISE_SEED를 지정하면 캐시 키별로 노이즈가 고정되어 캐시/재계산 결과가 일치
+response_cache = ResponseCache(max_entries=int(os.environ.get("RESPONSE_CACHE_SIZE", 256)))
+RECOMMEND_NOISE_SEED = os.environ.get("RECOMMEND_NOISE_SEED")
+
+# CPU-bound scoring runs on a bounded thread pool so the event loop stays responsive
+# RECOMMEND_MAX_QUEUE: 실행 대기 요청 상한 (초과 시 503, 0이면 제한 없음)
+recommend_executor = BoundedExecutor(
+    max_workers=int(os.environ.get("RECOMMEND_WORKERS", min(4, os.cpu_count() or 1))),
+    max_queue=int(os.environ.get("RECOMMEND_MAX_QUEUE", 100)),
+    name="recommend"
+)
+
+# Initialize ML Model Registry (shared read-only boosters)
+init_model_registry(
+    max_models=int(os.environ.get("MODEL_REGISTRY_MAX", 0)) or None,
+    mtime_check_interval=float(os.environ.get("MODEL_MTIME_CHECK_INTERVAL", 5)),
+    prefer_compiled=os.environ.get("MODEL_PREFER_COMPILED", "1") == "1"
+)
+
+# On-demand CPU profiling of single requests (collapsed stacks in PROFILE_DIR, listed at /profiles)
+# PROFILING=1이면 X-Profile: 1 헤더가 붙은 요청을, PROFILE_SAMPLE_RATE > 0이면 그 비율만큼 무작위로 프로파일링
+request_profiler = init_profiler(
+    directory=os.environ.get("PROFILE_DIR", "profiles"),
+    header_enabled=os.environ.get("PROFILING", "0") == "1",
+    sample_rate=float(os.environ.get("PROFILE_SAMPLE_RATE", 0)),
+    interval=float(os.environ.get("PROFILE_INTERVAL_MS", 5)) / 1000,
+    max_captures=int(os.environ.get("PROFILE_MAX_CAPTURES", 50))
+)
+
+# Cache hit rates for /metrics (read from each cache's stats() at scrape time)
+_cache_requests, _cache_hit_ratio = cache_collectors({
+    'responses': response_cache.stats,
+    'universe': lambda: get_stock_universe().stats() if supabase_client else {},
+    'models': lambda: get_model_registry().stats(),
+    'score_tables': score_table_store.stats,
+})
+get_metrics_registry().register_collector(
+    'mbti_cache_requests_total', 'Cache lookups by cache and result', _cache_requests, kind='counter'
+)
+get_metrics_registry().register_collector(
+    'mbti_cache_hit_ratio', 'Cache hit ratio since process start', _cache_hit_ratio
+)
+
+@app.on_event("startup")
+def start_stock_universe():
+    if supabase_client:
+        get_stock_universe().start()
+
+@app.on_event("startup")
+def preload_models():
+    if os.environ.get("MODEL_PRELOAD", "1") == "1":
+        get_model_registry().preload()
+
+@app.on_event("startup")
+def start_action_writer():
+    if action_log_client and get_logger().writer:
+        get_logger().writer.start()
+
+@app.on_event("shutdown")
+def flush_action_writer():
+    if action_log_client and get_logger().writer:
+        get_logger().writer.close()
+
+@app.on_event("shutdown")
+async def stop_stock_universe():
+    if supabase_client:
+        get_stock_universe().stop()
+    recommend_executor.shutdown()
+    close_supabase_client()
+    close_local_replica()
+    await close_async_supabase_client()
 
 class ThemeRecommendationRequest(BaseModel):
     mbti: str
@@ -51,6 +190,20 @@ class StockItem(BaseModel):
     ai_message: str 
     metrics: Dict
 
+class ImpressionStock(BaseModel):
+    ticker: str
+    rank_position: Optional[int] = None
+
+class ImpressionTheme(BaseModel):
+    id: str
+    title: str
+    stocks: List[ImpressionStock]
+
+class ImpressionLogRequest(BaseModel):
+    user_id: str
+    mbti: str
+    themes: List[ImpressionTheme]
+
 class ThemeResponse(BaseModel):
     id: str
     title: str
@@ -63,59 +216,167 @@ class ThemeResponse(BaseModel):
 def read_root():
     return {"message": "MBTI Theme Recommendation API is running!"}
 
+@app.get("/stats/universe")
+def universe_stats():
+    if not supabase_client:
+        raise HTTPException(status_code=503, detail="Supabase not configured")
+    return get_stock_universe().stats()
+
+@app.get("/stats/features")
+def feature_store_stats():
+    return feature_store.stats()
+
+@app.get("/stats/indicators")
+def indicator_stats():
+    if indicator_engine is None:
+        raise HTTPException(status_code=503, detail="Indicator engine not enabled")
+    return indicator_engine.stats()
+
+@app.get("/stats/score-tables")
+def score_table_stats():
+    return score_table_store.stats()
+
+@app.get("/stats/models")
+def model_stats():
+    return get_model_registry().stats()
+
+@app.get("/stats/responses")
+def response_cache_stats():
+    return response_cache.stats()
+
+@app.get("/stats/actions")
+def action_writer_stats():
+    if not action_log_client or not get_logger().writer:
+        raise HTTPException(status_code=503, detail="Batched action logging not enabled")
+    return get_logger().writer.stats()
+
+@app.get("/stats/executor")
+def executor_stats():
+    return recommend_executor.stats()
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text exposition (stage latency histograms, path counters, cache hit rates)"""
+    return Response(content=get_metrics_registry().render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/profiles")
+def list_profiles(limit: int = 20):
+    """Recent CPU profile captures (newest first)"""
+    return {"profiler": request_profiler.stats(), "captures": request_profiler.list_captures(limit)}
+
+@app.get("/profiles/{name}")
+def get_profile(name: str):
+    """Collapsed stacks of one capture (flamegraph.pl / speedscope input)"""
+    path = request_profiler.capture_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain")
+
 @app.post("/recommend/themes")
-def recommend_themes(request: ThemeRecommendationRequest):
+async def recommend_themes(
+    request: ThemeRecommendationRequest,
+    response: Response = None,
+    x_profile: Annotated[Optional[str], Header()] = None
+):
+    # 프로파일링된 요청은 응답 헤더로 캡처 이름을 알려줌 (GET /profiles/{name})
+    trigger = request_profiler.trigger(x_profile) if request_profiler.enabled else None
+    with pipeline_timer('recommend_themes'):
+        themes, capture = await _recommend_themes(request, trigger)
+    if capture is not None and response is not None:
+        response.headers["X-Profile-Capture"] = capture['name']
+    return themes
+
+async def _recommend_themes(request: ThemeRecommendationRequest, trigger: Optional[str] = None):
+    """Returns (themes, profile capture metadata or None)"""
     mbti = request.mbti.upper()
     print(f"[API] Generating Themes for {mbti}...")
     
     # 1. Get Themes for MBTI (from themes.json)
-    themes = get_themes_for_mbti(mbti)
-    if not themes:
-        # Fallback if specific MBTI not found
-        themes = get_themes_for_mbti("INTJ") 
-        
-    response_themes = []
+    # Fallback to INTJ if specific MBTI not found
+    themes = get_themes_for_mbti(mbti, fallback="INTJ")
 
-    # Fetch Stock Data from Supabase DB directly
+    # Fetch Stock Data from the in-memory universe snapshot (refreshed in background)
     try:
-        # Initialize Supabase Client
-        url = os.environ.get("VITE_SUPABASE_URL")
-        key = os.environ.get("VITE_SUPABASE_ANON_KEY")
-        if not url or not key:
+        if not supabase_client:
             raise Exception("Supabase Env Vars missing")
             
-        supabase: Client = create_client(url, key)
-        
-        # Fetch all stocks
-        response = supabase.table('stocks').select('*').execute()
-        db_stocks = response.data if response.data else []
-        
-        active_candidates = []
-        for s in db_stocks:
-             # Normalize keys if needed (DB sends snake_case)
-             features = {
-                 "rsi": 50, # Default (Not in DB)
-                 "volatility": s.get('volatility', 'medium'),
-                 "change_percent": float(s.get('change_percent') or 0),
-                 "momentum": float(s.get('change_percent') or 0), # Proxy
-                 "market_cap": s.get('market_cap', 0),
-                 "close": float(s.get('price') or 0), # For price
-                 "sector": s.get('sector', ''),
-                 "dividend_yield": float(s.get('dividend_yield') or 0)
-             }
-             active_candidates.append({
-                 "ticker": s.get('ticker'),
-                 "name": s.get('name'),
-                 "currency": "KRW",
-                 "features": features
-             })
+        with stage_timer('db_fetch'):
+            snapshot = await get_stock_universe().get_async(await get_async_data_source())
+        print(f"[API] Using stock snapshot {snapshot.version} ({len(snapshot)} stocks, age {snapshot.age_seconds:.0f}s)")
              
     except Exception as e:
         print(f"DB Fetch Error: {e}")
         # Fallback to dummy if DB fails
+        snapshot = None
+
+    # 2. Serve from cache when the same (MBTI, data, model, themes) was already computed
+    try:
+        if snapshot is None:
+            return await run_recommendations(mbti, themes, None, None, trigger)
+
+        # 모델이 아직 로드되지 않았으면 version은 None이며, 로드 후에는 다른 키로 캐시됨
+        cache_key = (
+            mbti,
+            snapshot.version,
+            get_model_registry().version(mbti),
+            get_theme_catalog().version
+        )
+        rng_seed = seed_for_key(int(RECOMMEND_NOISE_SEED), cache_key) if RECOMMEND_NOISE_SEED else None
+
+        if trigger is not None:
+            # 캐시 적중은 프로파일링할 계산이 없으므로 프로파일링 요청은 캐시를 거치지 않고 계산
+            return await run_recommendations(mbti, themes, snapshot, rng_seed, trigger)
+
+        return await response_cache.get_or_compute_async(
+            cache_key,
+            lambda: recommend_executor.run(compute_recommendations, mbti, themes, snapshot, rng_seed)
+        ), None
+    except QueueFullError as e:
+        print(f"[API] Recommendation queue full: {e}")
+        raise HTTPException(status_code=503, detail="Server busy, please retry")
+
+async def run_recommendations(
+    mbti: str,
+    themes: List[Dict],
+    snapshot: Optional[StockUniverseSnapshot],
+    rng_seed: Optional[int],
+    trigger: Optional[str]
+):
+    """캐시 없이 executor에서 계산 (trigger가 있으면 그 스레드의 CPU 프로파일 캡처)"""
+    if trigger is None:
+        return await recommend_executor.run(compute_recommendations, mbti, themes, snapshot, rng_seed), None
+    return await recommend_executor.run(
+        request_profiler.profile_call, 'recommend_themes', mbti, trigger,
+        compute_recommendations, mbti, themes, snapshot, rng_seed
+    )
+
+def compute_recommendations(
+    mbti: str,
+    themes: List[Dict],
+    snapshot: Optional[StockUniverseSnapshot],
+    rng_seed: Optional[int]
+) -> List[Dict]:
+    """Executor에서 실행되는 CPU 작업 (모델 로드 + 점수 계산)"""
+    # executor 스레드는 요청의 context를 물려받지 않으므로 단계 기록용 pipeline 라벨을 다시 지정
+    with pipeline_context('recommend_themes'):
+        return _compute_recommendations(mbti, themes, snapshot, rng_seed)
+
+def _compute_recommendations(
+    mbti: str,
+    themes: List[Dict],
+    snapshot: Optional[StockUniverseSnapshot],
+    rng_seed: Optional[int]
+) -> List[Dict]:
+    if snapshot is not None:
+        active_candidates = snapshot.candidates
+        columns = snapshot.columns
+        stock_block = snapshot.feature_block.block if snapshot.feature_block is not None else None
+    else:
         active_candidates = []
+        columns = StockColumns.from_features([])
+        stock_block = None
 
-    # 2. Initialize Hybrid Ranker for this MBTI
+    # Initialize Hybrid Ranker for this MBTI
     try:
         hybrid_ranker = get_hybrid_ranker(mbti)
         use_ml = hybrid_ranker.ml_ranker is not None
@@ -124,90 +385,128 @@ def recommend_themes(request: ThemeRecommendationRequest):
         print(f"[API] Hybrid ranker init failed: {e}, falling back to rule-based")
         hybrid_ranker = None
         use_ml = False
+    RANKER_MODE_TOTAL.inc(mode='ml' if use_ml else 'rule')
+
+    # 스냅샷/모델 버전이 맞는 점수표가 있으면 조회만, 없으면 요청 시 계산 후 백그라운드에서 빌드
+    score_table = None
+    if snapshot is not None and SCORE_TABLES_ENABLED:
+        with stage_timer('score_table_lookup'):
+            score_table = score_table_store.lookup(mbti, snapshot.version)
+        if score_table is None and SCORE_TABLES_AUTO_BUILD:
+            score_table_store.build_in_background(snapshot)
+
+    return build_theme_recommendations(
+        mbti, themes, active_candidates, columns, hybrid_ranker, use_ml, make_rng(rng_seed), stock_block,
+        score_table
+    )
+
+@app.post("/log/impressions")
+def log_impressions(request: ImpressionLogRequest):
+    """Record every stock shown in one rendered /recommend/themes response"""
+    if not action_log_client:
+        raise HTTPException(status_code=503, detail="Supabase not configured")
+    themes = [theme.model_dump() for theme in request.themes]
+    logged = get_logger().log_recommendation_response(request.user_id, request.mbti, themes)
+    return {"logged": logged}
+
+def build_theme_recommendations(
+    mbti: str,
+    themes: List[Dict],
+    active_candidates: List[Dict],
+    columns: StockColumns,
+    hybrid_ranker: Optional[HybridStockRanker],
+    use_ml: bool,
+    rng: np.random.Generator,
+    stock_block: Optional[np.ndarray] = None,
+    score_table: Optional[MBTIScoreTable] = None
+) -> List[Dict]:
+    """
+    For each theme, score all candidates and pick Top K
+    (stock_block: precomputed ML stock features, score_table: precomputed scores for the same snapshot/model)
+    """
+    response_themes = []
     
-    # 3. For each theme, score all candidates and pick Top 10
-    used_tickers = set() # To encourage diversity across themes
+    # 이전 테마의 상위 종목은 다음 테마에서 살짝 밀려나도록 선택 과정에서 패널티 적용
+    selector = DiverseTopKSelector(
+        len(active_candidates),
+        k=RECOMMEND_TOP_K,
+        diversity_depth=RECOMMEND_DIVERSITY_DEPTH
+    )
     
     for theme in themes:
         category = theme.get('category', 'default')
         
         # --- Pre-filtering Candidates based on Theme Persona ---
-        candidates_for_theme = active_candidates
-        
-        if category == "배당 투자":
-            # 배당이 0인 종목은 원천 배제
-            candidates_for_theme = [c for c in active_candidates if c['features'].get('dividend_yield', 0) > 0]
-        elif category == "안전 자산":
-            # 변동성이 너무 높은 종목은 배제
-            candidates_for_theme = [c for c in active_candidates if c['features'].get('volatility') not in ['high', 'very-high']]
-        elif category == "기술주":
-            # 기술 관련 키워드가 섹터에 있는 종목 우선 (완전 배제는 아니지만 가중치용 필터링)
-            tech_keywords = ['반도체', 'IT', '소프트웨어', '과학', '기술']
-            candidates_for_theme = [c for c in active_candidates if any(k in c['features'].get('sector', '') for k in tech_keywords)]
-            # 기술주 후보가 너무 적으면 다시 전체 리스트 사용
-            if len(candidates_for_theme) < 10:
-                candidates_for_theme = active_candidates
-
-        if hybrid_ranker and use_ml:
+        with stage_timer('prefilter'):
+            theme_indices = np.arange(len(active_candidates))
+            
+            if category == "배당 투자":
+                # 배당이 0인 종목은 원천 배제
+                theme_indices = np.flatnonzero(columns.dividend_yield > 0)
+            elif category == "안전 자산":
+                # 변동성이 너무 높은 종목은 배제 (high / very-high)
+                theme_indices = np.flatnonzero(columns.volatility_score < 2.0)
+            elif category == "기술주":
+                # 기술 관련 키워드가 섹터에 있는 종목 우선 (완전 배제는 아니지만 가중치용 필터링)
+                tech_indices = np.flatnonzero(columns.sector_index.mask('tech_filter'))
+                # 기술주 후보가 너무 적으면 다시 전체 리스트 사용
+                if len(tech_indices) >= RECOMMEND_TOP_K:
+                    theme_indices = tech_indices
+
+            theme_columns = columns.take(theme_indices)
+        THEME_CANDIDATES.observe(len(theme_indices), category=category)
+
+        if score_table is not None and category in score_table:
+            # Precomputed table lookup (same scores as the request-time paths below)
+            SCORING_PATH_TOTAL.inc(path='score_table')
+            with stage_timer('score_table_scoring'):
+                scores, reason = score_table.score(category, theme_indices, theme_columns, rng, ml_weight=0.5)
+            with stage_timer('sorting'):
+                order, final_scores = selector.select(
+                    scores, theme_indices, tie_break=scores if score_table.has_ml else None
+                )
+        elif hybrid_ranker and use_ml:
             # Use Hybrid Ranker (ML + Rule)
             # 테마의 개성을 살리기 위해 ML 비중을 0.5로 낮춤 (Rule persona 강화)
-            ranked_stocks = hybrid_ranker.rank_stocks(
-                candidates_for_theme,
+            # (feature_extraction / ml_predict / rule_scoring 단계는 HybridStockRanker에서 기록)
+            SCORING_PATH_TOTAL.inc(path='hybrid')
+            scores, reason = hybrid_ranker.score_candidates(
+                [active_candidates[i] for i in theme_indices],
                 category,
                 use_ml=True,
-                ml_weight=0.5 
+                ml_weight=0.5,
+                columns=theme_columns,
+                rng=rng,
+                stock_block=stock_block[theme_indices] if stock_block is not None else None
             )
-            
-            scored_candidates = []
-            for stock_obj, score, reason in ranked_stocks:
-                features = stock_obj['features']
-                ticker = stock_obj['ticker']
-                
-                # 중복 패널티: 이미 다른 테마 상위권에 나온 종목은 점수를 약간 깎음
-                final_score = score
-                if ticker in used_tickers:
-                    final_score *= 0.8
-                
-                scored_candidates.append({
-                    "ticker": ticker,
-                    "name": stock_obj['name'],
-                    "price": features.get('close', 0),
-                    "score": int(final_score),
-                    "reason": f"{category} 적합도 {int(final_score)}점",
-                    "ai_message": reason,
-                    "metrics": features
-                })
+            # rank_stocks와 동일하게 동점이면 원래 점수(패널티 전) 내림차순
+            with stage_timer('sorting'):
+                order, final_scores = selector.select(scores, theme_indices, tie_break=scores)
         else:
             # Fallback to Rule-based only
-            scored_candidates = []
-            for cand in candidates_for_theme:
-                score, reason_text = score_stock(cand['features'], mbti, category)
-                ticker = cand['ticker']
-                
-                final_score = score
-                if ticker in used_tickers:
-                    final_score *= 0.8 # Diversity penalty
-                    
-                scored_candidates.append({
-                    "ticker": ticker,
+            SCORING_PATH_TOTAL.inc(path='rule')
+            with stage_timer('rule_scoring'):
+                rule_scores = score_columns(theme_columns, mbti, category, rng)
+            scores, reason = rule_scores.scores, rule_scores.reason
+            with stage_timer('sorting'):
+                order, final_scores = selector.select(scores, theme_indices)
+        
+        # 설명 문구는 Top K에 대해서만 생성
+        with stage_timer('response_build'):
+            top_stocks = []
+            for i, final_score in zip(order.tolist(), final_scores.tolist()):
+                cand = active_candidates[theme_indices[i]]
+                features = cand['features']
+                top_stocks.append({
+                    "ticker": cand['ticker'],
                     "name": cand['name'],
-                    "price": cand['features'].get('close', 0),
+                    "price": features.get('close', 0),
                     "score": int(final_score),
                     "reason": f"{category} 적합도 {int(final_score)}점",
-                    "ai_message": reason_text,
-                    "metrics": cand['features']
+                    "ai_message": reason(i),
+                    "metrics": features
                 })
         
-        # Sort desc
-        scored_candidates.sort(key=lambda x: x['score'], reverse=True)
-        
-        # Pick Top 10
-        top_stocks = scored_candidates[:10]
-        
-        # 이번 테마의 Top 3는 다음 테마에서 살짝 밀려나도록 기록
-        for s in top_stocks[:3]:
-            used_tickers.add(s['ticker'])
-        
         response_themes.append({
             "id": theme['id'],
             "title": theme['title'],
@@ -0,0 +1,373 @@
+"""
+In-process Metrics (Prometheus text exposition)
+추천 파이프라인 단계별 지연 시간 히스토그램과 카운터를 모아 /metrics로 노출
+- 외부 의존성 없이 Prometheus text format 0.0.4만 구현
+- Counter / Histogram은 스레드 안전 (executor 스레드에서 기록)
+- 캐시 적중률처럼 다른 모듈이 이미 세고 있는 값은 수집 시점에 stats()를 읽는 collector로 노출
+"""
+
+import bisect
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+
+# 초 단위 기본 버킷 (0.1ms ~ 10s)
+DEFAULT_LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# 테마별 후보 종목 수 버킷
+CANDIDATE_COUNT_BUCKETS = (10, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Collector가 반환하는 샘플: (메트릭 이름, 라벨, 값)
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if math.isnan(value):
+        return 'NaN'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + '}'
+
+
+class _Metric:
+    """라벨 조합별 값을 가진 메트릭 공통 부분"""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        try:
+            return tuple([str(labels[name]) for name in self.labelnames])
+        except KeyError:
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """단조 증가 카운터"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self._labels(key))} {_format_value(value)}" for key, value in items
+        ]
+
+
+class _Timer:
+    """with 블록 실행 시간(초)을 기록 (요청마다 수십 번 쓰이므로 generator 기반 contextmanager 대신 사용)"""
+
+    __slots__ = ('entry', 'start')
+
+    def __init__(self, entry: "_HistogramValue"):
+        self.entry = entry
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.entry.observe(time.perf_counter() - self.start)
+        return False
+
+
+class _HistogramValue:
+    __slots__ = ('buckets', 'counts', 'total', 'count', 'lock')
+
+    def __init__(self, buckets: Tuple[float, ...], lock: threading.Lock):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+        self.lock = lock
+
+    def observe(self, value: float):
+        # 관측값이 들어가는 첫 버킷만 세고 출력 시 누적 (+Inf는 count)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            if index < len(self.counts):
+                self.counts[index] += 1
+            self.total += value
+            self.count += 1
+
+
+class Histogram(_Metric):
+    """누적 버킷 히스토그램 (_bucket / _sum / _count)"""
+
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], _HistogramValue] = {}
+
+    def _entry(self, labels: Dict[str, str]) -> _HistogramValue:
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            with self._lock:
+                entry = self._values.get(key)
+                if entry is None:
+                    entry = self._values[key] = _HistogramValue(self.buckets, self._lock)
+        return entry
+
+    def observe(self, value: float, **labels: str):
+        self._entry(labels).observe(value)
+
+    def time(self, **labels: str) -> _Timer:
+        """with 블록 실행 시간(초)을 기록"""
+        return _Timer(self._entry(labels))
+
+    def snapshot(self, **labels: str) -> Dict[str, float]:
+        """라벨 조합의 count / sum (대시보드 없이 확인용)"""
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return {'count': entry.count, 'sum': entry.total} if entry else {'count': 0, 'sum': 0.0}
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(v.counts), v.total, v.count) for key, v in sorted(self._values.items())]
+        lines = self.header()
+        for key, counts, total, count in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}"
+                )
+            lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class _Collector:
+    """수집 시점에 값을 읽어오는 gauge/counter 묶음"""
+
+    def __init__(self, name: str, documentation: str, kind: str, collect: Callable[[], List[Sample]]):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        try:
+            samples = self.collect()
+        except Exception as e:
+            print(f"[Metrics] Collector {self.name} failed: {e}")
+            return []
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for name, labels, value in samples:
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(float(value))}")
+        return lines
+
+
+class MetricsRegistry:
+    """메트릭 등록 + text exposition 렌더링"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(
+        self,
+        name: str,
+        documentation: str,
+        collect: Callable[[], List[Sample]],
+        kind: str = 'gauge'
+    ):
+        """
+        수집 시점에 collect()를 호출해 샘플을 출력
+
+        Args:
+            name: 메트릭 이름 (샘플 이름도 같아야 함)
+            collect: [(이름, 라벨, 값), ...]을 반환하는 함수
+            kind: 'gauge' 또는 'counter'
+        """
+        # 같은 이름으로 다시 등록하면 새 collect 함수로 교체 (앱 모듈 재import 시 새 캐시 객체를 읽도록)
+        self.unregister(name)
+        return self._register(_Collector(name, documentation, kind, collect))
+
+    def unregister(self, name: str):
+        with self._lock:
+            self._metrics.pop(name, None)
+
+    def render(self) -> str:
+        """Prometheus text format (Content-Type: text/plain; version=0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+def cache_collectors(caches: Dict[str, Callable[[], Dict]]) -> Tuple[Callable[[], List[Sample]], Callable[[], List[Sample]]]:
+    """
+    stats()에 hits / misses를 가진 캐시들의 요청 카운터 / 적중률 collector
+    (stale_hits는 적중, coalesced(single-flight 대기)는 미스로 계산)
+
+    Args:
+        caches: 캐시 이름 -> stats 함수 (response_cache.stats 등)
+
+    Returns:
+        (mbti_cache_requests_total collector, mbti_cache_hit_ratio collector)
+    """
+    def lookups() -> List[Tuple[str, Dict]]:
+        return [(name, stats()) for name, stats in caches.items()]
+
+    def requests() -> List[Sample]:
+        samples = []
+        for name, stats in lookups():
+            for result in ('hits', 'stale_hits', 'coalesced', 'misses'):
+                if result in stats:
+                    samples.append(('mbti_cache_requests_total', {'cache': name, 'result': result}, stats[result]))
+        return samples
+
+    def hit_ratio() -> List[Sample]:
+        samples = []
+        for name, stats in lookups():
+            hits = stats.get('hits', 0) + stats.get('stale_hits', 0)
+            total = hits + stats.get('misses', 0) + stats.get('coalesced', 0)
+            samples.append(('mbti_cache_hit_ratio', {'cache': name}, hits / total if total else 0.0))
+        return samples
+
+    return requests, hit_ratio
+
+
+# 프로세스 전역 레지스트리와 추천 파이프라인 메트릭
+REGISTRY = MetricsRegistry()
+
+RECOMMEND_STAGE_SECONDS = REGISTRY.histogram(
+    'mbti_recommend_stage_seconds',
+    'Time spent in each stage of /recommend/themes and HybridStockRanker.rank_stocks',
+    ['pipeline', 'stage']
+)
+PIPELINE_SECONDS = REGISTRY.histogram(
+    'mbti_pipeline_seconds',
+    'End-to-end latency of recommend_themes / rank_stocks calls',
+    ['pipeline']
+)
+THEME_CANDIDATES = REGISTRY.histogram(
+    'mbti_theme_candidates',
+    'Candidate stocks scored per theme after category pre-filtering',
+    ['category'],
+    buckets=CANDIDATE_COUNT_BUCKETS
+)
+SCORING_PATH_TOTAL = REGISTRY.counter(
+    'mbti_scoring_path_total',
+    'Themes scored per path (score_table lookup, hybrid ML+rule, rule-only)',
+    ['path']
+)
+RANKER_MODE_TOTAL = REGISTRY.counter(
+    'mbti_ranker_mode_total',
+    'Recommendation computations by ranker mode (ml when a model is loaded for the MBTI)',
+    ['mode']
+)
+ML_PREDICT_ERRORS_TOTAL = REGISTRY.counter(
+    'mbti_ml_predict_errors_total',
+    'ML predictions that failed and fell back to zero scores'
+)
+
+
+# 단계 기록이 어느 파이프라인 안에서 일어났는지 (점수표 빌드처럼 같은 코드를 쓰는 백그라운드 작업 구분)
+# run_in_executor는 context를 복사하지 않으므로 작업 스레드 안에서 pipeline_context로 지정
+_current_pipeline: contextvars.ContextVar = contextvars.ContextVar('mbti_pipeline', default='other')
+
+
+@contextmanager
+def pipeline_context(pipeline: str) -> Iterator[None]:
+    """with 블록 안의 stage_timer 기록에 pipeline 라벨 지정 (시간은 재지 않음)"""
+    token = _current_pipeline.set(pipeline)
+    try:
+        yield
+    finally:
+        _current_pipeline.reset(token)
+
+
+@contextmanager
+def pipeline_timer(pipeline: str) -> Iterator[None]:
+    """pipeline_context + 전체 시간을 mbti_pipeline_seconds에 기록"""
+    with pipeline_context(pipeline), PIPELINE_SECONDS.time(pipeline=pipeline):
+        yield
+
+
+def stage_timer(stage: str):
+    """추천 단계 타이머 (with stage_timer('rule_scoring'): ...)"""
+    return RECOMMEND_STAGE_SECONDS.time(pipeline=_current_pipeline.get(), stage=stage)
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """프로세스 전역 메트릭 레지스트리"""
+    return REGISTRY
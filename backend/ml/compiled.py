@@ -0,0 +1,290 @@
+"""
+Compiled Tree Ensemble for XGBoost Rankers
+XGBoost JSON 모델을 평탄화된 배열(노드 단위)로 변환하고 NumPy만으로 예측
+- API worker는 xgboost/DMatrix 없이 작은 배치를 바로 예측
+- 예측값은 Booster.predict와 같음 (float32 비교 규칙, missing은 default_left 방향)
+- .npz에 원본 JSON의 SHA-256을 기록해 레지스트리가 JSON과 일치하는 컴파일 모델만 사용
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+# 컴파일 모델 파일 형식 버전 (배열 구성이 바뀌면 올림)
+COMPILED_FORMAT = 1
+
+# 한 번에 평가할 행 수 (노드 배열이 CPU 캐시에 머무르는 크기로 나눠서 평가)
+PREDICT_CHUNK_ROWS = 512
+
+
+def compiled_model_path(model_path: str) -> str:
+    """{MBTI}_ranker.json -> {MBTI}_ranker.npz"""
+    return os.path.splitext(model_path)[0] + '.npz'
+
+
+def source_digest(model_path: str) -> str:
+    """원본 JSON 모델 파일의 SHA-256 (컴파일 모델이 어떤 JSON에서 만들어졌는지 확인용)"""
+    with open(model_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def read_source_digest(compiled_path: str) -> Optional[str]:
+    """컴파일 모델에 기록된 원본 JSON SHA-256 (기록이 없거나 읽을 수 없으면 None)"""
+    try:
+        with np.load(compiled_path) as data:
+            if 'source_digest' not in data.files:
+                return None
+            return str(data['source_digest'])
+    except (OSError, ValueError):
+        return None
+
+
+def _parse_base_score(value: str) -> float:
+    # XGBoost 2.x 이후는 '[5E-1]'처럼 벡터 형식으로 저장
+    return float(str(value).strip('[]').split(',')[0])
+
+
+class CompiledEnsemble:
+    """
+    평탄화된 트리 앙상블
+    - 모든 트리의 노드를 하나의 배열로 이어붙이고 roots[t]가 t번째 트리의 시작 노드
+    - leaf 노드는 left/right가 자기 자신을 가리켜 depth만큼 반복해도 제자리에 머무름
+    - 예측 시 트리를 깊이 내림차순으로 배치해 d단계에서는 깊이가 d보다 큰 트리만 진행
+    """
+
+    def __init__(
+        self,
+        roots: np.ndarray,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        default_left: np.ndarray,
+        value: np.ndarray,
+        depth: np.ndarray,
+        base_score: float,
+        num_feature: int,
+        source_digest: str = ''
+    ):
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.value = value
+        self.depth = depth
+        self.base_score = np.float32(base_score)
+        self.max_depth = int(depth.max()) if len(depth) else 0
+        self.num_feature = num_feature
+        self.source_digest = source_digest
+
+        # 예측용 배치: 깊은 트리부터, children[2*node + (오른쪽이면 1)]로 다음 노드 조회
+        self._order = np.argsort(-depth, kind='stable')
+        self._restore = np.argsort(self._order, kind='stable')
+        self._active = [int(np.count_nonzero(depth > d)) for d in range(self.max_depth)]
+        self._children = np.empty(2 * len(left), dtype=np.int32)
+        self._children[0::2] = left
+        self._children[1::2] = right
+
+    @classmethod
+    def from_model_json(cls, model: Dict[str, Any]) -> "CompiledEnsemble":
+        """
+        XGBoost JSON 모델(dict)에서 생성
+
+        Raises:
+            ValueError: gbtree가 아니거나 categorical split / 다중 출력 모델인 경우
+        """
+        learner = model['learner']
+        booster = learner['gradient_booster']
+        if booster.get('name') != 'gbtree':
+            raise ValueError(f"Unsupported booster: {booster.get('name')}")
+        params = learner['learner_model_param']
+        if int(params.get('num_class', 0)) > 1 or int(params.get('num_target', 1)) > 1:
+            raise ValueError("Multi-output models are not supported")
+
+        trees = booster['model']['trees']
+        roots, feature, threshold, left, right, default_left, value, depth = [], [], [], [], [], [], [], []
+        offset = 0
+
+        for tree in trees:
+            if any(split_type != 0 for split_type in tree.get('split_type', [])):
+                raise ValueError("Categorical splits are not supported")
+
+            tree_left = np.asarray(tree['left_children'], dtype=np.int32)
+            tree_right = np.asarray(tree['right_children'], dtype=np.int32)
+            n = len(tree_left)
+            is_leaf = tree_left == -1
+            own = np.arange(n, dtype=np.int32)
+
+            roots.append(offset)
+            feature.append(np.where(is_leaf, 0, np.asarray(tree['split_indices'], dtype=np.int32)))
+            # 내부 노드는 분기 기준값, leaf는 leaf 값 (XGBoost JSON은 같은 필드에 저장)
+            conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+            threshold.append(np.where(is_leaf, np.float32(0), conditions))
+            value.append(np.where(is_leaf, conditions, np.float32(0)))
+            left.append(np.where(is_leaf, own, tree_left) + offset)
+            right.append(np.where(is_leaf, own, tree_right) + offset)
+            default_left.append(np.asarray(tree['default_left'], dtype=bool))
+
+            depth.append(cls._depth(tree_left, tree_right))
+            offset += n
+
+        def concat(parts, dtype):
+            return np.concatenate(parts).astype(dtype) if parts else np.zeros(0, dtype=dtype)
+
+        return cls(
+            roots=np.asarray(roots, dtype=np.int32),
+            feature=concat(feature, np.int32),
+            threshold=concat(threshold, np.float32),
+            left=concat(left, np.int32),
+            right=concat(right, np.int32),
+            default_left=concat(default_left, bool),
+            value=concat(value, np.float32),
+            depth=np.asarray(depth, dtype=np.int32),
+            base_score=_parse_base_score(params.get('base_score', 0)),
+            num_feature=int(params.get('num_feature', 0))
+        )
+
+    @classmethod
+    def from_model_file(cls, model_path: str) -> "CompiledEnsemble":
+        """XGBoost JSON 모델 파일({MBTI}_ranker.json)에서 생성 (파일 SHA-256을 source_digest로 기록)"""
+        with open(model_path, 'rb') as f:
+            raw = f.read()
+        ensemble = cls.from_model_json(json.loads(raw))
+        ensemble.source_digest = hashlib.sha256(raw).hexdigest()
+        return ensemble
+
+    @staticmethod
+    def _depth(left: np.ndarray, right: np.ndarray) -> int:
+        max_depth = 0
+        stack = [(0, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if left[node] == -1:
+                max_depth = max(max_depth, depth)
+            else:
+                stack.append((int(left[node]), depth + 1))
+                stack.append((int(right[node]), depth + 1))
+        return max_depth
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Booster.predict와 같은 점수 계산
+
+        Args:
+            X: (n x num_feature) Feature 행렬 (NaN은 missing)
+
+        Returns:
+            float32 점수 배열
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        n = len(X)
+        if n == 0 or len(self.roots) == 0:
+            return np.full(n, self.base_score, dtype=np.float32)
+        if n > PREDICT_CHUNK_ROWS:
+            return np.concatenate([
+                self._predict_chunk(X[start:start + PREDICT_CHUNK_ROWS])
+                for start in range(0, n, PREDICT_CHUNK_ROWS)
+            ])
+        return self._predict_chunk(X)
+
+    def _predict_chunk(self, X: np.ndarray) -> np.ndarray:
+        n, n_cols = X.shape
+        X_flat = X.ravel()
+        has_missing = bool(np.isnan(X_flat).any())
+        row_offsets = (np.arange(n, dtype=np.intp) * n_cols)[:, None]
+
+        nodes = np.tile(self.roots[self._order], (n, 1))
+        for d in range(self.max_depth):
+            current = nodes[:, :self._active[d]]
+            x = X_flat.take(row_offsets + self.feature.take(current))
+            # NaN은 비교 결과가 False이므로 missing이면 default_left 방향을 따로 반영
+            go_left = x < self.threshold.take(current)
+            if has_missing:
+                go_left |= np.isnan(x) & self.default_left.take(current)
+            nodes[:, :self._active[d]] = self._children.take(2 * current + ~go_left)
+
+        # XGBoost와 같이 트리 순서대로 float32 누적
+        leaf_values = self.value.take(nodes)[:, self._restore]
+        scores = np.full(n, self.base_score, dtype=np.float32)
+        for t in range(leaf_values.shape[1]):
+            scores += leaf_values[:, t]
+        return scores
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            array.nbytes for array in (
+                self.roots, self.feature, self.threshold, self.left,
+                self.right, self.default_left, self.value, self.depth, self._children
+            )
+        )
+
+    @property
+    def num_trees(self) -> int:
+        return len(self.roots)
+
+    def save(self, path: str):
+        """npz 파일로 저장 (임시 파일에 쓴 뒤 교체)"""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                format=np.int32(COMPILED_FORMAT),
+                roots=self.roots,
+                feature=self.feature,
+                threshold=self.threshold,
+                left=self.left,
+                right=self.right,
+                default_left=self.default_left,
+                value=self.value,
+                depth=self.depth,
+                base_score=self.base_score,
+                num_feature=np.int32(self.num_feature),
+                source_digest=np.array(self.source_digest)
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledEnsemble":
+        with np.load(path) as data:
+            if int(data['format']) != COMPILED_FORMAT:
+                raise ValueError(f"Unsupported compiled model format: {int(data['format'])}")
+            return cls(
+                roots=data['roots'],
+                feature=data['feature'],
+                threshold=data['threshold'],
+                left=data['left'],
+                right=data['right'],
+                default_left=data['default_left'],
+                value=data['value'],
+                depth=data['depth'],
+                base_score=float(data['base_score']),
+                num_feature=int(data['num_feature']),
+                source_digest=str(data['source_digest']) if 'source_digest' in data.files else ''
+            )
+
+
+class CompiledRanker:
+    """MBTIStockRanker와 같은 predict 인터페이스의 경량 랭커 (xgboost 불필요)"""
+
+    def __init__(self, mbti_type: str, model: Optional[CompiledEnsemble] = None):
+        self.mbti = mbti_type.upper()
+        self.model = model
+
+    def load_model(self, path: str):
+        """컴파일 모델(.npz) 로드"""
+        self.model = CompiledEnsemble.load(path)
+        print(f"[{self.mbti}] Compiled model loaded from {path} ({self.model.num_trees} trees)")
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        if self.model is None:
+            raise ValueError("Model not loaded yet!")
+        return self.model.predict(X)
@@ -1,11 +1,72 @@
 """
 Feature Extractor for XGBoost Stock Ranker
 주식 데이터에서 ML 학습용 Feature 추출
+- extract_features: 종목 1개 -> Feature 리스트
+- extract_features_batch: 종목 여러 개 + MBTI/테마 1개 -> float32 행렬 (MBTI/테마 블록은 broadcast)
 """
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Sequence
+
+
+# 섹터 One-Hot 버킷별 키워드 (sector_tech, sector_finance, sector_manufacturing, sector_service)
+# 어느 버킷에도 해당하지 않는 섹터는 sector_other
+SECTOR_BUCKETS = {
+    'tech': ['기술', '반도체', 'IT'],
+    'finance': ['금융', '은행'],
+    'manufacturing': ['제조', '자동차'],
+    'service': ['서비스', '유통'],
+}
+
+VOLATILITY_LEVELS = ['low', 'medium', 'high']
+MARKET_CAP_LEVELS = ['small', 'medium', 'large']
+MBTI_LETTERS = ['I', 'E', 'N', 'S', 'T', 'F', 'J', 'P']
+THEME_KEYWORDS = ['tech', 'dividend', 'value', 'momentum', 'esg']
+
+# 한글 카테고리명을 영문 피처 키워드로 매핑
+THEME_MAP = {
+    '기술주': 'tech',
+    '신산업': 'tech',
+    '성장주': 'momentum',
+    '고성장주': 'momentum',
+    '단기 매매': 'momentum',
+    '배당 투자': 'dividend',
+    '가치 투자': 'value',
+    '역발상 투자': 'value',
+    'ESG 투자': 'esg'
+}
+
+# 종목 블록(change_percent ~ sector_other) / MBTI 블록 / 테마 블록 열 수
+STOCK_FEATURE_COUNT = 1 + len(VOLATILITY_LEVELS) + 1 + len(MARKET_CAP_LEVELS) + len(SECTOR_BUCKETS) + 1
+MBTI_FEATURE_COUNT = len(MBTI_LETTERS)
+THEME_FEATURE_COUNT = len(THEME_KEYWORDS)
+
+
+def match_keywords(values: np.ndarray, keywords: Sequence[str]) -> np.ndarray:
+    """
+    values 각 문자열의 keyword 포함 여부
+    - 섹터처럼 중복이 많은 컬럼은 고유값에 대해서만 검사한 뒤 펼침
+    """
+    if not keywords or len(values) == 0:
+        return np.zeros(len(values), dtype=bool)
+    unique_values, inverse = np.unique(values, return_inverse=True)
+    unique_hits = np.array(
+        [any(keyword in value for keyword in keywords) for value in unique_values.tolist()],
+        dtype=bool
+    )
+    return unique_hits[inverse.reshape(-1)]
+
+
+def mbti_one_hot(mbti: str) -> np.ndarray:
+    """MBTI Feature 블록 (mbti_I ... mbti_P)"""
+    return np.array([1.0 if letter in mbti else 0.0 for letter in MBTI_LETTERS], dtype=np.float32)
+
+
+def theme_one_hot(theme_category: str) -> np.ndarray:
+    """테마 Feature 블록 (theme_tech ... theme_esg)"""
+    mapped_theme = THEME_MAP.get(theme_category, theme_category.lower())
+    return np.array([1.0 if keyword in mapped_theme else 0.0 for keyword in THEME_KEYWORDS], dtype=np.float32)
 
 
 class StockFeatureExtractor:
@@ -93,61 +154,103 @@ class StockFeatureExtractor:
         
         # 5. Sector (One-Hot)
         sector = stock_data.get('sector', '')
-        features.extend([
-            1.0 if '기술' in sector or '반도체' in sector or 'IT' in sector else 0.0,
-            1.0 if '금융' in sector or '은행' in sector else 0.0,
-            1.0 if '제조' in sector or '자동차' in sector else 0.0,
-            1.0 if '서비스' in sector or '유통' in sector else 0.0,
-            1.0 if sector and not any(x in sector for x in ['기술', '반도체', 'IT', '금융', '은행', '제조', '자동차', '서비스', '유통']) else 0.0,
-        ])
+        bucket_hits = [
+            1.0 if any(x in sector for x in keywords) else 0.0
+            for keywords in SECTOR_BUCKETS.values()
+        ]
+        features.extend(bucket_hits)
+        features.append(1.0 if sector and not any(bucket_hits) else 0.0)
         
         # 6. MBTI Feature (각 차원별)
-        features.extend([
-            1.0 if 'I' in mbti else 0.0,
-            1.0 if 'E' in mbti else 0.0,
-            1.0 if 'N' in mbti else 0.0,
-            1.0 if 'S' in mbti else 0.0,
-            1.0 if 'T' in mbti else 0.0,
-            1.0 if 'F' in mbti else 0.0,
-            1.0 if 'J' in mbti else 0.0,
-            1.0 if 'P' in mbti else 0.0,
-        ])
+        features.extend([1.0 if letter in mbti else 0.0 for letter in MBTI_LETTERS])
         
         # 7. Theme Feature (One-Hot)
-        # 한글 카테고리명을 영문 피처 키워드로 매핑
-        theme_map = {
-            '기술주': 'tech',
-            '신산업': 'tech',
-            '성장주': 'momentum',
-            '고성장주': 'momentum',
-            '단기 매매': 'momentum',
-            '배당 투자': 'dividend',
-            '가치 투자': 'value',
-            '역발상 투자': 'value',
-            'ESG 투자': 'esg'
-        }
-        
-        mapped_theme = theme_map.get(theme_category, theme_category.lower())
-
-        features.extend([
-            1.0 if 'tech' in mapped_theme else 0.0,
-            1.0 if 'dividend' in mapped_theme else 0.0,
-            1.0 if 'value' in mapped_theme else 0.0,
-            1.0 if 'momentum' in mapped_theme else 0.0,
-            1.0 if 'esg' in mapped_theme else 0.0,
-        ])
+        mapped_theme = THEME_MAP.get(theme_category, theme_category.lower())
+        features.extend([1.0 if keyword in mapped_theme else 0.0 for keyword in THEME_KEYWORDS])
         
         return features
     
+    def stock_block(self, stock_data_list: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """
+        MBTI/테마와 무관한 종목 Feature 블록 (n x STOCK_FEATURE_COUNT, float32)
+        - extract_features의 1~5번 항목과 같은 값 (None 값은 키가 없는 것과 같이 취급)
+        
+        Args:
+            stock_data_list: 주식 정보 딕셔너리 리스트
+        """
+        n = len(stock_data_list)
+        block = np.zeros((n, STOCK_FEATURE_COUNT), dtype=np.float32)
+        if n == 0:
+            return block
+        
+        volatility = np.array([s.get('volatility', 'medium') for s in stock_data_list], dtype=object)
+        market_cap = np.array([s.get('market_cap', 'medium') for s in stock_data_list], dtype=object)
+        sectors = np.array([s.get('sector') or '' for s in stock_data_list], dtype=str)
+        
+        col = 0
+        block[:, col] = [float(s.get('change_percent') or 0) for s in stock_data_list]
+        col += 1
+        for level in VOLATILITY_LEVELS:
+            block[:, col] = volatility == level
+            col += 1
+        block[:, col] = [float(s.get('dividend_yield') or 0) for s in stock_data_list]
+        col += 1
+        for level in MARKET_CAP_LEVELS:
+            block[:, col] = market_cap == level
+            col += 1
+        
+        any_bucket = np.zeros(n, dtype=bool)
+        for keywords in SECTOR_BUCKETS.values():
+            hits = match_keywords(sectors, keywords)
+            any_bucket |= hits
+            block[:, col] = hits
+            col += 1
+        block[:, col] = (sectors != '') & ~any_bucket
+        
+        return block
+    
+    def with_context(self, stock_block: np.ndarray, mbti: str, theme_category: str) -> np.ndarray:
+        """
+        종목 블록 뒤에 MBTI/테마 One-Hot 블록을 broadcast하여 전체 Feature 행렬 생성
+        
+        Returns:
+            (n x 26) float32 C-contiguous 행렬
+        """
+        n = len(stock_block)
+        X = np.empty((n, STOCK_FEATURE_COUNT + MBTI_FEATURE_COUNT + THEME_FEATURE_COUNT), dtype=np.float32)
+        X[:, :STOCK_FEATURE_COUNT] = stock_block
+        X[:, STOCK_FEATURE_COUNT:STOCK_FEATURE_COUNT + MBTI_FEATURE_COUNT] = mbti_one_hot(mbti)
+        X[:, STOCK_FEATURE_COUNT + MBTI_FEATURE_COUNT:] = theme_one_hot(theme_category)
+        return X
+    
+    def extract_features_batch(
+        self,
+        stock_data_list: Sequence[Dict[str, Any]],
+        mbti: str,
+        theme_category: str
+    ) -> np.ndarray:
+        """
+        여러 종목의 Feature 행렬 추출 (MBTI/테마는 하나)
+        
+        Args:
+            stock_data_list: 주식 정보 딕셔너리 리스트
+            mbti: MBTI 타입
+            theme_category: 테마 카테고리
+        
+        Returns:
+            (종목 수 x 26) float32 행렬 (행 순서 = 입력 순서)
+        """
+        return self.with_context(self.stock_block(stock_data_list), mbti, theme_category)
+    
     def get_feature_names(self) -> List[str]:
         """Feature 이름 리스트 반환"""
         return self.feature_names
     
     def features_to_dataframe(
         self,
-        features_list: List[List[float]]
+        features_list: Any
     ) -> pd.DataFrame:
-        """Feature 리스트를 DataFrame으로 변환"""
+        """Feature 리스트 또는 행렬을 DataFrame으로 변환"""
         return pd.DataFrame(features_list, columns=self.feature_names)
 
 
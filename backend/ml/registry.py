@@ -0,0 +1,264 @@
+"""
+Model Registry for MBTI Stock Rankers
+MBTI별 XGBoost 모델을 프로세스 단위로 한 번만 로드하여 모든 요청에서 공유
+- 시작 시 16개 모델 일괄 로드 또는 LRU 상한을 둔 지연 로드
+- 모델 파일 mtime이 바뀌면 새 Booster로 교체 (hot-swap)
+- 컴파일 모델({MBTI}_ranker.npz)에 기록된 원본 해시가 현재 JSON 모델과 같으면 xgboost 없이 NumPy 평가기로 로드
+  (checkout 후 mtime은 생성 순서를 반영하지 않으므로 mtime으로 비교하지 않음)
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from ml.compiled import CompiledRanker, compiled_model_path, read_source_digest, source_digest
+
+
+# ml.trainer.MBTI_TYPES와 동일 (API worker에서 xgboost import를 피하기 위해 별도 정의)
+MBTI_TYPES = [
+    'INTJ', 'INTP', 'ENTJ', 'ENTP',
+    'INFJ', 'INFP', 'ENFJ', 'ENFP',
+    'ISTJ', 'ISFJ', 'ESTJ', 'ESFJ',
+    'ISTP', 'ISFP', 'ESTP', 'ESFP'
+]
+
+
+def _mtime(path: str) -> Optional[float]:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+class ModelEntry:
+    """로드된 모델 1개와 메타데이터"""
+
+    def __init__(self, ranker: Any, path: str, mtime: float, load_seconds: float):
+        self.ranker = ranker
+        self.path = path
+        self.mtime = mtime
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+        self.last_checked = self.loaded_at
+        self.compiled = isinstance(ranker, CompiledRanker)
+        if ranker.model is None:
+            self.size_bytes = 0
+        elif self.compiled:
+            self.size_bytes = ranker.model.nbytes
+        else:
+            self.size_bytes = len(ranker.model.save_raw())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'mtime': self.mtime,
+            'load_ms': round(self.load_seconds * 1000, 3),
+            'size_bytes': self.size_bytes,
+            'compiled': self.compiled,
+            'loaded_at': self.loaded_at,
+        }
+
+
+class ModelRegistry:
+    """MBTI -> 랭커(CompiledRanker 또는 MBTIStockRanker) 공유 레지스트리 (읽기 전용으로 제공)"""
+
+    def __init__(
+        self,
+        models_dir: str = 'ml/models',
+        max_models: Optional[int] = None,
+        mtime_check_interval: float = 5.0,
+        prefer_compiled: bool = True
+    ):
+        """
+        Args:
+            models_dir: 모델 디렉토리
+            max_models: 메모리에 유지할 최대 모델 수 (None이면 제한 없음)
+            mtime_check_interval: 모델 파일 변경 확인 주기 (초)
+            prefer_compiled: JSON 모델과 해시가 일치하는 컴파일 모델(.npz)이 있으면 사용
+        """
+        self.models_dir = models_dir
+        self.max_models = max_models
+        self.mtime_check_interval = mtime_check_interval
+        self.prefer_compiled = prefer_compiled
+
+        self._entries: "OrderedDict[str, ModelEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        # 컴파일 모델 경로 -> ((JSON mtime, npz mtime), 해시 일치 여부)
+        self._source_checks: Dict[str, Tuple[Tuple[float, float], bool]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.evictions = 0
+
+    def model_path(self, mbti: str) -> str:
+        return os.path.join(self.models_dir, f'{mbti.upper()}_ranker.json')
+
+    def _resolve(self, mbti: str) -> Tuple[str, Optional[float]]:
+        """
+        사용할 모델 파일과 mtime (파일이 없으면 mtime None)
+        - 재학습 후 아직 컴파일되지 않았거나 JSON이 교체된 경우(해시 불일치)에는 JSON 모델 사용
+        """
+        json_path = self.model_path(mbti)
+        json_mtime = _mtime(json_path)
+        if self.prefer_compiled:
+            compiled_path = compiled_model_path(json_path)
+            compiled_mtime = _mtime(compiled_path)
+            if compiled_mtime is not None and (
+                json_mtime is None or self._compiled_matches(json_path, json_mtime, compiled_path, compiled_mtime)
+            ):
+                return compiled_path, compiled_mtime
+        return json_path, json_mtime
+
+    def _compiled_matches(self, json_path: str, json_mtime: float, compiled_path: str, compiled_mtime: float) -> bool:
+        """컴파일 모델이 현재 JSON에서 만들어졌는지 (두 파일의 mtime이 그대로면 이전 결과 재사용)"""
+        key = (json_mtime, compiled_mtime)
+        cached = self._source_checks.get(compiled_path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        try:
+            matches = read_source_digest(compiled_path) == source_digest(json_path)
+        except OSError:
+            matches = False
+        if not matches:
+            print(f"[Registry] Ignoring stale compiled model {compiled_path} (source hash mismatch)")
+        self._source_checks[compiled_path] = (key, matches)
+        return matches
+
+    def _load(self, mbti: str, path: str, mtime: float) -> Optional[ModelEntry]:
+        start = time.perf_counter()
+        try:
+            if path.endswith('.npz'):
+                ranker = CompiledRanker(mbti)
+            else:
+                # xgboost는 컴파일 모델이 없을 때만 import
+                from ml.trainer import MBTIStockRanker
+                ranker = MBTIStockRanker(mbti)
+            ranker.load_model(path)
+        except Exception as e:
+            print(f"[Registry] Failed to load ML model for {mbti}: {e}")
+            return None
+        return ModelEntry(ranker, path, mtime, time.perf_counter() - start)
+
+    def _evict(self):
+        while self.max_models is not None and len(self._entries) > self.max_models:
+            mbti, _ = self._entries.popitem(last=False)
+            self.evictions += 1
+            print(f"[Registry] Evicted {mbti} (LRU)")
+
+    def get(self, mbti: str) -> Optional[Any]:
+        """
+        MBTI 모델 반환 (없으면 None)
+
+        Args:
+            mbti: MBTI 타입
+
+        Returns:
+            로드된 랭커 (predict(X) 제공, 공유 객체이므로 수정 금지)
+        """
+        mbti = mbti.upper()
+        now = time.time()
+        entry = self._entries.get(mbti)
+
+        # 빠른 경로: 최근에 mtime을 확인한 모델은 파일 시스템 접근 없이 반환
+        if entry is not None and now - entry.last_checked < self.mtime_check_interval:
+            self.hits += 1
+            with self._lock:
+                if mbti in self._entries:
+                    self._entries.move_to_end(mbti)
+            return entry.ranker
+
+        path, mtime = self._resolve(mbti)
+
+        with self._lock:
+            entry = self._entries.get(mbti)
+            if mtime is None:
+                # 파일이 사라졌으면 rule-based로 fallback 되도록 제거
+                if entry is not None:
+                    del self._entries[mbti]
+                self.misses += 1
+                return None
+
+            if entry is not None and entry.path == path and entry.mtime == mtime:
+                entry.last_checked = now
+                self._entries.move_to_end(mbti)
+                self.hits += 1
+                return entry.ranker
+
+            new_entry = self._load(mbti, path, mtime)
+            if new_entry is None:
+                # 로드 실패 시 기존 모델이 있으면 계속 사용
+                self.misses += 1
+                return entry.ranker if entry is not None else None
+
+            if entry is not None:
+                self.reloads += 1
+                print(f"[Registry] Hot-swapped ML model for {mbti} ({new_entry.load_seconds * 1000:.1f}ms)")
+            else:
+                self.misses += 1
+                print(f"[Registry] Loaded ML model for {mbti} ({new_entry.load_seconds * 1000:.1f}ms)")
+
+            self._entries[mbti] = new_entry
+            self._entries.move_to_end(mbti)
+            self._evict()
+            return new_entry.ranker
+
+    def version(self, mbti: str) -> Optional[str]:
+        """현재 로드된 모델 버전 (파일 mtime, 모델이 없으면 None)"""
+        entry = self._entries.get(mbti.upper())
+        return f"{entry.mtime:.6f}" if entry is not None else None
+
+    def preload(self, mbti_types: Optional[List[str]] = None) -> int:
+        """
+        모델 일괄 로드 (앱 시작 시 호출)
+
+        Returns:
+            로드된 모델 수
+        """
+        loaded = 0
+        for mbti in (mbti_types or MBTI_TYPES):
+            if self.get(mbti) is not None:
+                loaded += 1
+        print(f"[Registry] Preloaded {loaded} models from {self.models_dir}")
+        return loaded
+
+    def stats(self) -> Dict[str, Any]:
+        """레지스트리 카운터 및 모델별 로드 시간/크기"""
+        with self._lock:
+            models = {mbti: entry.to_dict() for mbti, entry in self._entries.items()}
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'reloads': self.reloads,
+            'evictions': self.evictions,
+            'max_models': self.max_models,
+            'loaded': len(models),
+            'total_size_bytes': sum(m['size_bytes'] for m in models.values()),
+            'models': models,
+        }
+
+
+# 싱글톤 인스턴스
+_registry_instance: Optional[ModelRegistry] = None
+
+
+def init_model_registry(
+    models_dir: str = 'ml/models',
+    max_models: Optional[int] = None,
+    mtime_check_interval: float = 5.0,
+    prefer_compiled: bool = True
+) -> ModelRegistry:
+    """레지스트리 초기화 (앱 시작 시 한 번 호출)"""
+    global _registry_instance
+    _registry_instance = ModelRegistry(models_dir, max_models, mtime_check_interval, prefer_compiled)
+    return _registry_instance
+
+
+def get_model_registry() -> ModelRegistry:
+    """레지스트리 인스턴스 가져오기 (초기화 전이면 기본 설정으로 생성)"""
+    global _registry_instance
+    if _registry_instance is None:
+        _registry_instance = ModelRegistry()
+    return _registry_instance
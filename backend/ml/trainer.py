@@ -5,16 +5,31 @@ XGBoost Stock Ranker Trainer
 
 import os
 import json
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 import xgboost as xgb
 import pandas as pd
 import numpy as np
-from typing import List, Tuple, Optional
-from datetime import datetime
+from typing import Dict, List, Tuple, Optional
+from datetime import datetime, timedelta
 from supabase import Client
 
-from ml.feature_extractor import StockFeatureExtractor, extract_stock_features_from_db
+from ml.feature_extractor import StockFeatureExtractor
+from ml.training_data import load_training_data, fetch_stocks_dict, DEFAULT_PAGE_SIZE
+from ml.compiled import CompiledEnsemble, compiled_model_path
+from db import get_data_source
+from profiling import RequestProfiler
 
 
+MBTI_TYPES = [
+    'INTJ', 'INTP', 'ENTJ', 'ENTP',
+    'INFJ', 'INFP', 'ENFJ', 'ENFP',
+    'ISTJ', 'ISFJ', 'ESTJ', 'ESFJ',
+    'ISTP', 'ISFP', 'ESTP', 'ESFP'
+]
+
 class MBTIStockRanker:
     """MBTI별 주식 랭킹 모델"""
     
@@ -22,108 +37,56 @@ class MBTIStockRanker:
         self.mbti = mbti_type.upper()
         self.model: Optional[xgb.Booster] = None
         self.feature_extractor = StockFeatureExtractor()
+        self.load_stats: Optional[Dict] = None
         
     def prepare_training_data(
         self,
-        supabase: Client
+        supabase: Optional[Client] = None,
+        stocks_dict: Optional[Dict[str, Dict]] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        after: Optional[Tuple[str, int]] = None,
+        since: Optional[str] = None,
+        min_actions: int = 10
     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
-        Supabase에서 학습 데이터 준비
+        Supabase에서 학습 데이터 준비 (user_actions를 페이지 단위로 스트리밍)
+        
+        Args:
+            supabase: Supabase 클라이언트 (기본값: 프로세스 공유 클라이언트)
+            stocks_dict: {ticker: stocks row} (None이면 stocks 테이블 조회)
+            page_size: user_actions 페이지 크기
+            after: 이 (timestamp, id) 이후의 행동만 사용 (증분 학습)
+            since: 이 timestamp 이후의 행동만 사용 (sliding window)
+            min_actions: 이보다 행동이 적으면 ValueError
         
         Returns:
-            X: Feature 행렬
+            X: Feature 행렬 (float32)
             y: 라벨 (relevance score)
             groups: Query group (각 추천 세션)
         """
         print(f"[{self.mbti}] Preparing training data...")
+        supabase = supabase or get_data_source()
         
-        # 1. user_actions에서 해당 MBTI의 행동 데이터 가져오기
-        actions_result = supabase.table('user_actions')\
-            .select('*')\
-            .eq('mbti', self.mbti)\
-            .order('timestamp', desc=False)\
-            .execute()
-        
-        actions = actions_result.data
-        
-        if not actions or len(actions) < 10:
-            raise ValueError(f"Insufficient data for {self.mbti}: {len(actions)} actions")
-        
-        print(f"  Found {len(actions)} actions for {self.mbti}")
-        
-        # 2. stocks 테이블에서 종목 정보 가져오기
-        stocks_result = supabase.table('stocks').select('*').execute()
-        stocks_dict = {s['ticker']: s for s in stocks_result.data}
-        
-        # 3. 세션별로 그룹화 (user_id + theme_id 조합)
-        sessions = {}
-        for action in actions:
-            session_key = f"{action['user_id']}_{action.get('theme_id', 'default')}"
-            if session_key not in sessions:
-                sessions[session_key] = []
-            sessions[session_key].append(action)
-        
-        print(f"  Grouped into {len(sessions)} sessions")
-        
-        # 4. Feature 및 라벨 생성
-        X_list = []
-        y_list = []
-        groups_list = []
-        
-        for session_key, session_actions in sessions.items():
-            # 세션 내 종목별 relevance score 계산
-            stock_scores = {}
-            
-            for action in session_actions:
-                ticker = action['stock_ticker']
-                action_type = action['action_type']
-                
-                if ticker not in stock_scores:
-                    stock_scores[ticker] = 0.0
-                
-                # Relevance score 부여
-                if action_type == 'buy':
-                    stock_scores[ticker] += 3.0  # 매수 = 가장 강한 positive
-                elif action_type == 'click':
-                    stock_scores[ticker] += 1.0  # 클릭 = positive
-                elif action_type == 'view':
-                    # view만 있고 click이 없으면 약한 negative
-                    if stock_scores[ticker] == 0:
-                        stock_scores[ticker] = 0.1
-                elif action_type == 'sell':
-                    stock_scores[ticker] -= 0.5  # 매도 = 약한 negative
-            
-            # 세션의 첫 액션에서 theme 정보 추출
-            theme_id = session_actions[0].get('theme_id') or 'default'
-            
-            # 각 종목에 대해 Feature 생성
-            session_size = 0
-            for ticker, score in stock_scores.items():
-                if ticker not in stocks_dict:
-                    continue
-                
-                stock_data = extract_stock_features_from_db(stocks_dict[ticker])
-                features = self.feature_extractor.extract_features(
-                    stock_data,
-                    self.mbti,
-                    theme_id
-                )
-                
-                X_list.append(features)
-                # Label을 정수로 변환 (XGBoost rank:ndcg 요구사항)
-                y_list.append(int(round(score)))
-                session_size += 1
-            
-            if session_size > 0:
-                groups_list.append(session_size)
+        X, y, groups, stats = load_training_data(
+            supabase,
+            self.mbti,
+            self.feature_extractor,
+            stocks_dict=stocks_dict,
+            page_size=page_size,
+            after=after,
+            since=since
+        )
+        self.load_stats = stats
         
-        X = np.array(X_list)
-        y = np.array(y_list)
-        groups = np.array(groups_list)
+        if stats['actions'] < min_actions:
+            raise ValueError(f"Insufficient data for {self.mbti}: {stats['actions']} actions")
         
+        print(f"  Found {stats['actions']} actions for {self.mbti} ({stats['pages']} pages, {stats['actions_per_sec']:.0f} rows/sec)")
+        print(f"  Grouped into {stats['sessions']} sessions")
         print(f"  Generated {len(X)} training samples from {len(groups)} sessions")
         print(f"  Feature shape: {X.shape}")
-        print(f"  Label distribution: min={y.min():.2f}, max={y.max():.2f}, mean={y.mean():.2f}")
+        if len(y):
+            print(f"  Label distribution: min={y.min():.2f}, max={y.max():.2f}, mean={y.mean():.2f}")
         
         return X, y, groups
     
@@ -132,7 +95,9 @@ class MBTIStockRanker:
         X: np.ndarray,
         y: np.ndarray,
         groups: np.ndarray,
-        num_boost_round: int = 100
+        num_boost_round: int = 100,
+        nthread: Optional[int] = None,
+        xgb_model: Optional[xgb.Booster] = None
     ):
         """
         XGBoost LambdaRank 학습
@@ -142,6 +107,8 @@ class MBTIStockRanker:
             y: Relevance score
             groups: Query group sizes
             num_boost_round: Boosting rounds
+            nthread: XGBoost 스레드 수 (None이면 XGBoost 기본값)
+            xgb_model: 이어서 boosting할 기존 모델 (None이면 처음부터 학습)
         """
         print(f"[{self.mbti}] Training XGBoost model...")
         
@@ -160,13 +127,16 @@ class MBTIStockRanker:
             'colsample_bytree': 0.8,
             'seed': 42
         }
+        if nthread:
+            params['nthread'] = nthread
         
         # 학습
         self.model = xgb.train(
             params,
             dtrain,
             num_boost_round=num_boost_round,
-            verbose_eval=10
+            verbose_eval=10,
+            xgb_model=xgb_model
         )
         
         print(f"[{self.mbti}] Training complete!")
@@ -220,63 +190,315 @@ class MBTIStockRanker:
         return dict(sorted(importance_dict.items(), key=lambda x: x[1], reverse=True))
 
 
-def train_all_mbti_models(supabase: Client, output_dir: str = 'ml/models'):
+def export_compiled_model(
+    model_path: str,
+    X_check: Optional[np.ndarray] = None,
+    tolerance: float = 1e-6
+) -> str:
     """
-    모든 MBTI 타입에 대해 모델 학습
+    XGBoost JSON 모델을 API용 평탄화 트리 배열(.npz)로 변환
+    - 변환 후 Booster.predict와 점수를 비교하여 다르면 저장하지 않음
     
     Args:
-        supabase: Supabase 클라이언트
-        output_dir: 모델 저장 디렉토리
+        model_path: {MBTI}_ranker.json 경로
+        X_check: 비교에 사용할 Feature 행렬 (None이면 무작위 probe 행렬)
+        tolerance: 허용 오차
+    
+    Returns:
+        컴파일 모델 경로 ({MBTI}_ranker.npz)
     """
-    MBTI_TYPES = [
-        'INTJ', 'INTP', 'ENTJ', 'ENTP',
-        'INFJ', 'INFP', 'ENFJ', 'ENFP',
-        'ISTJ', 'ISFJ', 'ESTJ', 'ESFJ',
-        'ISTP', 'ISFP', 'ESTP', 'ESFP'
-    ]
+    compiled = CompiledEnsemble.from_model_file(model_path)
+    booster = xgb.Booster()
+    booster.load_model(model_path)
     
-    os.makedirs(output_dir, exist_ok=True)
+    if X_check is None:
+        rng = np.random.default_rng(0)
+        X_check = rng.integers(0, 2, size=(256, compiled.num_feature)).astype(np.float32)
+        X_check[:, 0] = rng.uniform(-30, 30, size=256)
+        X_check[:, 4] = rng.uniform(0, 10, size=256)
     
-    results = {}
+    expected = booster.predict(xgb.DMatrix(X_check))
+    actual = compiled.predict(X_check)
+    max_diff = float(np.max(np.abs(expected - actual))) if len(X_check) else 0.0
+    if max_diff > tolerance:
+        raise ValueError(f"Compiled model mismatch for {model_path}: max diff {max_diff}")
     
+    output_path = compiled_model_path(model_path)
+    compiled.save(output_path)
+    print(f"  Exported compiled model to {output_path} ({compiled.num_trees} trees, {compiled.nbytes} bytes)")
+    return output_path
+
+
+def export_all_compiled_models(models_dir: str = 'ml/models') -> Dict[str, str]:
+    """models_dir의 모든 MBTI 모델을 컴파일 (학습 없이 변환만)"""
+    exported = {}
     for mbti in MBTI_TYPES:
-        print(f"\n{'='*60}")
-        print(f"Training model for {mbti}")
-        print(f"{'='*60}")
+        model_path = os.path.join(models_dir, f'{mbti}_ranker.json')
+        if not os.path.exists(model_path):
+            continue
+        try:
+            exported[mbti] = export_compiled_model(model_path)
+        except Exception as e:
+            print(f"❌ Error exporting {mbti}: {e}")
+    return exported
+
+
+TRAINING_MODES = ('full', 'incremental', 'window')
+
+# 학습 상태 파일 (MBTI별 high-water mark, 마지막 학습 모드)
+TRAINING_STATE_FILE = 'training_state.json'
+
+
+def load_training_state(output_dir: str) -> Dict[str, Dict]:
+    """MBTI별 마지막 학습 상태 로드 (없으면 빈 dict)"""
+    path = os.path.join(output_dir, TRAINING_STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_training_state(output_dir: str, state: Dict[str, Dict]):
+    path = os.path.join(output_dir, TRAINING_STATE_FILE)
+    with open(path, 'w') as f:
+        json.dump(state, f, indent=2)
+
+
+def train_single_mbti(
+    mbti: str,
+    supabase: Optional[Client] = None,
+    stocks_dict: Optional[Dict[str, Dict]] = None,
+    output_dir: str = 'ml/models',
+    nthread: Optional[int] = None,
+    mode: str = 'full',
+    previous_state: Optional[Dict] = None,
+    window_days: int = 90,
+    incremental_rounds: int = 20
+) -> Optional[Dict]:
+    """
+    MBTI 1개 모델 학습 및 저장
+    
+    Args:
+        mode: 'full' (전체 이력 재학습), 'incremental' (high-water mark 이후 행동으로 기존 모델에 이어서 boosting),
+              'window' (최근 window_days일 행동으로 재학습)
+        previous_state: 이 MBTI의 이전 학습 상태 (high_water_mark 포함)
+        window_days: window 모드의 학습 기간
+        incremental_rounds: incremental 모드에서 추가할 boosting round 수
+    
+    Returns:
+        training_results.json 항목 (데이터 부족으로 건너뛰면 None)
+    """
+    print(f"\n{'='*60}")
+    print(f"Training model for {mbti} ({mode})")
+    print(f"{'='*60}")
+    
+    start = time.perf_counter()
+    model_path = os.path.join(output_dir, f'{mbti}_ranker.json')
+    high_water_mark = (previous_state or {}).get('high_water_mark')
+    
+    # 기존 모델이나 high-water mark가 없으면 증분 학습 불가 -> 전체 학습
+    if mode == 'incremental' and (not high_water_mark or not os.path.exists(model_path)):
+        print(f"  No previous model/high-water mark for {mbti}, falling back to full training")
+        mode = 'full'
+    
+    try:
+        ranker = MBTIStockRanker(mbti)
+        
+        if mode == 'incremental':
+            X, y, groups = ranker.prepare_training_data(
+                supabase,
+                stocks_dict=stocks_dict,
+                after=tuple(high_water_mark),
+                min_actions=0
+            )
+        elif mode == 'window':
+            since = (datetime.utcnow() - timedelta(days=window_days)).isoformat()
+            X, y, groups = ranker.prepare_training_data(supabase, stocks_dict=stocks_dict, since=since)
+        else:
+            X, y, groups = ranker.prepare_training_data(supabase, stocks_dict=stocks_dict)
+        prepare_seconds = time.perf_counter() - start
+        
+        if len(X) < 20:
+            if mode == 'incremental':
+                # high-water mark를 옮기지 않아 다음 실행에서 새 행동과 함께 다시 사용
+                print(f"  {mbti}: only {len(X)} new samples, keeping current model")
+                return {
+                    'status': 'unchanged',
+                    'mode': mode,
+                    'rows': ranker.load_stats['actions'],
+                    'samples': len(X),
+                    'model_path': model_path,
+                    'high_water_mark': high_water_mark
+                }
+            print(f"⚠️  Skipping {mbti}: insufficient data ({len(X)} samples)")
+            return None
         
+        if mode == 'incremental':
+            ranker.load_model(model_path)
+            ranker.train(X, y, groups, num_boost_round=incremental_rounds, nthread=nthread, xgb_model=ranker.model)
+        else:
+            ranker.train(X, y, groups, nthread=nthread)
+        train_seconds = time.perf_counter() - start - prepare_seconds
+        
+        # 모델 저장 + API용 컴파일 모델 생성 (학습 데이터로 점수 일치 확인)
+        ranker.save_model(model_path)
         try:
-            ranker = MBTIStockRanker(mbti)
-            X, y, groups = ranker.prepare_training_data(supabase)
-            
-            if len(X) < 20:
-                print(f"⚠️  Skipping {mbti}: insufficient data ({len(X)} samples)")
-                continue
-            
-            ranker.train(X, y, groups)
-            
-            # 모델 저장
-            model_path = os.path.join(output_dir, f'{mbti}_ranker.json')
-            ranker.save_model(model_path)
-            
-            # Feature 중요도
-            importance = ranker.get_feature_importance()
-            print(f"\n[{mbti}] Top 5 important features:")
-            for i, (feat, score) in enumerate(list(importance.items())[:5], 1):
-                print(f"  {i}. {feat}: {score:.2f}")
-            
-            results[mbti] = {
-                'status': 'success',
-                'samples': len(X),
-                'model_path': model_path,
-                'top_features': list(importance.keys())[:5]
+            export_compiled_model(model_path, X_check=X[:1000])
+        except ValueError as e:
+            # 컴파일 모델이 JSON보다 오래되면 레지스트리는 JSON 모델을 사용
+            print(f"⚠️  [{mbti}] {e}")
+        
+        # Feature 중요도
+        importance = ranker.get_feature_importance()
+        print(f"\n[{mbti}] Top 5 important features:")
+        for i, (feat, score) in enumerate(list(importance.items())[:5], 1):
+            print(f"  {i}. {feat}: {score:.2f}")
+        
+        return {
+            'status': 'success',
+            'mode': mode,
+            'rows': ranker.load_stats['actions'],
+            'samples': len(X),
+            'model_path': model_path,
+            'top_features': list(importance.keys())[:5],
+            'high_water_mark': ranker.load_stats['high_water_mark'],
+            'timings': {
+                'prepare_seconds': round(prepare_seconds, 3),
+                'train_seconds': round(train_seconds, 3),
+                'total_seconds': round(time.perf_counter() - start, 3)
             }
-            
-        except Exception as e:
-            print(f"❌ Error training {mbti}: {e}")
-            results[mbti] = {
-                'status': 'failed',
-                'error': str(e)
+        }
+        
+    except Exception as e:
+        print(f"❌ Error training {mbti}: {e}")
+        return {
+            'status': 'failed',
+            'error': str(e)
+        }
+
+
+# 병렬 학습 worker 프로세스 상태 (initializer에서 한 번 설정)
+_worker_stocks: Optional[Dict[str, Dict]] = None
+_worker_nthread: Optional[int] = None
+
+
+def _init_training_worker(stocks_dict: Dict[str, Dict], nthread: Optional[int]):
+    global _worker_stocks, _worker_nthread
+    _worker_stocks = stocks_dict
+    _worker_nthread = nthread
+
+
+def _profile_training(mbti: str, profile_dir: Optional[str]):
+    """profile_dir가 있으면 이 학습 호출의 CPU 프로파일 캡처 (XGBoost 네이티브 스레드는 boosting 호출 프레임으로만 보임)"""
+    if not profile_dir:
+        return nullcontext()
+    return RequestProfiler(directory=profile_dir).capture('training', mbti, trigger='cli')
+
+
+def _train_in_worker(mbti: str, output_dir: str, options: Dict, profile_dir: Optional[str] = None) -> Optional[Dict]:
+    # worker마다 자체 데이터 소스(Supabase 커넥션 풀 또는 복제본 연결) 사용
+    with _profile_training(mbti, profile_dir):
+        return train_single_mbti(
+            mbti,
+            get_data_source(),
+            stocks_dict=_worker_stocks,
+            output_dir=output_dir,
+            nthread=_worker_nthread,
+            **options
+        )
+
+
+def train_all_mbti_models(
+    supabase: Optional[Client] = None,
+    output_dir: str = 'ml/models',
+    workers: int = 1,
+    nthread: Optional[int] = None,
+    mode: str = 'full',
+    window_days: int = 90,
+    incremental_rounds: int = 20,
+    profile_mbti: Optional[str] = None,
+    profile_dir: str = 'profiles'
+):
+    """
+    모든 MBTI 타입에 대해 모델 학습
+    
+    Args:
+        supabase: Supabase 클라이언트 (기본값: 프로세스 공유 클라이언트)
+        output_dir: 모델 저장 디렉토리
+        workers: 동시에 학습할 프로세스 수 (1이면 순차 학습)
+        nthread: 모델당 XGBoost 스레드 수 (None이면 CPU 수를 workers로 나눈 값)
+        mode: 'full' | 'incremental' | 'window' (train_single_mbti 참고)
+        window_days: window 모드의 학습 기간
+        incremental_rounds: incremental 모드에서 추가할 boosting round 수
+        profile_mbti: 이 MBTI의 학습 호출만 CPU 프로파일을 profile_dir에 저장 (collapsed stacks)
+    """
+    if mode not in TRAINING_MODES:
+        raise ValueError(f"Unknown training mode: {mode}")
+    os.makedirs(output_dir, exist_ok=True)
+    supabase = supabase or get_data_source()
+    state = load_training_state(output_dir)
+    
+    started = time.perf_counter()
+    
+    # stocks 테이블은 한 번만 조회하여 모든 MBTI가 공유
+    stocks_dict = fetch_stocks_dict(supabase)
+    print(f"Loaded {len(stocks_dict)} stocks for training")
+    
+    workers = max(1, min(workers, len(MBTI_TYPES)))
+    if nthread is None and workers > 1:
+        nthread = max(1, (os.cpu_count() or 1) // workers)
+    
+    def options(mbti: str) -> Dict:
+        return {
+            'mode': mode,
+            'previous_state': state.get(mbti),
+            'window_days': window_days,
+            'incremental_rounds': incremental_rounds,
+        }
+    
+    def profile_dir_for(mbti: str) -> Optional[str]:
+        return profile_dir if profile_mbti and mbti == profile_mbti.upper() else None
+    
+    if workers == 1:
+        outcomes = {}
+        for mbti in MBTI_TYPES:
+            with _profile_training(mbti, profile_dir_for(mbti)):
+                outcomes[mbti] = train_single_mbti(mbti, supabase, stocks_dict, output_dir, nthread, **options(mbti))
+    else:
+        print(f"Training {len(MBTI_TYPES)} models with {workers} workers (nthread={nthread})")
+        # fork 시 부모의 HTTP 커넥션이 공유되지 않도록 spawn 사용
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_training_worker,
+            initargs=(stocks_dict, nthread)
+        ) as executor:
+            futures = {
+                mbti: executor.submit(_train_in_worker, mbti, output_dir, options(mbti), profile_dir_for(mbti))
+                for mbti in MBTI_TYPES
+            }
+            outcomes = {}
+            for mbti, future in futures.items():
+                try:
+                    outcomes[mbti] = future.result()
+                except Exception as e:
+                    print(f"❌ Error training {mbti}: {e}")
+                    outcomes[mbti] = {'status': 'failed', 'error': str(e)}
+    
+    # 데이터 부족으로 건너뛴 MBTI는 결과에 포함하지 않음
+    results = {mbti: result for mbti, result in outcomes.items() if result is not None}
+    
+    # 학습에 성공한 MBTI만 high-water mark 갱신
+    for mbti, result in results.items():
+        if result['status'] == 'success':
+            state[mbti] = {
+                'high_water_mark': result['high_water_mark'],
+                'mode': result['mode'],
+                'rows': result['rows'],
+                'samples': result['samples'],
+                'trained_at': datetime.utcnow().isoformat()
             }
+    save_training_state(output_dir, state)
     
     # 결과 저장
     results_path = os.path.join(output_dir, 'training_results.json')
@@ -284,7 +506,7 @@ def train_all_mbti_models(supabase: Client, output_dir: str = 'ml/models'):
         json.dump(results, f, indent=2)
     
     print(f"\n{'='*60}")
-    print(f"Training complete! Results saved to {results_path}")
+    print(f"Training complete in {time.perf_counter() - started:.1f}s! Results saved to {results_path}")
     print(f"{'='*60}")
     
     return results
@@ -0,0 +1,265 @@
+"""
+Streaming Training Data Loader
+user_actions를 (timestamp, id) keyset 페이지 단위로 읽으면서 세션 그룹을 점진적으로 만들고,
+샘플은 미리 할당한(필요 시 2배로 늘어나는) NumPy 버퍼에 바로 기록하고 Feature 행렬은 마지막에 일괄 생성
+- 원본 action row를 메모리에 모두 올리지 않음 (세션별 종목 relevance만 유지)
+- 한 번의 응답 크기 제한(PostgREST max-rows)에 걸리지 않도록 page_size 단위로 조회
+"""
+
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from supabase import Client
+
+from ml.feature_extractor import (
+    StockFeatureExtractor,
+    extract_stock_features_from_db,
+    mbti_one_hot,
+    theme_one_hot,
+    THEME_FEATURE_COUNT
+)
+
+
+DEFAULT_PAGE_SIZE = 1000
+
+# 학습에 필요한 user_actions 컬럼만 조회
+ACTION_COLUMNS = 'id,user_id,theme_id,stock_ticker,action_type,timestamp'
+
+# 행동별 relevance 가중치 (view는 아래 apply_action에서 별도 처리)
+ACTION_RELEVANCE = {
+    'buy': 3.0,     # 매수 = 가장 강한 positive
+    'click': 1.0,   # 클릭 = positive
+    'sell': -0.5,   # 매도 = 약한 negative
+}
+
+
+def iter_action_pages(
+    supabase: Client,
+    mbti: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    after: Optional[Tuple[str, int]] = None,
+    since: Optional[str] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    MBTI의 user_actions를 timestamp 오름차순 페이지로 반환 (keyset pagination)
+    - offset 대신 마지막 (timestamp, id) 이후를 조회하므로 뒤 페이지도 조회 비용이 일정
+
+    Args:
+        supabase: Supabase 클라이언트
+        mbti: MBTI 타입
+        page_size: 페이지당 row 수
+        after: 이 (timestamp, id) 이후의 행동만 조회 (증분 학습 high-water mark)
+        since: 이 timestamp 이후의 행동만 조회 (sliding window 시작)
+    """
+    cursor: Optional[Tuple[str, int]] = after
+    while True:
+        query = supabase.table('user_actions')\
+            .select(ACTION_COLUMNS)\
+            .eq('mbti', mbti)
+        if since is not None:
+            query = query.gte('timestamp', since)
+        if cursor is not None:
+            timestamp, last_id = cursor
+            query = query.or_(
+                f'timestamp.gt."{timestamp}",and(timestamp.eq."{timestamp}",id.gt.{last_id})'
+            )
+        rows = query\
+            .order('timestamp', desc=False)\
+            .order('id', desc=False)\
+            .limit(page_size)\
+            .execute().data or []
+
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        cursor = (rows[-1]['timestamp'], rows[-1]['id'])
+
+
+def fetch_stocks_dict(supabase: Client, page_size: int = DEFAULT_PAGE_SIZE) -> Dict[str, Dict[str, Any]]:
+    """stocks 테이블 전체를 ticker keyset 페이지로 읽어 {ticker: row} 반환"""
+    stocks: Dict[str, Dict[str, Any]] = {}
+    last_ticker = None
+    while True:
+        query = supabase.table('stocks').select('*')
+        if last_ticker is not None:
+            query = query.gt('ticker', last_ticker)
+        rows = query.order('ticker', desc=False).limit(page_size).execute().data or []
+        for row in rows:
+            stocks[row['ticker']] = row
+        if len(rows) < page_size:
+            return stocks
+        last_ticker = rows[-1]['ticker']
+
+
+def apply_action(stock_scores: Dict[str, float], ticker: str, action_type: str):
+    """세션 내 종목 relevance score에 행동 1건 반영"""
+    if ticker not in stock_scores:
+        stock_scores[ticker] = 0.0
+
+    if action_type == 'view':
+        # view만 있고 click이 없으면 약한 negative
+        if stock_scores[ticker] == 0:
+            stock_scores[ticker] = 0.1
+    elif action_type in ACTION_RELEVANCE:
+        stock_scores[ticker] += ACTION_RELEVANCE[action_type]
+
+
+class SessionAccumulator:
+    """세션(user_id + theme_id)별 종목 relevance를 행동이 들어오는 대로 누적"""
+
+    def __init__(self):
+        # session_key -> (세션 첫 행동의 theme_id, {ticker: relevance})
+        self.sessions: Dict[str, Tuple[str, Dict[str, float]]] = {}
+        self.actions = 0
+
+    def add(self, action: Dict[str, Any]):
+        session_key = f"{action['user_id']}_{action.get('theme_id', 'default')}"
+        session = self.sessions.get(session_key)
+        if session is None:
+            session = (action.get('theme_id') or 'default', {})
+            self.sessions[session_key] = session
+        apply_action(session[1], action['stock_ticker'], action['action_type'])
+        self.actions += 1
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+
+class TrainingBuffers:
+    """
+    학습 샘플을 (종목 행, 테마 번호, 라벨) 정수로 담는 growable NumPy 버퍼
+    - Feature 행렬은 마지막에 종목 블록/테마 블록을 인덱싱하여 한 번에 생성
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.stock_rows = np.empty(capacity, dtype=np.int32)
+        self.theme_ids = np.empty(capacity, dtype=np.int32)
+        self.y = np.empty(capacity, dtype=np.int32)
+        self.groups: List[int] = []
+        self.size = 0
+
+    def _grow(self):
+        capacity = max(1, len(self.y)) * 2
+        for name in ('stock_rows', 'theme_ids', 'y'):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def append(self, stock_row: int, theme_id: int, label: int):
+        if self.size == len(self.y):
+            self._grow()
+        self.stock_rows[self.size] = stock_row
+        self.theme_ids[self.size] = theme_id
+        self.y[self.size] = label
+        self.size += 1
+
+    def end_group(self, group_size: int):
+        if group_size > 0:
+            self.groups.append(group_size)
+
+    def arrays(
+        self,
+        stock_block: np.ndarray,
+        mbti_features: np.ndarray,
+        theme_features: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (X, y, groups) 생성
+
+        Args:
+            stock_block: 종목별 Feature 블록 (stock_rows가 가리키는 행)
+            mbti_features: MBTI One-Hot 블록 (모든 행에 broadcast)
+            theme_features: 테마 번호별 One-Hot 블록
+        """
+        n = self.size
+        n_stock = stock_block.shape[1]
+        n_mbti = len(mbti_features)
+        X = np.empty((n, n_stock + n_mbti + theme_features.shape[1]), dtype=np.float32)
+        X[:, :n_stock] = stock_block[self.stock_rows[:n]]
+        X[:, n_stock:n_stock + n_mbti] = mbti_features
+        X[:, n_stock + n_mbti:] = theme_features[self.theme_ids[:n]]
+        return X, self.y[:n], np.array(self.groups, dtype=np.int64)
+
+
+def load_training_data(
+    supabase: Client,
+    mbti: str,
+    feature_extractor: StockFeatureExtractor,
+    stocks_dict: Optional[Dict[str, Dict[str, Any]]] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    after: Optional[Tuple[str, int]] = None,
+    since: Optional[str] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+    """
+    MBTI 학습 데이터 스트리밍 로드
+
+    Args:
+        supabase: Supabase 클라이언트
+        mbti: MBTI 타입
+        feature_extractor: Feature 추출기
+        stocks_dict: {ticker: stocks row} (None이면 stocks 테이블 조회)
+        page_size: user_actions 페이지 크기
+        after: 이 (timestamp, id) 이후의 행동만 사용
+        since: 이 timestamp 이후의 행동만 사용
+
+    Returns:
+        (X, y, groups, 로드 통계) - 통계의 high_water_mark는 마지막으로 읽은 (timestamp, id)
+    """
+    start = time.perf_counter()
+
+    sessions = SessionAccumulator()
+    pages = 0
+    high_water_mark = after
+    for page in iter_action_pages(supabase, mbti, page_size, after=after, since=since):
+        pages += 1
+        for action in page:
+            sessions.add(action)
+        high_water_mark = (page[-1]['timestamp'], page[-1]['id'])
+    fetch_seconds = time.perf_counter() - start
+
+    if stocks_dict is None:
+        stocks_dict = fetch_stocks_dict(supabase, page_size)
+
+    # 종목 블록은 세션에 등장한 종목에 대해서만 한 번에 계산
+    stock_rows: Dict[str, int] = {}
+    theme_ids: Dict[str, int] = {}
+    buffers = TrainingBuffers(capacity=max(1024, sessions.actions))
+
+    for theme_id, stock_scores in sessions.sessions.values():
+        theme_row = theme_ids.setdefault(theme_id, len(theme_ids))
+        session_size = 0
+        for ticker, score in stock_scores.items():
+            if ticker not in stocks_dict:
+                continue
+
+            stock_row = stock_rows.setdefault(ticker, len(stock_rows))
+            # Label을 정수로 변환 (XGBoost rank:ndcg 요구사항)
+            buffers.append(stock_row, theme_row, int(round(score)))
+            session_size += 1
+        buffers.end_group(session_size)
+
+    stock_block = feature_extractor.stock_block(
+        [extract_stock_features_from_db(stocks_dict[ticker]) for ticker in stock_rows]
+    )
+    theme_features = np.array(
+        [theme_one_hot(theme_id) for theme_id in theme_ids],
+        dtype=np.float32
+    ).reshape(len(theme_ids), THEME_FEATURE_COUNT)
+    X, y, groups = buffers.arrays(stock_block, mbti_one_hot(mbti), theme_features)
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        'actions': sessions.actions,
+        'pages': pages,
+        'sessions': len(sessions),
+        'samples': len(y),
+        'fetch_seconds': round(fetch_seconds, 3),
+        'total_seconds': round(elapsed, 3),
+        'actions_per_sec': round(sessions.actions / elapsed, 1) if elapsed > 0 else 0.0,
+        'samples_per_sec': round(len(y) / elapsed, 1) if elapsed > 0 else 0.0,
+        'high_water_mark': list(high_water_mark) if high_water_mark else None,
+    }
+    return X, y, groups, stats
@@ -0,0 +1,410 @@
+"""
+Local Columnar Price-History Store
+stock_prices_daily를 로컬 디스크에 (종목 x 거래일) 컬럼 배열로 보관하여 지표/백테스트/학습 작업이 REST 조회 없이 이력을 읽도록 함
+- 연도별 파티션 디렉토리에 필드별 .npy 파일 (행 = 종목, 열 = 거래일 오름차순, 없는 값은 NaN)
+- memory-map으로 열어 종목/기간 slice는 복사 없이 view로 반환 (한 연도 안의 구간일 때)
+- 동기화는 trade_date 기준 증분 (저장된 마지막 거래일보다 overlap_days 앞부터 keyset 페이지로 다시 조회해
+  종목별로 나눠 upsert되는 중에 동기화된 거래일과 과거 일자 backfill도 반영, 값이 같은 row는 다시 기록하지 않음)
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from supabase import Client
+
+
+# 파일 구성이 바뀌면 올려서 이전 형식의 저장소를 읽지 않도록 함
+PRICE_STORE_FORMAT = 1
+
+PRICE_FIELDS = ['open_price', 'high_price', 'low_price', 'close_price', 'volume']
+
+DEFAULT_PAGE_SIZE = 1000
+
+# 동기화 중 메모리에 모아둘 최대 row 수 (초과하면 파티션에 기록)
+FLUSH_ROWS = 200000
+
+# 증분 동기화 시 마지막 거래일 이전 몇 달력일을 다시 조회할지
+# (sync-daily-prices.ts가 종목별로 upsert하는 도중 동기화된 날 / fetch-month-history.ts의 최근 backfill 보완)
+DEFAULT_SYNC_OVERLAP_DAYS = 5
+
+
+def iter_price_pages(
+    supabase: Client,
+    columns: str = 'ticker,trade_date,close_price',
+    since: Optional[str] = None,
+    after: Optional[str] = None,
+    page_size: int = DEFAULT_PAGE_SIZE
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    stock_prices_daily를 (trade_date, ticker) keyset 페이지로 조회
+
+    Args:
+        columns: 조회할 컬럼 (ticker, trade_date 포함)
+        since: 이 거래일 이후(포함)만 조회
+        after: 이 거래일 이후(미포함)만 조회 (증분 갱신)
+    """
+    cursor = None
+    while True:
+        query = supabase.table('stock_prices_daily').select(columns)
+        if since is not None:
+            query = query.gte('trade_date', since)
+        if after is not None:
+            query = query.gt('trade_date', after)
+        if cursor is not None:
+            trade_date, ticker = cursor
+            query = query.or_(f'trade_date.gt."{trade_date}",and(trade_date.eq."{trade_date}",ticker.gt."{ticker}")')
+        rows = query\
+            .order('trade_date', desc=False)\
+            .order('ticker', desc=False)\
+            .limit(page_size)\
+            .execute().data or []
+
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        cursor = (str(rows[-1]['trade_date']), rows[-1]['ticker'])
+
+
+def _to_date(value: Optional[str]) -> Optional[np.datetime64]:
+    return np.datetime64(str(value)[:10], 'D') if value is not None else None
+
+
+class PriceStore:
+    """연도 파티션 컬럼 저장소 (쓰기는 sync/append_rows, 읽기는 slice/dates)"""
+
+    def __init__(self, directory: str = 'cache/prices', fields: Optional[List[str]] = None):
+        """
+        Args:
+            directory: 저장 디렉토리
+            fields: 저장할 stock_prices_daily 컬럼 (기본: 시가/고가/저가/종가/거래량)
+        """
+        self.directory = directory
+        self.fields = list(fields or PRICE_FIELDS)
+
+        self.tickers: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.last_trade_date: Optional[str] = None
+        # 연도 -> {'rows': 파티션 종목 수, 'days': 거래일 수}
+        self.partitions: Dict[int, Dict[str, int]] = {}
+
+        self._open_partitions: Dict[int, Dict[str, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+        self.rows_synced = 0
+        self.last_sync_seconds = 0.0
+        # 저장된 값이 바뀔 때마다 증가 (지표 엔진이 같은 거래일 안의 추가/수정 row를 감지하는 데 사용)
+        self.revision = 0
+
+        self._load_manifest()
+
+    # ------------------------------------------------------------------
+    # Manifest / partition files
+    # ------------------------------------------------------------------
+
+    @property
+    def _manifest_path(self) -> str:
+        return os.path.join(self.directory, 'manifest.json')
+
+    def _partition_path(self, year: int) -> str:
+        return os.path.join(self.directory, str(year))
+
+    def _load_manifest(self):
+        try:
+            with open(self._manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"[PriceStore] Failed to read manifest: {e}")
+            return
+
+        if manifest.get('format') != PRICE_STORE_FORMAT or manifest.get('fields') != self.fields:
+            print(f"[PriceStore] Ignoring store with different format/fields in {self.directory}")
+            return
+        self.tickers = manifest['tickers']
+        self.index = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self.last_trade_date = manifest.get('last_trade_date')
+        self.partitions = {int(year): info for year, info in manifest['partitions'].items()}
+
+    def _save_manifest(self):
+        manifest = {
+            'format': PRICE_STORE_FORMAT,
+            'fields': self.fields,
+            'tickers': self.tickers,
+            'last_trade_date': self.last_trade_date,
+            'partitions': {str(year): info for year, info in sorted(self.partitions.items())},
+            'updated_at': time.time(),
+        }
+        tmp_path = f"{self._manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, self._manifest_path)
+
+    def _open(self, year: int) -> Dict[str, np.ndarray]:
+        """파티션을 memory-map으로 열기 ('dates' + 필드별 (종목 x 거래일) 배열)"""
+        partition = self._open_partitions.get(year)
+        if partition is None:
+            path = self._partition_path(year)
+            partition = {'dates': np.load(os.path.join(path, 'dates.npy'))}
+            for field in self.fields:
+                partition[field] = np.load(os.path.join(path, f"{field}.npy"), mmap_mode='r')
+            self._open_partitions[year] = partition
+        return partition
+
+    def _write_partition(self, year: int, dates: np.ndarray, arrays: Dict[str, np.ndarray]):
+        """파티션 저장 (임시 디렉토리에 쓴 뒤 이름 변경, 기존 memmap은 이전 파일을 계속 참조)"""
+        path = self._partition_path(year)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(tmp_path, exist_ok=True)
+            np.save(os.path.join(tmp_path, 'dates.npy'), dates)
+            for field in self.fields:
+                np.save(os.path.join(tmp_path, f"{field}.npy"), arrays[field])
+            if os.path.exists(path):
+                old_path = f"{path}.{os.getpid()}.old.tmp"
+                os.rename(path, old_path)
+                os.rename(tmp_path, path)
+                shutil.rmtree(old_path, ignore_errors=True)
+            else:
+                os.rename(tmp_path, path)
+        except OSError:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        self._open_partitions.pop(year, None)
+        self.partitions[year] = {'rows': arrays[self.fields[0]].shape[0], 'days': len(dates)}
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def append_rows(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        stock_prices_daily row 반영 (같은 (ticker, trade_date)는 덮어씀)
+
+        Returns:
+            반영한 row 수
+        """
+        with self._lock:
+            return self._append_rows(rows)
+
+    def _append_rows(self, rows: List[Dict[str, Any]]) -> int:
+        if not rows:
+            return 0
+        os.makedirs(self.directory, exist_ok=True)
+
+        for ticker in sorted({row['ticker'] for row in rows} - set(self.index)):
+            self.index[ticker] = len(self.tickers)
+            self.tickers.append(ticker)
+
+        row_idx = np.fromiter((self.index[row['ticker']] for row in rows), dtype=np.intp, count=len(rows))
+        dates = np.array([str(row['trade_date'])[:10] for row in rows], dtype='datetime64[D]')
+        values = {
+            field: np.array([row.get(field) for row in rows], dtype=np.float64)
+            for field in self.fields
+        }
+        years = dates.astype('datetime64[Y]').astype(int) + 1970
+
+        changed = False
+        for year in np.unique(years):
+            mask = years == year
+            year_values = {f: v[mask] for f, v in values.items()}
+            # overlap 구간 재조회처럼 저장된 값과 같으면 파티션을 다시 쓰지 않음
+            if self._year_changed(int(year), row_idx[mask], dates[mask], year_values):
+                self._merge_year(int(year), row_idx[mask], dates[mask], year_values)
+                changed = True
+
+        latest = str(dates.max())
+        if self.last_trade_date is None or latest > self.last_trade_date:
+            self.last_trade_date = latest
+        if changed:
+            self.revision += 1
+            self._save_manifest()
+        return len(rows)
+
+    def _year_changed(self, year: int, row_idx: np.ndarray, dates: np.ndarray, values: Dict[str, np.ndarray]) -> bool:
+        """row가 연도 파티션에 새 종목/거래일/값을 추가하는지 (모두 저장된 값과 같으면 False)"""
+        if year not in self.partitions:
+            return True
+        old = self._open(year)
+        old_dates = old['dates']
+        if len(old_dates) == 0:
+            return True
+        col_idx = np.searchsorted(old_dates, dates)
+        if np.any(col_idx >= len(old_dates)) or np.any(old_dates[np.minimum(col_idx, len(old_dates) - 1)] != dates):
+            return True
+        if np.any(row_idx >= old[self.fields[0]].shape[0]):
+            return True
+        return any(
+            not np.array_equal(old[field][row_idx, col_idx], values[field], equal_nan=True)
+            for field in self.fields
+        )
+
+    def _merge_year(self, year: int, row_idx: np.ndarray, dates: np.ndarray, values: Dict[str, np.ndarray]):
+        """연도 파티션에 row를 병합해 다시 기록 (종목 행은 현재 종목 수까지 확장)"""
+        n = len(self.tickers)
+        if year in self.partitions:
+            old = self._open(year)
+            old_dates = old['dates']
+        else:
+            old, old_dates = None, np.array([], dtype='datetime64[D]')
+
+        all_dates = np.union1d(old_dates, dates)
+        col_idx = np.searchsorted(all_dates, dates)
+        arrays = {}
+        for field in self.fields:
+            merged = np.full((n, len(all_dates)), np.nan)
+            if old is not None:
+                merged[:old[field].shape[0], np.searchsorted(all_dates, old_dates)] = old[field]
+            merged[row_idx, col_idx] = values[field]
+            arrays[field] = merged
+        self._write_partition(year, all_dates, arrays)
+
+    def sync(
+        self,
+        supabase: Client,
+        start_date: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        overlap_days: int = DEFAULT_SYNC_OVERLAP_DAYS
+    ) -> int:
+        """
+        Supabase stock_prices_daily에서 증분 동기화
+
+        Args:
+            supabase: Supabase 클라이언트
+            start_date: 저장소가 비어 있을 때 가져올 시작 거래일 (None이면 전체 이력)
+            page_size: 조회 페이지 크기
+            overlap_days: 마지막 저장 거래일 이전 몇 달력일부터 다시 조회할지
+                (0이면 마지막 거래일부터, 일부 종목만 기록된 거래일을 채우기 위해 마지막 거래일은 항상 다시 조회)
+
+        Returns:
+            조회해 반영한 row 수 (overlap 구간의 변경 없는 row 포함)
+        """
+        with self._lock:
+            start = time.perf_counter()
+            columns = ','.join(['ticker', 'trade_date'] + self.fields)
+            revision = self.revision
+            if self.last_trade_date is None:
+                pages = iter_price_pages(supabase, columns, since=start_date, page_size=page_size)
+            else:
+                since = (_to_date(self.last_trade_date) - np.timedelta64(max(0, overlap_days), 'D')).astype(str)
+                pages = iter_price_pages(supabase, columns, since=since, page_size=page_size)
+
+            synced = 0
+            pending: List[Dict[str, Any]] = []
+            for rows in pages:
+                pending.extend(rows)
+                if len(pending) >= FLUSH_ROWS:
+                    synced += self._append_rows(pending)
+                    pending = []
+            synced += self._append_rows(pending)
+
+            self.rows_synced += synced
+            self.last_sync_seconds = time.perf_counter() - start
+            if self.revision != revision:
+                print(f"[PriceStore] Synced {synced} rows up to {self.last_trade_date} ({self.last_sync_seconds:.1f}s)")
+            return synced
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _years(self, start: Optional[np.datetime64], end: Optional[np.datetime64]) -> List[int]:
+        first = int(str(start)[:4]) if start is not None else None
+        last = int(str(end)[:4]) if end is not None else None
+        return [
+            year for year in sorted(self.partitions)
+            if (first is None or year >= first) and (last is None or year <= last)
+        ]
+
+    def _date_bounds(self, dates: np.ndarray, start: Optional[np.datetime64], end: Optional[np.datetime64]) -> Tuple[int, int]:
+        lo = int(np.searchsorted(dates, start, side='left')) if start is not None else 0
+        hi = int(np.searchsorted(dates, end, side='right')) if end is not None else len(dates)
+        return lo, hi
+
+    def dates(self, start: Optional[str] = None, end: Optional[str] = None) -> np.ndarray:
+        """저장된 거래일 (datetime64[D], start/end 포함)"""
+        start_d, end_d = _to_date(start), _to_date(end)
+        parts = []
+        for year in self._years(start_d, end_d):
+            dates = self._open(year)['dates']
+            lo, hi = self._date_bounds(dates, start_d, end_d)
+            parts.append(dates[lo:hi])
+        return np.concatenate(parts) if parts else np.array([], dtype='datetime64[D]')
+
+    def slice(
+        self,
+        field: str = 'close_price',
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        ticker: Optional[str] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        기간 [start, end]의 값과 거래일
+
+        Args:
+            field: 필드 이름
+            start / end: 거래일 범위 (포함, None이면 처음/끝까지)
+            ticker: 종목 하나 (None이면 전체 종목, 행 순서 = self.tickers)
+
+        Returns:
+            (values, dates) - values는 (종목 x 거래일) 또는 ticker 지정 시 (거래일,)
+            한 연도 안의 구간이면 memmap view (복사 없음), 여러 연도에 걸치거나
+            해당 연도 이후 상장된 종목 행을 채워야 하면 복사본
+        """
+        if field not in self.fields:
+            raise KeyError(f"Unknown price field: {field}")
+        row = self.index.get(ticker) if ticker is not None else None
+        if ticker is not None and row is None:
+            raise KeyError(f"Unknown ticker: {ticker}")
+
+        start_d, end_d = _to_date(start), _to_date(end)
+        n = len(self.tickers)
+        values, dates = [], []
+        for year in self._years(start_d, end_d):
+            partition = self._open(year)
+            lo, hi = self._date_bounds(partition['dates'], start_d, end_d)
+            if lo == hi:
+                continue
+            array = partition[field]
+            if row is not None:
+                values.append(array[row, lo:hi] if row < array.shape[0] else np.full(hi - lo, np.nan))
+            elif array.shape[0] == n:
+                values.append(array[:, lo:hi])
+            else:
+                padded = np.full((n, hi - lo), np.nan)
+                padded[:array.shape[0]] = array[:, lo:hi]
+                values.append(padded)
+            dates.append(partition['dates'][lo:hi])
+
+        if not values:
+            shape = (0,) if row is not None else (n, 0)
+            return np.empty(shape), np.array([], dtype='datetime64[D]')
+        if len(values) == 1:
+            return values[0], dates[0]
+        return np.concatenate(values, axis=-1), np.concatenate(dates)
+
+    def tail(self, days: int, field: str = 'close_price') -> Tuple[np.ndarray, np.ndarray]:
+        """최근 days 거래일 (slice와 같은 반환 형식)"""
+        all_dates = self.dates()
+        if len(all_dates) == 0:
+            return self.slice(field)
+        return self.slice(field, start=str(all_dates[max(0, len(all_dates) - days)]))
+
+    def stats(self) -> Dict[str, Any]:
+        """저장소 상태"""
+        return {
+            'directory': self.directory,
+            'tickers': len(self.tickers),
+            'years': sorted(self.partitions),
+            'days': sum(info['days'] for info in self.partitions.values()),
+            'last_trade_date': self.last_trade_date,
+            'rows_synced': self.rows_synced,
+            'revision': self.revision,
+            'last_sync_seconds': round(self.last_sync_seconds, 3),
+        }
@@ -0,0 +1,261 @@
+"""
+On-demand CPU Profiling
+요청 헤더 또는 샘플링 비율로 선택된 recommend_themes / 학습 호출 1건의 CPU 프로파일을 저장
+- 외부 프로파일러 없이 별도 스레드가 sys._current_frames()로 대상 스레드의 스택을 주기적으로 샘플링
+- 결과는 collapsed stacks 형식 (.folded: "root;...;leaf count"), flamegraph.pl / speedscope / inferno에서 바로 열 수 있음
+- 메타데이터는 같은 이름의 .json 파일로 저장하고 오래된 캡처부터 삭제
+- 한 번에 하나의 캡처만 실행 (동시에 선택된 요청은 프로파일 없이 처리)
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+# 기본 샘플링 간격 (초). CPU 작업 중에는 GIL 전환 간격(sys.getswitchinterval, 기본 5ms)보다 촘촘해지지 않음
+DEFAULT_INTERVAL = 0.005
+
+FOLDED_SUFFIX = '.folded'
+META_SUFFIX = '.json'
+
+
+def frame_label(frame) -> str:
+    """flame graph 프레임 이름: 함수명 (파일명:정의 줄)"""
+    code = frame.f_code
+    name = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    # collapsed 형식에서 ';'는 프레임 구분자
+    return name.replace(';', ':')
+
+
+class StackSampler:
+    """한 스레드의 호출 스택을 주기적으로 샘플링해 stack -> 샘플 수로 집계"""
+
+    def __init__(self, thread_id: int, interval: float = DEFAULT_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame))
+                frame = frame.f_back
+            # root -> leaf 순서
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+
+class RequestProfiler:
+    """샘플링된 호출의 프로파일을 디렉토리에 저장하고 최근 캡처 목록 제공"""
+
+    def __init__(
+        self,
+        directory: str = 'profiles',
+        header_enabled: bool = False,
+        sample_rate: float = 0.0,
+        interval: float = DEFAULT_INTERVAL,
+        max_captures: int = 50
+    ):
+        """
+        Args:
+            directory: 캡처 저장 디렉토리
+            header_enabled: X-Profile 요청 헤더로 프로파일링 요청 허용
+            sample_rate: 헤더 없이 무작위로 프로파일링할 요청 비율 (0이면 사용 안 함)
+            interval: 스택 샘플링 간격 (초)
+            max_captures: 보관할 최대 캡처 수 (초과 시 오래된 것부터 삭제)
+        """
+        self.directory = directory
+        self.header_enabled = header_enabled
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.max_captures = max_captures
+        self._busy = threading.Lock()
+
+        self.captures = 0
+        self.skipped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.header_enabled or self.sample_rate > 0
+
+    def trigger(self, header_value: Optional[str] = None) -> Optional[str]:
+        """
+        이 요청을 프로파일링할지 결정
+
+        Returns:
+            'header' / 'sampled' (프로파일링) 또는 None
+        """
+        if self.header_enabled and header_value and header_value.strip().lower() in ('1', 'true', 'yes'):
+            return 'header'
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return 'sampled'
+        return None
+
+    @contextmanager
+    def capture(self, kind: str, label: str, trigger: str = 'manual') -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        with 블록을 실행하는 현재 스레드의 CPU 프로파일 캡처
+
+        Yields:
+            캡처 메타데이터 dict (블록 종료 후 name/samples 등이 채워짐), 다른 캡처가 진행 중이면 None
+        """
+        if not self._busy.acquire(blocking=False):
+            self.skipped += 1
+            yield None
+            return
+
+        meta: Dict[str, Any] = {}
+        try:
+            started_at = datetime.now(timezone.utc)
+            sampler = StackSampler(threading.get_ident(), self.interval)
+            start = time.perf_counter()
+            sampler.start()
+            try:
+                yield meta
+            finally:
+                stacks = sampler.stop()
+                duration = time.perf_counter() - start
+                meta.update(self._save(kind, label, trigger, started_at, duration, sampler.samples, stacks))
+        finally:
+            self._busy.release()
+
+    def profile_call(
+        self,
+        kind: str,
+        label: str,
+        trigger: str,
+        fn: Callable[..., Any],
+        *args: Any
+    ) -> Tuple[Any, Optional[Dict[str, Any]]]:
+        """fn(*args)를 프로파일링하며 실행 (executor에서 호출하도록 함수 형태로 제공)"""
+        with self.capture(kind, label, trigger) as meta:
+            result = fn(*args)
+        return result, meta or None
+
+    def _save(
+        self,
+        kind: str,
+        label: str,
+        trigger: str,
+        started_at: datetime,
+        duration: float,
+        samples: int,
+        stacks: Counter
+    ) -> Dict[str, Any]:
+        safe_label = ''.join(c if c.isalnum() or c in '-_' else '_' for c in label)
+        name = f"{started_at.strftime('%Y%m%dT%H%M%S%f')}-{kind}-{safe_label}"
+        meta = {
+            'name': name,
+            'kind': kind,
+            'label': label,
+            'trigger': trigger,
+            'started_at': started_at.isoformat(),
+            'duration_ms': round(duration * 1000, 3),
+            'samples': samples,
+            'interval_ms': round(self.interval * 1000, 3),
+            'file': name + FOLDED_SUFFIX,
+        }
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, name + FOLDED_SUFFIX), 'w') as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            with open(os.path.join(self.directory, name + META_SUFFIX), 'w') as f:
+                json.dump(meta, f, indent=2)
+            self.captures += 1
+            self._prune()
+            print(f"[Profiler] Captured {kind} {label}: {samples} samples in {meta['duration_ms']:.1f}ms -> {name}{FOLDED_SUFFIX}")
+        except OSError as e:
+            print(f"[Profiler] Failed to save capture {name}: {e}")
+        return meta
+
+    def _names(self) -> List[str]:
+        """저장된 캡처 이름 (이름이 시작 시각으로 시작하므로 정렬하면 시간순)"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            entry[:-len(META_SUFFIX)] for entry in os.listdir(self.directory) if entry.endswith(META_SUFFIX)
+        )
+
+    def _prune(self):
+        if self.max_captures <= 0:
+            return
+        names = self._names()
+        for name in names[:max(0, len(names) - self.max_captures)]:
+            for suffix in (FOLDED_SUFFIX, META_SUFFIX):
+                try:
+                    os.remove(os.path.join(self.directory, name + suffix))
+                except FileNotFoundError:
+                    pass
+
+    def list_captures(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """최근 캡처 메타데이터 (최신순)"""
+        captures = []
+        for name in reversed(self._names()[-limit:] if limit else self._names()):
+            try:
+                with open(os.path.join(self.directory, name + META_SUFFIX), 'r') as f:
+                    captures.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return captures
+
+    def capture_path(self, name: str) -> Optional[str]:
+        """캡처의 .folded 파일 경로 (없거나 이름이 잘못되면 None)"""
+        if os.path.basename(name) != name or name not in self._names():
+            return None
+        return os.path.join(self.directory, name + FOLDED_SUFFIX)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'header_enabled': self.header_enabled,
+            'sample_rate': self.sample_rate,
+            'interval_ms': round(self.interval * 1000, 3),
+            'captures': self.captures,
+            'skipped': self.skipped,
+            'stored': len(self._names()),
+            'max_captures': self.max_captures,
+            'directory': self.directory,
+        }
+
+
+# 싱글톤 인스턴스 (main.py에서 초기화)
+_profiler_instance: Optional[RequestProfiler] = None
+
+
+def init_profiler(**kwargs) -> RequestProfiler:
+    """프로파일러 초기화 (앱 시작 시 한 번 호출, 인자는 RequestProfiler 참고)"""
+    global _profiler_instance
+    _profiler_instance = RequestProfiler(**kwargs)
+    return _profiler_instance
+
+
+def get_profiler() -> RequestProfiler:
+    """프로파일러 인스턴스 반환 (초기화 전이면 비활성 기본값)"""
+    global _profiler_instance
+    if _profiler_instance is None:
+        _profiler_instance = RequestProfiler()
+    return _profiler_instance
@@ -1,7 +1,10 @@
 
 import json
 import os
-from typing import Dict, List, Any
+import random
+import threading
+import time
+from typing import Dict, List, Any, Optional
 
 # Path to themes.json (project root relative)
 THEMES_PATH = "../src/data/themes.json"
@@ -109,9 +112,63 @@ def load_themes() -> List[Dict]:
         print(f"Error loading themes: {e}")
         return []
 
-def get_themes_for_mbti(mbti: str) -> List[Dict]:
-    all_themes = load_themes()
-    return [t for t in all_themes if t['mbti'] == mbti.upper()]
+class ThemeCatalog:
+    """
+    themes.json을 한 번만 파싱하여 MBTI별로 인덱싱한 카탈로그.
+    파일이 바뀐 경우(mtime/size)에만 다시 읽는다.
+    모듈 import 시 로드되므로 pre-fork 워커(gunicorn --preload)는 파싱 결과를 공유한다.
+    """
+
+    def __init__(self, path: str, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.by_mbti: Dict[str, List[Dict]] = {}
+        self.version: Optional[str] = None
+        self._last_checked = 0.0
+        self._lock = threading.Lock()
+        self.reload_if_changed(force=True)
+
+    def _file_version(self) -> Optional[str]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+    def reload_if_changed(self, force: bool = False):
+        now = time.time()
+        if not force and now - self._last_checked < self.check_interval:
+            return
+        with self._lock:
+            self._last_checked = now
+            version = self._file_version()
+            if version == self.version and not force:
+                return
+            by_mbti: Dict[str, List[Dict]] = {}
+            for theme in load_themes():
+                by_mbti.setdefault(theme['mbti'].upper(), []).append(theme)
+            # 참조 교체만 하므로 읽는 쪽은 이전/새 인덱스 중 하나를 봄
+            self.by_mbti = by_mbti
+            self.version = version
+
+    def get(self, mbti: str) -> List[Dict]:
+        self.reload_if_changed()
+        return self.by_mbti.get(mbti.upper(), [])
+
+_theme_catalog = ThemeCatalog(os.path.join(os.path.dirname(os.path.abspath(__file__)), THEMES_PATH))
+
+def get_theme_catalog() -> ThemeCatalog:
+    return _theme_catalog
+
+def get_themes_for_mbti(mbti: str, fallback: Optional[str] = None) -> List[Dict]:
+    """
+    MBTI별 테마 목록 (캐시된 카탈로그에서 조회, 반환 리스트는 수정하지 말 것)
+    fallback: 해당 MBTI 테마가 없을 때 대신 사용할 MBTI
+    """
+    themes = _theme_catalog.get(mbti)
+    if not themes and fallback:
+        themes = _theme_catalog.get(fallback)
+    return themes
 
 def score_stock(stock_features: Dict, mbti: str, theme_category: str) -> (float, str):
     """
@@ -134,6 +191,11 @@ def score_stock(stock_features: Dict, mbti: str, theme_category: str) -> (float,
     sector = str(stock_features.get('sector') or '')
     stock_name = str(stock_features.get('name') or '')
     
+    # 가격 이력 기반 지표 (indicators.IndicatorEngine, 없으면 momentum은 당일 등락률로 대체)
+    momentum = stock_features.get('momentum')
+    momentum = change_pct if momentum is None else float(momentum)
+    has_indicators = stock_features.get('indicators_as_of') is not None
+    
     # market_cap
     market_cap_raw = stock_features.get('market_cap') or 'medium'
     if isinstance(market_cap_raw, str):
@@ -143,7 +205,7 @@ def score_stock(stock_features: Dict, mbti: str, theme_category: str) -> (float,
     
     # 1. Momentum & Volatility (Theme Persona 위주)
     w_mom = base_profile.get('momentum', 0) + theme_modifier.get('momentum', 0) * THEME_MULTIPLIER
-    mom_score = change_pct * w_mom * 3.0
+    mom_score = momentum * w_mom * 3.0
     score += mom_score
     contributions['momentum'] = mom_score
     
@@ -203,8 +265,20 @@ def score_stock(stock_features: Dict, mbti: str, theme_category: str) -> (float,
         score += cap_score
         contributions['market_cap'] = cap_score
     
-    # 5. 소량의 무작위 노이즈
-    import random
+    # 5. RSI & Beta (지표가 계산된 종목만, 50 / 1.0 기준)
+    if has_indicators:
+        w_rsi = base_profile.get('rsi', 0) + theme_modifier.get('rsi', 0) * THEME_MULTIPLIER
+        rsi_score = (float(stock_features.get('rsi', 50)) - 50.0) / 50.0 * w_rsi * 5.0
+        score += rsi_score
+        contributions['rsi'] = rsi_score
+        
+        if stock_features.get('beta') is not None:
+            w_beta = base_profile.get('beta', 0) + theme_modifier.get('beta', 0) * THEME_MULTIPLIER
+            beta_score = (float(stock_features['beta']) - 1.0) * w_beta * 10.0
+            score += beta_score
+            contributions['beta'] = beta_score
+    
+    # 6. 소량의 무작위 노이즈
     score += random.uniform(-2.0, 2.0)
     
     # Generate Persona-driven Reason
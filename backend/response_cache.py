@@ -0,0 +1,104 @@
+"""
+Recommendation Response Cache
+(MBTI, 종목 스냅샷 버전, 모델 버전, 테마 카탈로그 버전) 단위로 /recommend/themes 응답을 캐시
+- LRU 방식으로 오래된 항목부터 제거
+- 같은 키의 동시 miss는 한 번만 계산하고 나머지 요청은 결과를 기다림 (single-flight)
+- get_or_compute_async는 계산을 별도 Task로 실행하고 모든 요청이 shield로 대기
+  (먼저 온 요청이 취소되어도 계산과 다른 대기 요청에는 영향 없음)
+"""
+
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+def seed_for_key(base_seed: int, key: Hashable) -> int:
+    """캐시 키별 결정적 노이즈 seed (같은 키면 항상 같은 seed)"""
+    digest = hashlib.sha1(f"{base_seed}:{key!r}".encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'little')
+
+
+class ResponseCache:
+    """LRU + single-flight 응답 캐시"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """캐시된 값 (없으면 None)"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        return None
+
+    async def get_or_compute_async(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        캐시된 값을 반환하거나, 없으면 compute()로 계산 후 저장 (같은 이벤트 루프의 동시 요청끼리 single-flight)
+
+        Args:
+            key: 캐시 키
+            compute: 값을 계산하는 coroutine 함수
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            # 계산은 요청과 분리된 Task에서 실행: 어떤 요청이 취소되어도 계산은 끝까지 진행되어 캐시에 저장됨
+            task = asyncio.ensure_future(self._compute_async(key, compute))
+            # 대기 요청이 모두 취소된 경우 'exception was never retrieved' 경고 방지
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = task
+            self.misses += 1
+        # 취소된 요청은 자신의 대기만 끝내고 계산 Task는 그대로 둠
+        return await asyncio.shield(task)
+
+    async def _compute_async(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await compute()
+            with self._lock:
+                self._store(key, value)
+            return value
+        finally:
+            del self._inflight[key]
+
+    def _store(self, key: Hashable, value: Any):
+        # self._lock을 잡은 상태에서 호출
+        if self.max_entries > 0:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 카운터"""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'max_entries': self.max_entries,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,315 @@
+"""
+Vectorized Rule Scoring Engine
+ranker.score_stock 로직을 종목 전체에 대해 NumPy 배열 연산으로 한 번에 계산
+- 종목 데이터는 StockColumns(컬럼 배열)로 한 번만 변환
+- 설명(reason) 문자열은 최종 Top-K 종목에 대해서만 생성
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ranker import MBTI_PROFILES, CATEGORY_WEIGHTS
+from sector_index import SectorIndex
+
+
+# Theme Persona 가중치 배수 (ranker.score_stock과 동일)
+THEME_MULTIPLIER = 4.0
+
+# 점수에 더해지는 무작위 노이즈 범위 (±)
+NOISE_AMPLITUDE = 2.0
+
+# 기여도 항목 (score_stock의 contributions 삽입 순서와 동일해야 동점 시 같은 항목이 선택됨)
+FACTOR_NAMES = [
+    'momentum',
+    'volatility',
+    'dividend',
+    'dividend_penalty',
+    'persona_avoid',
+    'theme_persona',
+    'market_cap',
+    'rsi',
+    'beta',
+]
+FACTOR_INDEX = {name: i for i, name in enumerate(FACTOR_NAMES)}
+
+VOLATILITY_SCORES = {'low': 0.5, 'high': 2.0, 'very-high': 3.0}
+
+
+def make_rng(seed: Optional[int] = None) -> np.random.Generator:
+    """노이즈용 난수 생성기 (seed를 주면 재현 가능)"""
+    return np.random.default_rng(seed)
+
+
+class StockColumns:
+    """종목 Feature를 컬럼 배열로 보관 (score_stock과 같은 규칙으로 파싱)"""
+
+    def __init__(
+        self,
+        change_percent: np.ndarray,
+        volatility_score: np.ndarray,
+        dividend_yield: np.ndarray,
+        cap_is_large: np.ndarray,
+        cap_is_jumbo: np.ndarray,
+        sectors: np.ndarray,
+        names: np.ndarray,
+        sector_index: SectorIndex,
+        momentum: Optional[np.ndarray] = None,
+        rsi: Optional[np.ndarray] = None,
+        beta: Optional[np.ndarray] = None
+    ):
+        """
+        Args:
+            momentum: 모멘텀 (None이면 change_percent와 같음)
+            rsi / beta: 가격 이력 기반 지표 (지표가 없는 종목은 NaN, None이면 전부 NaN)
+        """
+        n = len(change_percent)
+        self.change_percent = change_percent
+        self.momentum = momentum if momentum is not None else change_percent
+        self.rsi = rsi if rsi is not None else np.full(n, np.nan)
+        self.beta = beta if beta is not None else np.full(n, np.nan)
+        self.volatility_score = volatility_score
+        self.dividend_yield = dividend_yield
+        self.cap_is_large = cap_is_large
+        self.cap_is_jumbo = cap_is_jumbo
+        self.sectors = sectors
+        self.names = names
+        self.sector_index = sector_index
+
+    @classmethod
+    def from_features(cls, features_list: Sequence[Dict[str, Any]]) -> "StockColumns":
+        """
+        Feature 딕셔너리 리스트를 컬럼 배열로 변환
+
+        Args:
+            features_list: score_stock에 넘기던 stock_features 딕셔너리 리스트
+        """
+        n = len(features_list)
+        change_percent = np.empty(n, dtype=np.float64)
+        momentum = np.empty(n, dtype=np.float64)
+        rsi = np.full(n, np.nan)
+        beta = np.full(n, np.nan)
+        volatility_score = np.empty(n, dtype=np.float64)
+        dividend_yield = np.empty(n, dtype=np.float64)
+        cap_is_large = np.empty(n, dtype=bool)
+        cap_is_jumbo = np.empty(n, dtype=bool)
+        sectors: List[str] = []
+        names: List[str] = []
+
+        for i, f in enumerate(features_list):
+            change_percent[i] = float(f.get('change_percent') or f.get('changePercent') or 0)
+            momentum[i] = change_percent[i] if f.get('momentum') is None else float(f['momentum'])
+            if f.get('indicators_as_of') is not None:
+                rsi[i] = float(f.get('rsi', 50))
+                if f.get('beta') is not None:
+                    beta[i] = float(f['beta'])
+            volatility_score[i] = VOLATILITY_SCORES.get(f.get('volatility') or 'medium', 1.0)
+            dividend_yield[i] = float(f.get('dividend_yield') or 0)
+
+            market_cap = f.get('market_cap') or 'medium'
+            if isinstance(market_cap, str):
+                cap_is_large[i] = cap_is_jumbo[i] = market_cap == 'large'
+            else:
+                market_cap = float(market_cap)
+                cap_is_large[i] = market_cap > 1000000000000
+                cap_is_jumbo[i] = market_cap > 10000000000000
+
+            sectors.append(str(f.get('sector') or ''))
+            names.append(str(f.get('name') or ''))
+
+        sectors = np.array(sectors, dtype=str)
+        names = np.array(names, dtype=str)
+
+        return cls(
+            change_percent,
+            volatility_score,
+            dividend_yield,
+            cap_is_large,
+            cap_is_jumbo,
+            sectors,
+            names,
+            SectorIndex.build(sectors, names),
+            momentum,
+            rsi,
+            beta
+        )
+
+    def take(self, indices: np.ndarray) -> "StockColumns":
+        """일부 종목만 골라낸 컬럼 반환"""
+        return StockColumns(
+            self.change_percent[indices],
+            self.volatility_score[indices],
+            self.dividend_yield[indices],
+            self.cap_is_large[indices],
+            self.cap_is_jumbo[indices],
+            self.sectors[indices],
+            self.names[indices],
+            self.sector_index.take(indices),
+            self.momentum[indices],
+            self.rsi[indices],
+            self.beta[indices]
+        )
+
+    def __len__(self) -> int:
+        return len(self.change_percent)
+
+
+class RuleScores:
+    """score_columns 결과 (점수 배열 + 설명 생성기)"""
+
+    def __init__(
+        self,
+        scores: np.ndarray,
+        top_factors: np.ndarray,
+        columns: StockColumns,
+        persona_name: str,
+        w_vol: float
+    ):
+        self.scores = scores
+        self.top_factors = top_factors
+        self.columns = columns
+        self.persona_name = persona_name
+        self.w_vol = w_vol
+
+    def reason(self, i: int) -> str:
+        """i번째 종목의 Persona 기반 설명 (score_stock과 동일한 문구)"""
+        persona_name = self.persona_name
+        top_factor = FACTOR_NAMES[self.top_factors[i]]
+
+        if top_factor == 'theme_persona':
+            return f"[{persona_name}]가 가장 사랑하는 {self.columns.sectors[i]} 섹터의 핵심 종목입니다."
+        elif top_factor == 'dividend':
+            return f"[{persona_name}]를 미소 짓게 할 {float(self.columns.dividend_yield[i])}%의 환상적인 배당 수익률!"
+        elif top_factor == 'momentum':
+            return f"전형적인 상승 곡선! [{persona_name}]의 레이더망에 포착되었습니다."
+        elif top_factor == 'volatility' and self.w_vol < 0:
+            return f"[{persona_name}]의 철칙인 리스크 관리에 완벽히 부합하는 견고한 흐름입니다."
+        return f"당신의 MBTI와 [{persona_name}]의 전략이 만난 최적의 교집합입니다."
+
+    def with_noise(self, rng: Optional[np.random.Generator] = None) -> "RuleScores":
+        """노이즈를 더하고 0-100으로 clip한 점수 (score_columns_base 결과에 적용)"""
+        rng = rng if rng is not None else make_rng()
+        noise = rng.uniform(-NOISE_AMPLITUDE, NOISE_AMPLITUDE, len(self.scores))
+        return RuleScores(
+            np.clip(self.scores + noise, 0.0, 100.0),
+            self.top_factors,
+            self.columns,
+            self.persona_name,
+            self.w_vol
+        )
+
+
+def rule_persona(mbti: str, theme_category: str) -> Tuple[str, float]:
+    """설명 문구에 쓰이는 (Persona 이름, 변동성 가중치) - score_columns_base와 같은 규칙"""
+    base_profile = MBTI_PROFILES.get(mbti.upper(), MBTI_PROFILES["INTJ"])
+    theme_modifier = CATEGORY_WEIGHTS.get(theme_category, CATEGORY_WEIGHTS.get("default", {}))
+    w_vol = base_profile.get('volatility', 0) + theme_modifier.get('volatility', 0) * THEME_MULTIPLIER
+    return theme_modifier.get('persona', '분석가'), w_vol
+
+
+def score_columns(
+    columns: StockColumns,
+    mbti: str,
+    theme_category: str,
+    rng: Optional[np.random.Generator] = None
+) -> RuleScores:
+    """
+    MBTI 기본 성향 + 테마 Persona로 전체 종목 점수를 한 번에 계산
+
+    Args:
+        columns: 종목 컬럼 배열
+        mbti: MBTI 타입
+        theme_category: 테마 카테고리
+        rng: 노이즈 난수 생성기 (None이면 매번 새로 생성)
+
+    Returns:
+        RuleScores (0-100으로 clip된 점수, 종목별 주요 기여 항목)
+    """
+    return score_columns_base(columns, mbti, theme_category).with_noise(rng)
+
+
+def score_columns_base(
+    columns: StockColumns,
+    mbti: str,
+    theme_category: str
+) -> RuleScores:
+    """
+    노이즈와 clip을 적용하기 전의 결정적 Rule 점수 (점수표 사전 계산용)
+
+    Returns:
+        RuleScores (clip 전 점수, 종목별 주요 기여 항목)
+    """
+    base_profile = MBTI_PROFILES.get(mbti.upper(), MBTI_PROFILES["INTJ"])
+    theme_modifier = CATEGORY_WEIGHTS.get(theme_category, CATEGORY_WEIGHTS.get("default", {}))
+
+    n = len(columns)
+    score = np.full(n, 50.0)
+    # 해당 항목이 없는 종목은 -inf로 두어 argmax에서 제외
+    contributions = np.full((len(FACTOR_NAMES), n), -np.inf)
+
+    # 1. Momentum & Volatility
+    w_mom = base_profile.get('momentum', 0) + theme_modifier.get('momentum', 0) * THEME_MULTIPLIER
+    mom_score = columns.momentum * w_mom * 3.0
+    score += mom_score
+    contributions[FACTOR_INDEX['momentum']] = mom_score
+
+    w_vol = base_profile.get('volatility', 0) + theme_modifier.get('volatility', 0) * THEME_MULTIPLIER
+    vol_contrib = columns.volatility_score * w_vol * 10.0
+    score += vol_contrib
+    contributions[FACTOR_INDEX['volatility']] = vol_contrib
+
+    # 2. Dividend
+    w_div = base_profile.get('dividend', 0) + theme_modifier.get('dividend', 0) * THEME_MULTIPLIER
+    if w_div > 0:
+        has_div = columns.dividend_yield > 0
+        div_score = columns.dividend_yield * w_div * 6.0
+        score += np.where(has_div, div_score, 0.0)
+        contributions[FACTOR_INDEX['dividend']] = np.where(has_div, div_score, -np.inf)
+        if theme_modifier.get('dividend', 0) > 0:
+            score -= np.where(has_div, 0.0, 100.0)
+            contributions[FACTOR_INDEX['dividend_penalty']] = np.where(has_div, -np.inf, -100.0)
+
+    # 3. Sector & Name Persona Matching (스냅샷 단위로 미리 계산된 마스크 조회)
+    avoid_mask = columns.sector_index.avoided(theme_category)
+    score -= np.where(avoid_mask, 60.0, 0.0)
+    contributions[FACTOR_INDEX['persona_avoid']] = np.where(avoid_mask, -60.0, -np.inf)
+
+    fav_mask = columns.sector_index.favoured(theme_category)
+    score += np.where(fav_mask, 60.0, 0.0)
+    contributions[FACTOR_INDEX['theme_persona']] = np.where(fav_mask, 60.0, -np.inf)
+
+    # 4. Market Cap
+    w_cap = base_profile.get('market_cap', 0) + theme_modifier.get('market_cap', 0) * THEME_MULTIPLIER
+    if w_cap != 0:
+        if w_cap > 0:
+            cap_score = w_cap * np.where(columns.cap_is_jumbo, 30.0, np.where(columns.cap_is_large, 15.0, 2.0))
+        else:
+            cap_score = abs(w_cap) * np.where(columns.cap_is_large, 2.0, 20.0)
+        score += cap_score
+        contributions[FACTOR_INDEX['market_cap']] = cap_score
+
+    # 5. RSI & Beta (지표가 없는 종목(NaN)은 기여 없음)
+    has_rsi = ~np.isnan(columns.rsi)
+    if has_rsi.any():
+        w_rsi = base_profile.get('rsi', 0) + theme_modifier.get('rsi', 0) * THEME_MULTIPLIER
+        rsi_score = (columns.rsi - 50.0) / 50.0 * w_rsi * 5.0
+        score += np.where(has_rsi, rsi_score, 0.0)
+        contributions[FACTOR_INDEX['rsi']] = np.where(has_rsi, rsi_score, -np.inf)
+
+    has_beta = ~np.isnan(columns.beta)
+    if has_beta.any():
+        w_beta = base_profile.get('beta', 0) + theme_modifier.get('beta', 0) * THEME_MULTIPLIER
+        beta_score = (columns.beta - 1.0) * w_beta * 10.0
+        score += np.where(has_beta, beta_score, 0.0)
+        contributions[FACTOR_INDEX['beta']] = np.where(has_beta, beta_score, -np.inf)
+
+    # 6. 소량의 무작위 노이즈는 with_noise에서 적용
+    top_factors = contributions.argmax(axis=0) if n else np.zeros(0, dtype=np.intp)
+
+    return RuleScores(
+        score,
+        top_factors,
+        columns,
+        theme_modifier.get('persona', '분석가'),
+        w_vol
+    )
@@ -0,0 +1,368 @@
+"""
+Precomputed Score Tables
+스냅샷(일일 동기화) 단위로 16 MBTI x 테마 카테고리 x 종목의 Rule/ML 점수를 미리 계산해 저장
+- Rule 점수는 노이즈/clip 전 값(float64)과 주요 기여 항목(uint8), ML 점수는 0-100 정규화 값(float32)
+- 요청 시에는 테마 후보 행 조회 + 노이즈 + 가중 평균 + diversity Top-K만 수행
+- 스냅샷/모델 버전이 다르면(stale) 사용하지 않고 요청 시 계산으로 대체
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ranker import CATEGORY_WEIGHTS, get_theme_catalog
+from rule_engine import RuleScores, StockColumns, rule_persona, score_columns_base
+from hybrid_ranker import HybridStockRanker, blend_scores
+from metrics import pipeline_context
+from ml.feature_extractor import StockFeatureExtractor, extract_stock_features_from_db
+from ml.registry import MBTI_TYPES, ModelRegistry, get_model_registry
+
+
+# 저장 형식이 바뀌면 올려서 이전 형식의 테이블을 읽지 않도록 함
+SCORE_TABLE_FORMAT = 1
+
+
+class MBTIScoreTable:
+    """한 MBTI의 카테고리 x 종목 점수표 (열 순서 = 스냅샷 candidates 순서)"""
+
+    def __init__(
+        self,
+        mbti: str,
+        categories: List[str],
+        rule_base: np.ndarray,
+        top_factors: np.ndarray,
+        ml_scores: Optional[np.ndarray],
+        model_version: Optional[str]
+    ):
+        self.mbti = mbti
+        self.categories = categories
+        self.category_rows = {category: i for i, category in enumerate(categories)}
+        self.rule_base = rule_base
+        self.top_factors = top_factors
+        self.ml_scores = ml_scores
+        self.model_version = model_version
+
+    @property
+    def has_ml(self) -> bool:
+        return self.ml_scores is not None
+
+    @property
+    def nbytes(self) -> int:
+        total = self.rule_base.nbytes + self.top_factors.nbytes
+        return total + (self.ml_scores.nbytes if self.ml_scores is not None else 0)
+
+    def __contains__(self, category: str) -> bool:
+        return category in self.category_rows
+
+    def score(
+        self,
+        category: str,
+        theme_indices: np.ndarray,
+        theme_columns: StockColumns,
+        rng: np.random.Generator,
+        ml_weight: float = 0.5
+    ) -> Tuple[np.ndarray, Callable[[int], str]]:
+        """
+        테마 후보의 점수 (build_theme_recommendations의 요청 시 계산과 같은 값)
+
+        Args:
+            category: 테마 카테고리 (category in table인 경우만)
+            theme_indices: 테마 후보의 스냅샷 인덱스
+            theme_columns: theme_indices로 take한 컬럼 (설명 문구용)
+            rng: 노이즈 난수 생성기
+            ml_weight: ML 가중치
+
+        Returns:
+            (점수 배열, i번째 후보의 설명을 만드는 함수)
+        """
+        row = self.category_rows[category]
+        persona_name, w_vol = rule_persona(self.mbti, category)
+        rule = RuleScores(
+            self.rule_base[row][theme_indices],
+            self.top_factors[row][theme_indices],
+            theme_columns,
+            persona_name,
+            w_vol
+        ).with_noise(rng)
+        if self.ml_scores is None:
+            return rule.scores, rule.reason
+        ml_scores = self.ml_scores[row][theme_indices].astype(np.float64)
+        return blend_scores(ml_scores, rule, ml_weight)
+
+
+class ScoreTables:
+    """스냅샷 버전 하나의 MBTI별 점수표"""
+
+    def __init__(self, snapshot_version: str, tables: Dict[str, MBTIScoreTable], built_at: Optional[float] = None):
+        self.snapshot_version = snapshot_version
+        self.tables = tables
+        self.built_at = built_at if built_at is not None else time.time()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(table.nbytes for table in self.tables.values())
+
+
+def table_categories(mbti: str) -> List[str]:
+    """MBTI별로 점수표를 만들 카테고리 (CATEGORY_WEIGHTS + 테마 카탈로그에 있는 카테고리)"""
+    categories = list(CATEGORY_WEIGHTS)
+    for theme in get_theme_catalog().get(mbti):
+        category = theme.get('category', 'default')
+        if category not in categories:
+            categories.append(category)
+    return categories
+
+
+def build_score_tables(
+    snapshot: Any,
+    registry: Optional[ModelRegistry] = None,
+    mbti_types: Optional[List[str]] = None
+) -> ScoreTables:
+    """
+    스냅샷의 전체 종목에 대해 MBTI x 카테고리 점수표 계산
+
+    Args:
+        snapshot: StockUniverseSnapshot
+        registry: 모델 레지스트리 (None이면 기본 레지스트리)
+        mbti_types: 계산할 MBTI 목록 (None이면 16개 전체)
+    """
+    start = time.perf_counter()
+    registry = registry or get_model_registry()
+    columns = snapshot.columns
+
+    stock_block = None
+    if snapshot.feature_block is not None:
+        stock_block = snapshot.feature_block.block
+    else:
+        stock_block = StockFeatureExtractor().stock_block(
+            [extract_stock_features_from_db(c['features']) for c in snapshot.candidates]
+        )
+
+    tables: Dict[str, MBTIScoreTable] = {}
+    for mbti in (mbti_types or MBTI_TYPES):
+        categories = table_categories(mbti)
+        n = len(snapshot.candidates)
+        rule_base = np.empty((len(categories), n), dtype=np.float64)
+        top_factors = np.empty((len(categories), n), dtype=np.uint8)
+
+        hybrid_ranker = HybridStockRanker(mbti, registry)
+        use_ml = hybrid_ranker.ml_ranker is not None
+        ml_scores = np.empty((len(categories), n), dtype=np.float32) if use_ml else None
+
+        for row, category in enumerate(categories):
+            rule = score_columns_base(columns, mbti, category)
+            rule_base[row] = rule.scores
+            top_factors[row] = rule.top_factors
+            if use_ml:
+                # score_block_ml은 float32 예측값을 정규화한 값이므로 float32로 손실 없이 저장
+                ml_scores[row] = hybrid_ranker.score_block_ml(stock_block, category)
+
+        tables[mbti] = MBTIScoreTable(
+            mbti, categories, rule_base, top_factors, ml_scores, registry.version(mbti)
+        )
+
+    score_tables = ScoreTables(snapshot.version, tables)
+    print(
+        f"[ScoreTables] Built {snapshot.version} ({len(tables)} MBTI, {score_tables.nbytes} bytes) "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    return score_tables
+
+
+class ScoreTableStore:
+    """스냅샷 버전 -> ScoreTables (메모리 + 디스크 memmap), 백그라운드 빌드 지원"""
+
+    def __init__(
+        self,
+        directory: Optional[str] = 'cache/score_tables',
+        keep_versions: int = 3,
+        registry: Optional[ModelRegistry] = None
+    ):
+        """
+        Args:
+            directory: 점수표 저장 디렉토리 (None이면 메모리에만 보관)
+            keep_versions: 디스크에 남겨둘 최근 버전 수
+            registry: 빌드/버전 확인에 사용할 모델 레지스트리 (None이면 기본 레지스트리)
+        """
+        self.directory = directory
+        self.keep_versions = keep_versions
+        self._registry = registry
+        self._lock = threading.Lock()
+        self._current: Optional[ScoreTables] = None
+        self._building: Optional[str] = None
+        self._failed_version: Optional[str] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.builds = 0
+        self.build_failures = 0
+        self.disk_loads = 0
+
+    @property
+    def registry(self) -> ModelRegistry:
+        return self._registry or get_model_registry()
+
+    def _path(self, snapshot_version: str) -> str:
+        return os.path.join(self.directory, f"v{SCORE_TABLE_FORMAT}-{snapshot_version}")
+
+    def save(self, score_tables: ScoreTables):
+        """버전 디렉토리로 저장 (임시 디렉토리에 쓴 뒤 이름 변경, 모델 변경으로 다시 만든 경우 교체)"""
+        path = self._path(score_tables.snapshot_version)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(tmp_path, exist_ok=True)
+            meta = {
+                'snapshot_version': score_tables.snapshot_version,
+                'built_at': score_tables.built_at,
+                'tables': {},
+            }
+            for mbti, table in score_tables.tables.items():
+                np.save(os.path.join(tmp_path, f"{mbti}.rule.npy"), table.rule_base)
+                np.save(os.path.join(tmp_path, f"{mbti}.factors.npy"), table.top_factors)
+                if table.ml_scores is not None:
+                    np.save(os.path.join(tmp_path, f"{mbti}.ml.npy"), table.ml_scores)
+                meta['tables'][mbti] = {
+                    'categories': table.categories,
+                    'model_version': table.model_version,
+                    'has_ml': table.has_ml,
+                }
+            with open(os.path.join(tmp_path, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+            if os.path.exists(path):
+                old_path = f"{path}.{os.getpid()}.old.tmp"
+                os.rename(path, old_path)
+                os.rename(tmp_path, path)
+                shutil.rmtree(old_path, ignore_errors=True)
+            else:
+                os.rename(tmp_path, path)
+            self._prune()
+        except OSError as e:
+            print(f"[ScoreTables] Failed to save {score_tables.snapshot_version}: {e}")
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def load(self, snapshot_version: str) -> Optional[ScoreTables]:
+        """디스크의 점수표를 memory-map으로 열기 (없으면 None)"""
+        path = self._path(snapshot_version)
+        try:
+            with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            tables = {}
+            for mbti, info in meta['tables'].items():
+                tables[mbti] = MBTIScoreTable(
+                    mbti,
+                    info['categories'],
+                    np.load(os.path.join(path, f"{mbti}.rule.npy"), mmap_mode='r'),
+                    np.load(os.path.join(path, f"{mbti}.factors.npy"), mmap_mode='r'),
+                    np.load(os.path.join(path, f"{mbti}.ml.npy"), mmap_mode='r') if info['has_ml'] else None,
+                    info['model_version']
+                )
+        except (OSError, ValueError, KeyError) as e:
+            if os.path.exists(path):
+                print(f"[ScoreTables] Failed to load {snapshot_version}: {e}")
+            return None
+        return ScoreTables(snapshot_version, tables, meta.get('built_at'))
+
+    def _prune(self):
+        """오래된 버전 디렉토리 삭제"""
+        versions = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.startswith(f"v{SCORE_TABLE_FORMAT}-") and not name.endswith('.tmp')
+        ]
+        versions.sort(key=os.path.getmtime, reverse=True)
+        for path in versions[self.keep_versions:]:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _tables_for(self, snapshot_version: str) -> Optional[ScoreTables]:
+        current = self._current
+        if current is not None and current.snapshot_version == snapshot_version:
+            return current
+        if not self.directory:
+            return None
+        with self._lock:
+            current = self._current
+            if current is not None and current.snapshot_version == snapshot_version:
+                return current
+            score_tables = self.load(snapshot_version)
+            if score_tables is not None:
+                self.disk_loads += 1
+                self._current = score_tables
+                print(f"[ScoreTables] Memory-mapped {snapshot_version} ({len(score_tables.tables)} MBTI)")
+            return score_tables
+
+    def lookup(self, mbti: str, snapshot_version: str) -> Optional[MBTIScoreTable]:
+        """
+        MBTI 점수표 조회
+        - 스냅샷 버전의 점수표가 없거나, 만든 뒤 모델이 바뀌었으면 None (요청 시 계산)
+        """
+        score_tables = self._tables_for(snapshot_version)
+        table = score_tables.tables.get(mbti.upper()) if score_tables is not None else None
+        if table is None:
+            self.misses += 1
+            return None
+        if table.model_version != self.registry.version(mbti):
+            self.stale += 1
+            return None
+        self.hits += 1
+        return table
+
+    def build(self, snapshot: Any) -> Optional[ScoreTables]:
+        """스냅샷 점수표 계산 후 저장하고 현재 점수표로 교체"""
+        try:
+            with pipeline_context('score_table_build'):
+                score_tables = build_score_tables(snapshot, self.registry)
+        except Exception as e:
+            self.build_failures += 1
+            self._failed_version = snapshot.version
+            print(f"[ScoreTables] Build failed for {snapshot.version}: {e}")
+            return None
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            self.save(score_tables)
+        self._current = score_tables
+        self.builds += 1
+        return score_tables
+
+    def build_in_background(self, snapshot: Any) -> bool:
+        """
+        백그라운드 스레드에서 빌드 (빌드 중이거나 이 스냅샷 빌드가 이미 실패했으면 무시)
+
+        Returns:
+            새 빌드를 시작했으면 True
+        """
+        with self._lock:
+            if self._building is not None or self._failed_version == snapshot.version:
+                return False
+            self._building = snapshot.version
+
+        def run():
+            try:
+                self.build(snapshot)
+            finally:
+                self._building = None
+
+        threading.Thread(target=run, name="score-table-build", daemon=True).start()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        current = self._current
+        return {
+            'snapshot_version': current.snapshot_version if current else None,
+            'mbti': len(current.tables) if current else 0,
+            'bytes': current.nbytes if current else 0,
+            'built_at': current.built_at if current else None,
+            'building': self._building,
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale': self.stale,
+            'builds': self.builds,
+            'build_failures': self.build_failures,
+            'disk_loads': self.disk_loads,
+            'directory': self.directory,
+        }
@@ -0,0 +1,85 @@
+"""
+Sector / Keyword Match Index
+테마 Persona(CATEGORY_WEIGHTS)의 선호/회피 섹터와 Feature 추출기의 섹터 버킷에 해당하는 종목을
+스냅샷당 한 번만 계산하여 bool 마스크로 보관
+- 요청 시점의 섹터 매칭은 (종목 수 x 키워드 수) substring 검색 대신 마스크 조회로 처리
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+from ranker import CATEGORY_WEIGHTS
+from ml.feature_extractor import SECTOR_BUCKETS, match_keywords
+
+
+# recommend_themes의 '기술주' 후보 필터 키워드
+TECH_FILTER_KEYWORDS = ['반도체', 'IT', '소프트웨어', '과학', '기술']
+
+
+class SectorIndex:
+    """키 -> 종목 bool 마스크 (행: 키, 열: 스냅샷 내 종목 순서)"""
+
+    def __init__(self, keys: List[str], masks: np.ndarray):
+        self.keys = keys
+        self.masks = masks
+        self._rows: Dict[str, int] = {key: i for i, key in enumerate(keys)}
+
+    @classmethod
+    def build(cls, sectors: np.ndarray, names: np.ndarray) -> "SectorIndex":
+        """
+        섹터/종목명 컬럼으로 인덱스 생성
+
+        Args:
+            sectors: 섹터 문자열 배열
+            names: 종목명 문자열 배열
+        """
+        keys: List[str] = []
+        rows: List[np.ndarray] = []
+
+        # 테마 Persona: 선호 섹터(섹터명 또는 종목명 일치), 회피 섹터(섹터명 일치)
+        for category, weights in CATEGORY_WEIGHTS.items():
+            favoured = weights.get('sectors', [])
+            keys.append(f'favoured:{category}')
+            rows.append(match_keywords(sectors, favoured) | match_keywords(names, favoured))
+            keys.append(f'avoided:{category}')
+            rows.append(match_keywords(sectors, weights.get('avoid', [])))
+
+        # Feature 추출기 섹터 버킷
+        any_bucket = np.zeros(len(sectors), dtype=bool)
+        for bucket, keywords in SECTOR_BUCKETS.items():
+            hits = match_keywords(sectors, keywords)
+            any_bucket |= hits
+            keys.append(f'bucket:{bucket}')
+            rows.append(hits)
+        keys.append('bucket:other')
+        rows.append((sectors != '') & ~any_bucket)
+
+        keys.append('tech_filter')
+        rows.append(match_keywords(sectors, TECH_FILTER_KEYWORDS))
+
+        masks = np.vstack(rows) if rows else np.zeros((0, len(sectors)), dtype=bool)
+        return cls(keys, masks)
+
+    def mask(self, key: str) -> np.ndarray:
+        """키에 해당하는 종목 마스크"""
+        return self.masks[self._rows[key]]
+
+    def favoured(self, theme_category: str) -> np.ndarray:
+        """테마 선호 섹터(섹터명/종목명) 일치 마스크 (없는 카테고리는 default)"""
+        category = theme_category if theme_category in CATEGORY_WEIGHTS else 'default'
+        return self.mask(f'favoured:{category}')
+
+    def avoided(self, theme_category: str) -> np.ndarray:
+        """테마 회피 섹터 일치 마스크 (없는 카테고리는 default)"""
+        category = theme_category if theme_category in CATEGORY_WEIGHTS else 'default'
+        return self.mask(f'avoided:{category}')
+
+    def sector_one_hot(self) -> np.ndarray:
+        """Feature 추출기의 섹터 One-Hot 블록 (n x 5, sector_tech ... sector_other 순서)"""
+        buckets = [f'bucket:{bucket}' for bucket in SECTOR_BUCKETS] + ['bucket:other']
+        return np.stack([self.mask(key) for key in buckets], axis=1).astype(np.float32)
+
+    def take(self, indices: np.ndarray) -> "SectorIndex":
+        """일부 종목만 골라낸 인덱스 반환"""
+        return SectorIndex(self.keys, self.masks[:, indices])
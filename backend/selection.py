@@ -0,0 +1,95 @@
+"""
+Top-K Selection with Cross-Theme Diversity
+전체 정렬 없이 부분 선택(argpartition)으로 상위 K개 종목을 고르고,
+앞선 테마의 상위 종목에는 선택 과정에서 중복 패널티를 적용
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def top_k_indices(
+    primary: np.ndarray,
+    k: Optional[int] = None,
+    secondary: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    primary 내림차순 상위 k개 인덱스 (동점이면 secondary 내림차순, 그래도 같으면 원래 순서)
+    - 파이썬 stable sort(reverse=True)를 primary/secondary 순으로 적용한 결과와 동일
+
+    Args:
+        primary: 1차 정렬 키
+        k: 선택할 개수 (None이면 전체 정렬)
+        secondary: 2차 정렬 키
+
+    Returns:
+        선택된 인덱스 배열 (순위 순)
+    """
+    n = len(primary)
+    candidates = np.arange(n)
+
+    if k is not None and k < n:
+        if k <= 0:
+            return candidates[:0]
+        # k번째로 큰 값 이상인 종목만 남긴 뒤 그 안에서만 정렬 (동점 포함)
+        threshold = np.partition(primary, n - k)[n - k]
+        candidates = np.flatnonzero(primary >= threshold)
+
+    keys = [candidates]
+    if secondary is not None:
+        keys.append(-secondary[candidates])
+    keys.append(-primary[candidates])
+    order = candidates[np.lexsort(keys)]
+
+    return order if k is None else order[:k]
+
+
+class DiverseTopKSelector:
+    """
+    테마별 Top-K 선택기
+    - 이전 테마 상위 diversity_depth 종목은 이후 테마에서 점수에 penalty를 곱함
+    - 최종 점수는 정수로 내림한 값으로 비교 (응답의 score와 동일)
+    """
+
+    def __init__(
+        self,
+        universe_size: int,
+        k: int = 10,
+        diversity_depth: int = 3,
+        penalty: float = 0.8
+    ):
+        """
+        Args:
+            universe_size: 전체 종목 수 (종목은 universe 인덱스로 식별)
+            k: 테마별 선택 개수
+            diversity_depth: 다음 테마에서 패널티를 받을 상위 종목 수
+            penalty: 중복 종목 점수 배수
+        """
+        self.k = k
+        self.diversity_depth = diversity_depth
+        self.penalty = penalty
+        self._used = np.zeros(universe_size, dtype=bool)
+
+    def select(
+        self,
+        scores: np.ndarray,
+        universe_indices: np.ndarray,
+        tie_break: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        한 테마의 Top-K 선택
+
+        Args:
+            scores: 후보 점수 배열
+            universe_indices: 후보별 universe 인덱스
+            tie_break: 정수 점수가 같을 때 사용할 2차 키 (내림차순)
+
+        Returns:
+            (선택된 후보 인덱스, 해당 종목의 패널티 적용 점수)
+        """
+        final_scores = np.where(self._used[universe_indices], scores * self.penalty, scores)
+        order = top_k_indices(np.trunc(final_scores), self.k, tie_break)
+
+        self._used[universe_indices[order[:self.diversity_depth]]] = True
+        return order, final_scores[order]
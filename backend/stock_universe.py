@@ -0,0 +1,308 @@
+"""
+Stock Universe Snapshot Cache
+stocks 테이블을 프로세스 단위 메모리 스냅샷으로 유지하여 요청마다 전체 테이블을 조회하지 않도록 함
+- TTL 만료 또는 last_sync_date 변경 시 백그라운드에서 재조회 후 원자적으로 교체
+- hit/miss/age 카운터로 응답 데이터의 신선도 확인 가능
+- IndicatorEngine이 있으면 stock_prices_daily 기반 기술적 지표를 후보 Feature에 반영
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from supabase import Client
+
+from rule_engine import StockColumns
+from feature_store import StockFeatureBlock, StockFeatureStore
+from indicators import IndicatorEngine, IndicatorSnapshot, volatility_label
+
+
+def build_candidate(stock_row: Dict[str, Any], indicators: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    stocks 테이블 row를 추천 후보 객체로 변환
+
+    Args:
+        stock_row: Supabase에서 가져온 주식 데이터 row
+        indicators: IndicatorSnapshot.for_ticker 결과 (없으면 stocks 값으로 대체)
+
+    Returns:
+        {"ticker", "name", "currency", "features"} 형태의 후보 객체
+    """
+    features = {
+        "rsi": 50, # Default (가격 이력이 없을 때)
+        "volatility": stock_row.get('volatility', 'medium'),
+        "change_percent": float(stock_row.get('change_percent') or 0),
+        "momentum": float(stock_row.get('change_percent') or 0), # Proxy (가격 이력이 없을 때)
+        "market_cap": stock_row.get('market_cap', 0),
+        "close": float(stock_row.get('price') or 0), # For price
+        "sector": stock_row.get('sector', ''),
+        "dividend_yield": float(stock_row.get('dividend_yield') or 0)
+    }
+    if indicators:
+        # 계산된 지표만 덮어씀 (이력이 짧은 신규 종목은 일부 지표만 존재)
+        features.update(indicators)
+        if 'realized_volatility' in indicators:
+            features['volatility'] = volatility_label(indicators['realized_volatility'])
+    return {
+        "ticker": stock_row.get('ticker'),
+        "name": stock_row.get('name'),
+        "currency": "KRW",
+        "features": features
+    }
+
+
+class StockUniverseSnapshot:
+    """특정 시점의 stocks 테이블 스냅샷 (읽기 전용으로 취급)"""
+
+    def __init__(
+        self,
+        rows: List[Dict[str, Any]],
+        feature_store: Optional[StockFeatureStore] = None,
+        indicators: Optional[IndicatorSnapshot] = None
+    ):
+        self.rows = rows
+        self.indicators_as_of = indicators.as_of if indicators is not None else None
+        self.candidates = [
+            build_candidate(row, indicators.for_ticker(row.get('ticker')) if indicators is not None else None)
+            for row in rows
+        ]
+        # Rule 엔진용 컬럼 배열 (스냅샷당 한 번만 변환)
+        self.columns = StockColumns.from_features([c['features'] for c in self.candidates])
+        self.last_sync_date = max(
+            (str(row['last_sync_date']) for row in rows if row.get('last_sync_date')),
+            default=None
+        )
+        # 지표 버전도 포함 (stocks가 그대로여도 새 거래일 지표가 들어오면 Feature/점수표를 다시 만듦)
+        digest = hashlib.sha1(json.dumps(rows, sort_keys=True, default=str).encode('utf-8'))
+        if indicators is not None and indicators.version:
+            digest.update(indicators.version.encode('utf-8'))
+        self.version = digest.hexdigest()[:12]
+        # ML용 종목 Feature 블록 (candidates와 같은 행 순서, feature_store가 없으면 None)
+        self.feature_block: Optional[StockFeatureBlock] = (
+            feature_store.get(self.version, self.candidates) if feature_store is not None else None
+        )
+        self.loaded_at = time.time()
+
+    @property
+    def age_seconds(self) -> float:
+        return time.time() - self.loaded_at
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+class StockUniverseCache:
+    """stocks 스냅샷 캐시 (백그라운드 갱신 + 원자적 교체)"""
+
+    def __init__(
+        self,
+        supabase_client: Client,
+        ttl_seconds: float = 300.0,
+        check_interval: float = 30.0,
+        feature_store: Optional[StockFeatureStore] = None,
+        indicator_engine: Optional[IndicatorEngine] = None
+    ):
+        self.supabase = supabase_client
+        self.feature_store = feature_store
+        self.indicator_engine = indicator_engine
+        self.ttl_seconds = ttl_seconds
+        self.check_interval = check_interval
+
+        self._snapshot: Optional[StockUniverseSnapshot] = None
+        self._load_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def _fetch_rows(self) -> List[Dict[str, Any]]:
+        response = self.supabase.table('stocks').select('*').execute()
+        return response.data if response.data else []
+
+    def _fetch_last_sync_date(self) -> Optional[str]:
+        """전체 조회 없이 최신 last_sync_date만 확인"""
+        response = self.supabase.table('stocks')\
+            .select('last_sync_date')\
+            .order('last_sync_date', desc=True)\
+            .limit(1)\
+            .execute()
+        if response.data and response.data[0].get('last_sync_date'):
+            return str(response.data[0]['last_sync_date'])
+        return None
+
+    def _needs_refresh(self, snapshot: Optional[StockUniverseSnapshot]) -> bool:
+        if snapshot is None or snapshot.age_seconds >= self.ttl_seconds:
+            return True
+        return self._fetch_last_sync_date() != snapshot.last_sync_date
+
+    def _indicators(self) -> Optional[IndicatorSnapshot]:
+        return self.indicator_engine.latest() if self.indicator_engine is not None else None
+
+    def _refresh_indicators(self) -> bool:
+        """가격 이력이 바뀌었으면 지표 재계산 (실패해도 이전 지표로 스냅샷 갱신은 계속)"""
+        if self.indicator_engine is None:
+            return False
+        try:
+            return self.indicator_engine.refresh()
+        except Exception as e:
+            print(f"[Universe] Indicator refresh failed: {e}")
+            return False
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        필요 시 스냅샷 재조회 후 교체
+
+        Args:
+            force: TTL/last_sync_date와 무관하게 재조회
+
+        Returns:
+            스냅샷이 교체되었으면 True
+        """
+        with self._load_lock:
+            try:
+                indicators_updated = self._refresh_indicators()
+                if not force and not indicators_updated and not self._needs_refresh(self._snapshot):
+                    return False
+
+                snapshot = StockUniverseSnapshot(self._fetch_rows(), self.feature_store, self._indicators())
+                # 참조 교체는 원자적이므로 읽는 쪽은 락 없이 이전/새 스냅샷 중 하나를 봄
+                self._snapshot = snapshot
+                self.refreshes += 1
+                print(f"[Universe] Loaded {len(snapshot)} stocks (version={snapshot.version}, last_sync={snapshot.last_sync_date})")
+                return True
+
+            except Exception as e:
+                self.refresh_failures += 1
+                print(f"[Universe] Refresh failed: {e}")
+                return False
+
+    def get(self) -> StockUniverseSnapshot:
+        """
+        현재 스냅샷 반환
+        - 스냅샷이 있으면 DB를 기다리지 않고 즉시 반환 (TTL 초과분은 stale hit으로 집계)
+        - 아직 한 번도 로드되지 않았으면 동기 로드 (miss)
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            if snapshot.age_seconds >= self.ttl_seconds:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+            return snapshot
+
+        self.misses += 1
+        self.refresh(force=True)
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise RuntimeError("Stock universe snapshot unavailable")
+        return snapshot
+
+    async def get_async(self, async_client: Optional[Any] = None) -> StockUniverseSnapshot:
+        """
+        get()의 비동기 버전 (이벤트 루프에서 사용)
+        - 스냅샷이 있으면 즉시 반환
+        - 최초 로드는 비동기 클라이언트로 조회하고, 스냅샷 변환은 스레드에서 수행
+
+        Args:
+            async_client: 비동기 Supabase 클라이언트 (None이면 동기 refresh를 스레드에서 실행)
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            if snapshot.age_seconds >= self.ttl_seconds:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+            return snapshot
+
+        self.misses += 1
+        if async_client is None:
+            await asyncio.to_thread(self.refresh, True)
+        else:
+            try:
+                response = await async_client.table('stocks').select('*').execute()
+                snapshot = await asyncio.to_thread(
+                    functools.partial(StockUniverseSnapshot, response.data or [], self.feature_store, self._indicators())
+                )
+                if self._snapshot is None:
+                    self._snapshot = snapshot
+                    self.refreshes += 1
+                    print(f"[Universe] Loaded {len(snapshot)} stocks (version={snapshot.version}, last_sync={snapshot.last_sync_date})")
+            except Exception as e:
+                self.refresh_failures += 1
+                print(f"[Universe] Refresh failed: {e}")
+
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise RuntimeError("Stock universe snapshot unavailable")
+        return snapshot
+
+    def _run(self):
+        while not self._stop_event.wait(self.check_interval):
+            self.refresh()
+
+    def start(self):
+        """초기 로드 후 백그라운드 갱신 스레드 시작 (앱 시작 시 한 번 호출)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        if self._snapshot is None:
+            self.refresh(force=True)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="stock-universe-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """백그라운드 갱신 스레드 종료"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 상태 및 카운터"""
+        snapshot = self._snapshot
+        return {
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'refreshes': self.refreshes,
+            'refresh_failures': self.refresh_failures,
+            'size': len(snapshot) if snapshot else 0,
+            'version': snapshot.version if snapshot else None,
+            'last_sync_date': snapshot.last_sync_date if snapshot else None,
+            'age_seconds': round(snapshot.age_seconds, 3) if snapshot else None,
+            'ttl_seconds': self.ttl_seconds,
+            'indicators_as_of': snapshot.indicators_as_of if snapshot else None,
+        }
+
+
+# 싱글톤 인스턴스 (main.py에서 초기화)
+_universe_instance: Optional[StockUniverseCache] = None
+
+
+def init_stock_universe(
+    supabase_client: Client,
+    ttl_seconds: float = 300.0,
+    check_interval: float = 30.0,
+    feature_store: Optional[StockFeatureStore] = None,
+    indicator_engine: Optional[IndicatorEngine] = None
+) -> StockUniverseCache:
+    """스냅샷 캐시 초기화 (앱 시작 시 한 번 호출)"""
+    global _universe_instance
+    _universe_instance = StockUniverseCache(supabase_client, ttl_seconds, check_interval, feature_store, indicator_engine)
+    print("[Universe] Stock universe cache initialized")
+    return _universe_instance
+
+
+def get_stock_universe() -> StockUniverseCache:
+    """스냅샷 캐시 인스턴스 가져오기"""
+    if _universe_instance is None:
+        raise RuntimeError("Stock universe not initialized. Call init_stock_universe() first.")
+    return _universe_instance
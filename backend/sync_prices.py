@@ -0,0 +1,61 @@
+"""
+Sync stock_prices_daily into the local columnar price store
+일일 동기화(scripts/sync-daily-prices.ts) 후 실행하면 마지막 저장 거래일 며칠 전부터의 row만 다시 가져옴
+
+Usage:
+    python sync_prices.py [--dir cache/prices] [--start-date 2020-01-01]
+
+저장소가 비어 있을 때만 --start-date부터 가져오며, 더 이전 이력을 채우려면 디렉토리를 지우고 다시 실행
+"""
+
+import argparse
+import os
+import sys
+from dotenv import load_dotenv
+
+# 상위 디렉토리를 path에 추가
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from db import get_data_source
+from price_store import DEFAULT_SYNC_OVERLAP_DAYS, PriceStore
+
+# Load environment
+load_dotenv('../.env')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Incrementally sync stock_prices_daily into the local price store")
+    parser.add_argument(
+        '--dir', default=os.environ.get("PRICE_STORE_DIR", "cache/prices"),
+        help="가격 저장소 디렉토리 (API의 PRICE_STORE_DIR와 같아야 함)"
+    )
+    parser.add_argument('--start-date', default=None, help="빈 저장소의 시작 거래일 (기본: 전체 이력)")
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument(
+        '--overlap-days', type=int, default=DEFAULT_SYNC_OVERLAP_DAYS,
+        help="마지막 저장 거래일 이전 며칠부터 다시 조회할지 (오래된 backfill을 반영하려면 늘림)"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    supabase = get_data_source()
+    if supabase is None:
+        print("❌ Supabase credentials not found!")
+        sys.exit(1)
+
+    store = PriceStore(directory=args.dir)
+    synced = store.sync(
+        supabase, start_date=args.start_date, page_size=args.page_size, overlap_days=args.overlap_days
+    )
+    stats = store.stats()
+    print(
+        f"✅ {synced} rows synced: {stats['tickers']} tickers, {stats['days']} trading days "
+        f"({stats['years'][0] if stats['years'] else '-'}~{stats['last_trade_date']})"
+    )
+
+
+if __name__ == "__main__":
+    main()
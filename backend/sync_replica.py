@@ -0,0 +1,65 @@
+"""
+Create / sync the local SQLite replica used by DATA_SOURCE=replica
+public/supabase_dump.sql 스키마로 테이블을 만들고 Supabase에서 row를 복사
+
+Usage:
+    python sync_replica.py [--path cache/replica.sqlite3] [--tables stocks,financial_ratios,corp_codes,user_actions]
+    python sync_replica.py --schema-only   # 빈 복제본 (로컬 개발/테스트용)
+"""
+
+import argparse
+import os
+import sys
+from dotenv import load_dotenv
+
+# 상위 디렉토리를 path에 추가
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from db import get_supabase_client
+from local_replica import DEFAULT_SCHEMA_PATH, DEFAULT_SYNC_OVERLAP_DAYS, DEFAULT_SYNC_TABLES, LocalReplica
+
+# Load environment
+load_dotenv('../.env')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Create or sync the local SQLite replica")
+    parser.add_argument(
+        '--path', default=os.environ.get("REPLICA_PATH", "cache/replica.sqlite3"),
+        help="복제본 파일 경로 (API의 REPLICA_PATH와 같아야 함)"
+    )
+    parser.add_argument('--schema', default=os.environ.get("REPLICA_SCHEMA", DEFAULT_SCHEMA_PATH))
+    parser.add_argument(
+        '--tables', default=','.join(DEFAULT_SYNC_TABLES),
+        help="복사할 테이블 (user_actions / stock_prices_daily는 증분, 나머지는 전체 교체)"
+    )
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument(
+        '--overlap-days', type=int, default=DEFAULT_SYNC_OVERLAP_DAYS,
+        help="stock_prices_daily를 마지막 동기화 거래일 이전 몇 달력일부터 다시 조회할지 (부분 기록된 거래일 보완)"
+    )
+    parser.add_argument('--schema-only', action='store_true', help="테이블만 만들고 복사하지 않음")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    replica = LocalReplica(path=args.path, schema_path=args.schema)
+
+    if not args.schema_only:
+        supabase = get_supabase_client()
+        if supabase is None:
+            print("❌ Supabase credentials not found!")
+            sys.exit(1)
+        replica.sync_from(
+            supabase, [t for t in args.tables.split(',') if t],
+            page_size=args.page_size, overlap_days=args.overlap_days
+        )
+
+    counts = replica.row_counts()
+    replica.close()
+    print(f"✅ Replica {args.path}: " + ', '.join(f"{name}={count}" for name, count in sorted(counts.items())))
+
+
+if __name__ == "__main__":
+    main()
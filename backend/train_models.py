@@ -3,35 +3,81 @@ Train XGBoost models for all MBTI types
 모든 MBTI 타입에 대해 XGBoost 모델 학습
 """
 
+import argparse
 import os
 import sys
 from dotenv import load_dotenv
-from supabase import create_client
 
 # 상위 디렉토리를 path에 추가
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from ml.trainer import train_all_mbti_models
+from ml.trainer import MBTI_TYPES, train_all_mbti_models, export_all_compiled_models
+from db import get_data_source
 
 # Load environment
 load_dotenv('../.env')
 
-SUPABASE_URL = os.environ.get("VITE_SUPABASE_URL")
-SUPABASE_KEY = os.environ.get("VITE_SUPABASE_ANON_KEY")
-
-if not SUPABASE_URL or not SUPABASE_KEY:
-    print("❌ Supabase credentials not found!")
-    sys.exit(1)
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train XGBoost rankers for all MBTI types")
+    parser.add_argument(
+        '--workers', type=int, default=int(os.environ.get("TRAIN_WORKERS", 1)),
+        help="동시에 학습할 프로세스 수 (1이면 순차 학습)"
+    )
+    parser.add_argument(
+        '--nthread', type=int, default=int(os.environ.get("TRAIN_NTHREAD", 0)) or None,
+        help="모델당 XGBoost 스레드 수 (기본값: CPU 수 / workers)"
+    )
+    parser.add_argument(
+        '--mode', choices=['full', 'incremental', 'window'], default=os.environ.get("TRAIN_MODE", "full"),
+        help="full: 전체 이력 재학습 / incremental: 새 행동으로 기존 모델에 이어서 학습 / window: 최근 기간만 재학습"
+    )
+    parser.add_argument(
+        '--window-days', type=int, default=int(os.environ.get("TRAIN_WINDOW_DAYS", 90)),
+        help="window 모드의 학습 기간 (일)"
+    )
+    parser.add_argument(
+        '--incremental-rounds', type=int, default=int(os.environ.get("TRAIN_INCREMENTAL_ROUNDS", 20)),
+        help="incremental 모드에서 추가할 boosting round 수"
+    )
+    parser.add_argument(
+        '--profile', default=None, type=str.upper, choices=MBTI_TYPES, metavar='MBTI',
+        help="이 MBTI의 학습 호출 CPU 프로파일을 --profile-dir에 저장 (flame graph용 collapsed stacks)"
+    )
+    parser.add_argument('--profile-dir', default=os.environ.get("PROFILE_DIR", "profiles"))
+    parser.add_argument(
+        '--export-only', action='store_true',
+        help="학습 없이 기존 모델을 API용 컴파일 형식(.npz)으로만 변환"
+    )
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
+    
+    if args.export_only:
+        exported = export_all_compiled_models()
+        print(f"✅ Exported {len(exported)} compiled models")
+        return
+    
+    # Supabase 클라이언트 (공유 커넥션 풀) 또는 DATA_SOURCE=replica이면 로컬 복제본
+    supabase = get_data_source()
+    if supabase is None:
+        print("❌ Supabase credentials not found!")
+        sys.exit(1)
+    
     print("🚀 MBTI Stock - XGBoost Model Training")
     print("=" * 60)
     
-    # Supabase 클라이언트 생성
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-    
     # 모든 MBTI 모델 학습
-    results = train_all_mbti_models(supabase)
+    results = train_all_mbti_models(
+        supabase,
+        workers=args.workers,
+        nthread=args.nthread,
+        mode=args.mode,
+        window_days=args.window_days,
+        incremental_rounds=args.incremental_rounds,
+        profile_mbti=args.profile,
+        profile_dir=args.profile_dir
+    )
     
     # 결과 요약
     print("\n📊 Training Summary:")
@@ -39,9 +85,12 @@ def main():
     
     success_count = sum(1 for r in results.values() if r['status'] == 'success')
     failed_count = sum(1 for r in results.values() if r['status'] == 'failed')
+    unchanged_count = sum(1 for r in results.values() if r['status'] == 'unchanged')
     
     print(f"✅ Successful: {success_count}/16")
     print(f"❌ Failed: {failed_count}/16")
+    if unchanged_count:
+        print(f"⏸️  Unchanged (not enough new data): {unchanged_count}/16")
     
     if success_count > 0:
         print("\n✨ Models ready for deployment!")